@@ -3,8 +3,9 @@ from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django import forms
 from django.db import models
-from .models import (Trainee, Task, SignOff, StaffProfile, UnsignLog, Cohort,
+from .models import (Trainee, Task, SignOff, StaffProfile, UnsignLog, Cohort, Curriculum,
                      AdvancedStaff, AdvancedTrainingType, AdvancedTraining)
+from .permissions import permissions_for
 
 class SignOffInline(admin.TabularInline):
     model = SignOff
@@ -61,31 +62,51 @@ class TraineeAdminForm(forms.ModelForm):
 @admin.register(Trainee)
 class TraineeAdmin(admin.ModelAdmin):
     form = TraineeAdminForm
-    list_display = ('badge_number', 'full_name', 'cohort', 'progress_display', 'is_active')
+    list_display = ('badge_number', 'full_name', 'cohort', 'progress_display', 'missing_tasks_display', 'is_active')
     list_filter = ('cohort', 'is_active', 'date_added')
     search_fields = ('badge_number', 'first_name', 'last_name')
     inlines = [SignOffInline]
-    list_select_related = ('cohort',)
+    list_select_related = ('cohort', 'progress')
 
     def get_queryset(self, request):
         """Optimize queryset to avoid N+1 queries in admin list view"""
-        from django.db.models import Count
         qs = super().get_queryset(request)
-        return qs.select_related('cohort').annotate(signoff_count=Count('signoffs', distinct=True))
+        return qs.select_related('cohort', 'progress')
 
     def progress_display(self, obj):
-        """Display progress using annotated count to avoid N+1 queries"""
-        total_tasks = Task.objects.filter(is_active=True).count()
-        if total_tasks == 0:
-            return "0%"
-        # Use annotated count if available, otherwise calculate normally
-        if hasattr(obj, 'signoff_count'):
-            progress = round((obj.signoff_count / total_tasks) * 100, 1)
-        else:
-            progress = obj.get_progress_percentage()
-        return f"{progress}%"
+        """Display progress from the materialized TraineeProgress row"""
+        return f"{obj.get_progress_percentage()}%"
     progress_display.short_description = 'Progress'
 
+    def get_changelist_instance(self, request):
+        """Build one CompletionMatrix for the page instead of querying per row"""
+        from .completion import CompletionMatrix
+        from .registry import task_registry
+
+        cl = super().get_changelist_instance(request)
+        trainees = list(cl.result_list)  # Evaluates (and caches) the page queryset
+        snapshot = task_registry.snapshot()
+        matrix = CompletionMatrix.for_trainees(trainees, snapshot.tasks)
+        for trainee in trainees:
+            # Only the tasks of the trainee's cohort curriculum count as missing
+            curriculum_tasks = snapshot.task_id_set_for(trainee.cohort.curriculum_id)
+            trainee.missing_task_orders = [
+                snapshot.by_id[task_id].order
+                for task_id in matrix.missing_tasks(trainee.id)
+                if task_id in curriculum_tasks
+            ]
+        return cl
+
+    def missing_tasks_display(self, obj):
+        """List the order numbers of curriculum tasks not yet signed off"""
+        missing = getattr(obj, 'missing_task_orders', None)
+        if missing is None:
+            return "-"
+        if not missing:
+            return "None"
+        return ", ".join(str(order) for order in missing)
+    missing_tasks_display.short_description = 'Missing Tasks'
+
     def get_urls(self):
         from django.urls import path
         urls = super().get_urls()
@@ -161,6 +182,24 @@ class TaskAdminForm(forms.ModelForm):
 
         return order
 
+    def clean_prerequisites(self):
+        """Reject prerequisites that would make a task (indirectly) require itself"""
+        from django.core.exceptions import ValidationError
+
+        prerequisites = self.cleaned_data.get('prerequisites')
+        if prerequisites and self.instance.pk:
+            ids = {task.pk for task in prerequisites}
+            links = [(self.instance.pk, prerequisite_id) for prerequisite_id in ids]
+            if Task.creates_prerequisite_loop(links):
+                raise ValidationError('These prerequisites would create a loop (a task that requires itself).')
+            # Curricula containing this task must contain its prerequisites too
+            for curriculum in self.instance.curricula.prefetch_related('tasks'):
+                member_ids = {task.pk for task in curriculum.tasks.all()}
+                missing = Curriculum.unmet_prerequisites([self.instance.pk], member_ids, links)
+                if missing:
+                    raise ValidationError(Curriculum.unmet_prerequisites_message(curriculum.name, missing))
+        return prerequisites
+
     def validate_unique(self):
         """
         Skip unique validation for 'order' field.
@@ -185,7 +224,7 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ('category', 'requires_score', 'is_active')
     search_fields = ('name', 'description')
     ordering = ('order',)
-    filter_horizontal = ('authorized_signers',)
+    filter_horizontal = ('authorized_signers', 'prerequisites')
     fieldsets = (
         ('Basic Information', {
             'fields': ('order', 'name', 'description', 'category', 'is_active'),
@@ -199,6 +238,10 @@ class TaskAdmin(admin.ModelAdmin):
             'fields': ('authorized_signers',),
             'description': 'Leave empty to allow all staff to sign off this task'
         }),
+        ('Prerequisites', {
+            'fields': ('prerequisites',),
+            'description': 'Tasks that must be completed before this one can be signed off'
+        }),
     )
 
     def save_model(self, request, obj, form, change):
@@ -213,6 +256,46 @@ class TaskAdmin(admin.ModelAdmin):
         return f"{count} staff" if count > 0 else "All staff"
     authorized_count.short_description = 'Authorized Signers'
 
+class CurriculumAdminForm(forms.ModelForm):
+    class Meta:
+        model = Curriculum
+        fields = '__all__'
+
+    def clean_tasks(self):
+        """Reject task sets that leave out a prerequisite of one of their tasks"""
+        from django.core.exceptions import ValidationError
+
+        tasks = self.cleaned_data.get('tasks')
+        if tasks:
+            ids = {task.pk for task in tasks}
+            missing = Curriculum.unmet_prerequisites(ids, ids)
+            if missing:
+                name = self.cleaned_data.get('name') or self.instance.name
+                raise ValidationError(Curriculum.unmet_prerequisites_message(name, missing))
+        return tasks
+
+
+@admin.register(Curriculum)
+class CurriculumAdmin(admin.ModelAdmin):
+    form = CurriculumAdminForm
+    list_display = ('name', 'task_count_display', 'cohort_list_display')
+    search_fields = ('name', 'description')
+    filter_horizontal = ('tasks',)
+
+    def get_queryset(self, request):
+        """Optimize queryset to avoid N+1 queries"""
+        return super().get_queryset(request).prefetch_related('cohorts')
+
+    def task_count_display(self, obj):
+        # Active tasks only, from the cached catalog
+        from .registry import task_registry
+        return task_registry.snapshot().total_for(obj.pk)
+    task_count_display.short_description = 'Active Tasks'
+
+    def cohort_list_display(self, obj):
+        return ", ".join(cohort.name for cohort in obj.cohorts.all()) or "-"
+    cohort_list_display.short_description = 'Cohorts'
+
 @admin.register(SignOff)
 class SignOffAdmin(admin.ModelAdmin):
     list_display = ('trainee', 'task', 'signed_by', 'signed_at', 'score')
@@ -261,8 +344,9 @@ class UserAdmin(BaseUserAdmin):
 
 @admin.register(Cohort)
 class CohortAdmin(admin.ModelAdmin):
-    list_display = ('name', 'year', 'semester', 'start_date', 'end_date', 'is_current_display', 'trainee_count_display')
-    list_filter = ('year', 'semester', 'is_current_override')
+    list_display = ('name', 'year', 'semester', 'start_date', 'end_date', 'curriculum', 'is_current_display', 'trainee_count_display')
+    list_filter = ('year', 'semester', 'is_current_override', 'curriculum')
+    list_select_related = ('curriculum',)
     search_fields = ('name',)
     ordering = ('-year', '-semester')
 
@@ -343,38 +427,23 @@ class AdvancedStaffAdmin(admin.ModelAdmin):
 
     def has_module_permission(self, request):
         """Control whether this module appears in admin index"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_view_permission(self, request, obj=None):
         """Control who can view advanced staff records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_add_permission(self, request):
         """Control who can add advanced staff records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_change_permission(self, request, obj=None):
         """Control who can edit advanced staff records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_delete_permission(self, request, obj=None):
         """Control who can delete advanced staff records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
 
 @admin.register(AdvancedTrainingType)
@@ -413,38 +482,23 @@ class AdvancedTrainingTypeAdmin(admin.ModelAdmin):
 
     def has_module_permission(self, request):
         """Control whether this module appears in admin index"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_view_permission(self, request, obj=None):
         """Control who can view advanced training types"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_add_permission(self, request):
         """Control who can add advanced training types"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_change_permission(self, request, obj=None):
         """Control who can edit advanced training types"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_delete_permission(self, request, obj=None):
         """Control who can delete advanced training types"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
 
 @admin.register(AdvancedTraining)
@@ -488,35 +542,20 @@ class AdvancedTrainingAdmin(admin.ModelAdmin):
 
     def has_module_permission(self, request):
         """Control whether this module appears in admin index"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_view_permission(self, request, obj=None):
         """Control who can view advanced training records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_add_permission(self, request):
         """Control who can add advanced training records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_change_permission(self, request, obj=None):
         """Control who can edit advanced training records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
 
     def has_delete_permission(self, request, obj=None):
         """Control who can delete advanced training records"""
-        return (
-            request.user.is_superuser or
-            request.user.has_perm('tracker.manage_advanced_training')
-        )
+        return permissions_for(request).can_manage_advanced
@@ -0,0 +1,71 @@
+"""
+Delta sync: what changed for a set of trainees since a client watermark.
+
+After a bulk action the list and detail pages ask for the rows that changed
+instead of reloading:
+
+    watermark = current_watermark()           # rendered into the page
+    ...
+    changes = changes_since(trainees, since)  # since = parse_watermark(...)
+    changes.trainees        # changed trainees (select_related cohort/progress)
+    changes.unsigned        # UnsignLog rows (trainee_id, task_id) since the watermark
+
+A trainee counts as changed when its own row moved (Trainee.updated_at:
+name, cohort, active flag) or its progress row did (TraineeProgress.updated_at,
+which moves on every sign-off create, update or delete, bulk writes
+included). Both are checked in one query over the caller's scope. UnsignLog
+is the deletion log: it says which sign-offs were removed.
+
+A write that started before a watermark was taken may commit just after it,
+so queries reach back SYNC_OVERLAP seconds. Patching a row twice is harmless.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import UnsignLog
+
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class Changes:
+    """Changed trainees and removed sign-offs for one sync request."""
+
+    def __init__(self, watermark, trainees, unsigned):
+        self.watermark = watermark
+        self.trainees = trainees
+        self.unsigned = unsigned
+
+
+def current_watermark():
+    return timezone.now().isoformat()
+
+
+def parse_watermark(value):
+    """Aware datetime from a watermark string; raises ValueError when unreadable."""
+    parsed = parse_datetime(value or '')
+    if parsed is None:
+        raise ValueError(f'Invalid watermark: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def changes_since(trainees, since):
+    """Changes among the ``trainees`` queryset since the ``since`` datetime."""
+    watermark = current_watermark()
+    cutoff = since - SYNC_OVERLAP
+    changed = list(
+        trainees.filter(Q(updated_at__gte=cutoff) | Q(progress__updated_at__gte=cutoff))
+        .select_related('cohort', 'progress')
+        .order_by('badge_number')
+    )
+    unsigned = list(
+        UnsignLog.objects.filter(trainee__in=trainees, unsigned_at__gte=cutoff)
+        .order_by('unsigned_at')
+        .values('trainee_id', 'task_id', 'unsigned_at')
+    )
+    return Changes(watermark, changed, unsigned)
@@ -0,0 +1,184 @@
+"""
+Vectorized trainee x task completion matrix.
+
+Loads every sign-off for a set of trainees with a single
+``values_list('trainee_id', 'task_id')`` query and answers cohort-wide
+questions (progress, per-task completion rate, missing tasks) as NumPy
+array operations instead of per-row queries.
+
+Typical use inside a view (one matrix per request):
+
+    matrix = CompletionMatrix.for_trainees(trainees, tasks)
+    matrix.task_completion_counts()       # {task_id: trainees done}
+    matrix.missing_tasks(trainee.id)      # [task_id, ...] in task order
+    matrix.trainees_missing(task.id)      # [trainee_id, ...]
+"""
+
+import numpy as np
+
+from .models import SignOff, Trainee
+from .registry import task_registry
+
+
+class CompletionMatrix:
+    """
+    Boolean matrix of completed sign-offs.
+
+    Rows follow ``trainee_ids`` and columns follow ``task_ids`` in the order
+    they were given. When ``value_field`` is supplied, a parallel object array
+    holds that field for every completed cell (e.g. the signer's initials).
+    """
+
+    def __init__(self, trainee_ids, task_ids, rows, with_values=False):
+        self.trainee_ids = np.asarray(list(trainee_ids), dtype=np.int64)
+        self.task_ids = np.asarray(list(task_ids), dtype=np.int64)
+        self._trainee_index = {tid: i for i, tid in enumerate(self.trainee_ids.tolist())}
+        self._task_index = {tid: i for i, tid in enumerate(self.task_ids.tolist())}
+
+        self.matrix = np.zeros((len(self.trainee_ids), len(self.task_ids)), dtype=bool)
+        self.values = np.full(self.matrix.shape, None, dtype=object) if with_values else None
+
+        rows = list(rows)
+        if not rows or not self.matrix.size:
+            return
+
+        pairs = np.asarray([row[:2] for row in rows], dtype=np.int64)
+        row_idx = self._lookup(self.trainee_ids, pairs[:, 0])
+        col_idx = self._lookup(self.task_ids, pairs[:, 1])
+        valid = (row_idx >= 0) & (col_idx >= 0)
+        self.matrix[row_idx[valid], col_idx[valid]] = True
+
+        if with_values:
+            payload = np.empty(len(rows), dtype=object)
+            payload[:] = [row[2] for row in rows]
+            self.values[row_idx[valid], col_idx[valid]] = payload[valid]
+
+    @staticmethod
+    def _lookup(ids, wanted):
+        """Vectorized position of each ``wanted`` id in ``ids`` (-1 when absent)."""
+        if not len(ids):
+            return np.full(len(wanted), -1, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        pos = np.searchsorted(sorted_ids, wanted)
+        pos = np.clip(pos, 0, len(sorted_ids) - 1)
+        found = sorted_ids[pos] == wanted
+        return np.where(found, order[pos], -1)
+
+    # ------------------------------------------------------------------
+    # Constructors
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def for_trainees(cls, trainees, tasks=None, value_field=None):
+        """
+        Build a matrix for the given trainees and tasks.
+
+        Args:
+            trainees: Iterable of Trainee instances or ids (row order is preserved)
+            tasks: Iterable of Task instances or ids; defaults to active tasks by order
+            value_field: Optional SignOff lookup to keep per cell
+                (e.g. 'signed_by__staff_profile__initials')
+
+        Passing already-evaluated lists costs exactly one query (the sign-offs).
+        """
+        if tasks is None:
+            tasks = task_registry.snapshot().ids
+        trainee_ids = [getattr(t, 'pk', t) for t in trainees]
+        task_ids = [getattr(t, 'pk', t) for t in tasks]
+
+        rows = []
+        if trainee_ids and task_ids:
+            fields = ['trainee_id', 'task_id']
+            if value_field:
+                fields.append(value_field)
+            rows = SignOff.objects.filter(
+                trainee_id__in=trainee_ids,
+                task_id__in=task_ids,
+            ).order_by().values_list(*fields)
+
+        return cls(trainee_ids, task_ids, rows, with_values=bool(value_field))
+
+    @classmethod
+    def for_cohort(cls, cohort, tasks=None, value_field=None, active_only=True):
+        """
+        Build a matrix for every (active) trainee in a cohort, ordered by badge number.
+
+        Columns default to the tasks of the cohort's curriculum.
+        """
+        if tasks is None:
+            tasks = task_registry.snapshot().task_ids_for(cohort.curriculum_id)
+        trainees = Trainee.objects.filter(cohort=cohort)
+        if active_only:
+            trainees = trainees.filter(is_active=True)
+        trainee_ids = list(trainees.order_by('badge_number').values_list('id', flat=True))
+        return cls.for_trainees(trainee_ids, tasks, value_field=value_field)
+
+    # ------------------------------------------------------------------
+    # Per-trainee answers
+    # ------------------------------------------------------------------
+
+    def completed_counts(self):
+        """Array of completed task counts, one per trainee row."""
+        return self.matrix.sum(axis=1)
+
+    def progress_percentages(self):
+        """Array of completion percentages (rounded to 0.1), one per trainee row."""
+        if not len(self.task_ids):
+            return np.zeros(len(self.trainee_ids))
+        return np.round(self.completed_counts() / len(self.task_ids) * 100, 1)
+
+    def progress_by_trainee(self):
+        """Dict of trainee_id -> completion percentage."""
+        return dict(zip(self.trainee_ids.tolist(), self.progress_percentages().tolist()))
+
+    def missing_tasks(self, trainee_id):
+        """Task ids the trainee has not completed, in column order."""
+        row = self._trainee_index.get(trainee_id)
+        if row is None:
+            return []
+        return self.task_ids[~self.matrix[row]].tolist()
+
+    def is_complete(self, trainee_id, task_id):
+        """True if the trainee has signed off the task."""
+        row = self._trainee_index.get(trainee_id)
+        col = self._task_index.get(task_id)
+        if row is None or col is None:
+            return False
+        return bool(self.matrix[row, col])
+
+    def value(self, trainee_id, task_id, default=None):
+        """The ``value_field`` stored for a completed cell, or ``default``."""
+        if self.values is None or not self.is_complete(trainee_id, task_id):
+            return default
+        result = self.values[self._trainee_index[trainee_id], self._task_index[task_id]]
+        return default if result is None else result
+
+    # ------------------------------------------------------------------
+    # Per-task answers
+    # ------------------------------------------------------------------
+
+    def task_completion_counts(self):
+        """Dict of task_id -> number of trainees who completed it."""
+        return dict(zip(self.task_ids.tolist(), self.matrix.sum(axis=0).tolist()))
+
+    def task_completion_rates(self):
+        """Dict of task_id -> percentage of trainees who completed it."""
+        if not len(self.trainee_ids):
+            return {task_id: 0 for task_id in self.task_ids.tolist()}
+        rates = np.round(self.matrix.mean(axis=0) * 100, 1)
+        return dict(zip(self.task_ids.tolist(), rates.tolist()))
+
+    def unlocked(self, required_task_ids):
+        """Boolean array per trainee row: every task in ``required_task_ids`` completed."""
+        cols = [self._task_index[task_id] for task_id in required_task_ids if task_id in self._task_index]
+        if not cols:
+            return np.ones(len(self.trainee_ids), dtype=bool)
+        return self.matrix[:, cols].all(axis=1)
+
+    def trainees_missing(self, task_id):
+        """Trainee ids who have not completed the task, in row order."""
+        col = self._task_index.get(task_id)
+        if col is None:
+            return []
+        return self.trainee_ids[~self.matrix[:, col]].tolist()
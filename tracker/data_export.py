@@ -0,0 +1,245 @@
+"""
+Streaming CSV / NDJSON exports of raw tracker data (for the badging system).
+
+    dataset = DATASETS['signoffs']
+    filters = dataset.parse_filters(request.GET)     # ValueError on bad input
+    for chunk in dataset.encode(filters, 'ndjson'):
+        ...
+
+Every dataset is a ``values()`` projection read with
+``.iterator(chunk_size=CHUNK_SIZE)`` and encoded chunk by chunk, so memory
+stays flat however many rows are exported.
+
+Filters (all optional):
+    cohort=<id>               trainee's cohort (not for advanced)
+    since=YYYY-MM-DD          on the dataset's date column, inclusive
+    until=YYYY-MM-DD          inclusive
+    user=<id>                 signer / unsigner (signoffs, unsignlog)
+
+Rows are ordered to match the composite indexes: by (signed_by, signed_at)
+when filtering on a signer, which is ``signoff_signer_date_idx``; by
+(trainee, signed_at) otherwise, which is ``signoff_trainee_date_idx`` and
+lets a cohort filter walk each trainee's date range. UnsignLog uses its
+(trainee/unsigned_by, unsigned_at) indexes the same way.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import AdvancedTraining, SignOff, Trainee, UnsignLog
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+class Dataset:
+    """One exportable table: a values() projection plus the filters it supports."""
+
+    def __init__(self, name, model, columns, date_field=None, cohort_field=None,
+                 trainee_field=None, user_field=None, default_order=('id',)):
+        self.name = name
+        self.model = model
+        # Output column -> ORM lookup (identical for plain fields)
+        self.columns = columns
+        self.date_field = date_field
+        self.cohort_field = cohort_field
+        self.trainee_field = trainee_field
+        self.user_field = user_field
+        self.default_order = default_order
+
+    def parse_filters(self, params):
+        """Validated filters from query parameters; raises ValueError with a user-facing message."""
+        filters = {}
+        for key, field in (('cohort', self.cohort_field), ('user', self.user_field)):
+            value = params.get(key)
+            if not value:
+                continue
+            if field is None:
+                raise ValueError(f'The {key} filter is not supported for {self.name}')
+            try:
+                filters[key] = int(value)
+            except ValueError:
+                raise ValueError(f'Invalid {key} id: {value}')
+
+        for key in ('since', 'until'):
+            value = params.get(key)
+            if not value:
+                continue
+            if self.date_field is None:
+                raise ValueError(f'Date filters are not supported for {self.name}')
+            parsed = parse_date(value)
+            if parsed is None:
+                raise ValueError(f'Invalid {key} date (expected YYYY-MM-DD): {value}')
+            filters[key] = parsed
+        return filters
+
+    def _date_bounds(self, filters):
+        """(lower, upper) bounds on the date column: lower inclusive, upper exclusive."""
+        since, until = filters.get('since'), filters.get('until')
+        if until is not None:
+            until += timedelta(days=1)
+        if self.model._meta.get_field(self.date_field).get_internal_type() == 'DateTimeField':
+            # Compare against datetimes (not __date) so the composite index can be used
+            tz = timezone.get_current_timezone()
+            since = since and timezone.make_aware(datetime.combine(since, time.min), tz)
+            until = until and timezone.make_aware(datetime.combine(until, time.min), tz)
+        return since, until
+
+    def queryset(self, filters):
+        queryset = self.model.objects.all()
+        order = self.default_order
+
+        if 'cohort' in filters:
+            queryset = queryset.filter(**{self.cohort_field: filters['cohort']})
+        if self.date_field and ('since' in filters or 'until' in filters):
+            since, until = self._date_bounds(filters)
+            if since is not None:
+                queryset = queryset.filter(**{f'{self.date_field}__gte': since})
+            if until is not None:
+                queryset = queryset.filter(**{f'{self.date_field}__lt': until})
+
+        if 'user' in filters:
+            queryset = queryset.filter(**{self.user_field: filters['user']})
+            order = (self.user_field, self.date_field, 'id')
+        elif self.trainee_field:
+            order = (self.trainee_field, self.date_field, 'id')
+
+        plain = [lookup for column, lookup in self.columns.items() if column == lookup]
+        renamed = {column: F(lookup) for column, lookup in self.columns.items() if column != lookup}
+        return queryset.order_by(*order).values(*plain, **renamed)
+
+    def rows(self, filters):
+        """Row dicts in column order, read in chunks."""
+        names = list(self.columns)
+        for row in self.queryset(filters).iterator(chunk_size=CHUNK_SIZE):
+            yield {name: row[name] for name in names}
+
+    def encode(self, filters, fmt):
+        """Yield encoded chunks (str) of the whole export."""
+        if fmt == 'ndjson':
+            encoder = DjangoJSONEncoder()
+            lines = (encoder.encode(row) + '\n' for row in self.rows(filters))
+        else:
+            writer = csv.writer(_Echo())
+            header = writer.writerow(list(self.columns))
+            lines = (writer.writerow([_csv_value(value) for value in row.values()]) for row in self.rows(filters))
+            yield header
+
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= CHUNK_SIZE:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+DATASETS = {dataset.name: dataset for dataset in (
+    Dataset(
+        'signoffs', SignOff,
+        columns={
+            'id': 'id',
+            'trainee_id': 'trainee_id',
+            'badge_number': 'trainee__badge_number',
+            'cohort_id': 'trainee__cohort_id',
+            'task_id': 'task_id',
+            'task_order': 'task__order',
+            'task_name': 'task__name',
+            'signed_by_id': 'signed_by_id',
+            'signed_by_username': 'signed_by__username',
+            'signed_by_initials': 'signed_by__staff_profile__initials',
+            'signed_at': 'signed_at',
+            'score': 'score',
+            'notes': 'notes',
+        },
+        date_field='signed_at', cohort_field='trainee__cohort_id',
+        trainee_field='trainee_id', user_field='signed_by_id',
+    ),
+    Dataset(
+        'unsignlog', UnsignLog,
+        columns={
+            'id': 'id',
+            'trainee_id': 'trainee_id',
+            'badge_number': 'trainee__badge_number',
+            'cohort_id': 'trainee__cohort_id',
+            'task_id': 'task_id',
+            'task_name': 'task__name',
+            'original_signed_by_id': 'original_signed_by_id',
+            'original_signed_at': 'original_signed_at',
+            'original_score': 'original_score',
+            'original_notes': 'original_notes',
+            'unsigned_by_id': 'unsigned_by_id',
+            'unsigned_by_username': 'unsigned_by__username',
+            'unsigned_at': 'unsigned_at',
+            'reason': 'reason',
+        },
+        date_field='unsigned_at', cohort_field='trainee__cohort_id',
+        trainee_field='trainee_id', user_field='unsigned_by_id',
+    ),
+    Dataset(
+        'trainees', Trainee,
+        columns={
+            'id': 'id',
+            'badge_number': 'badge_number',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+            'cohort_id': 'cohort_id',
+            'cohort_name': 'cohort__name',
+            'is_active': 'is_active',
+            'completed_count': 'progress__completed_count',
+            'percentage': 'progress__percentage',
+            'date_added': 'date_added',
+            'updated_at': 'updated_at',
+        },
+        date_field='updated_at', cohort_field='cohort_id',
+        default_order=('badge_number',),
+    ),
+    Dataset(
+        'advanced', AdvancedTraining,
+        columns={
+            'id': 'id',
+            'staff_id': 'staff_id',
+            'badge_number': 'staff__badge_number',
+            'first_name': 'staff__first_name',
+            'last_name': 'staff__last_name',
+            'role': 'staff__role',
+            'staff_is_active': 'staff__is_active',
+            'training_type_id': 'training_type_id',
+            'training_type_name': 'training_type__name',
+            'custom_type': 'custom_type',
+            'completion_date': 'completion_date',
+            'approver_initials': 'approver_initials',
+            'signed_at': 'signed_at',
+            'termination_date': 'termination_date',
+            'updated_at': 'updated_at',
+        },
+        date_field='completion_date',
+        default_order=('staff_id', 'training_type_id', 'id'),
+    ),
+)}
@@ -0,0 +1,174 @@
+"""
+In-process pub/sub for live sign-off updates (Server-Sent Events).
+
+Signals publish small events once their transaction commits; the
+``event_stream`` view forwards them to every browser watching the cohort:
+
+    publish_signoff_change('signoff', trainee_ids, task_ids)    # from signals / bulk writes
+
+    with event_bus.subscribe(cohort_channel(cohort_id)) as subscription:
+        event = await subscription.get(timeout=15)     # None on timeout
+
+Channels are ``cohort:<id>`` (sign-offs, unsigns and advanced training of
+that cohort's trainees) and ``advanced`` (every advanced-training change).
+Events carry ids only; pages react by asking the delta-sync endpoint for
+the changed rows.
+
+Publishing is thread-safe: sync views run in worker threads while the
+subscribers wait on asyncio queues in the ASGI event loop. A subscriber that
+falls SUBSCRIBER_QUEUE_SIZE events behind gets a single ``resync`` event in
+place of the dropped ones. Nothing is looked up or queued while nobody is
+subscribed, so writes cost nothing extra in that case.
+
+The bus only reaches subscribers in the same process. Under WSGI (runserver)
+the view polls the database instead; see views.event_stream.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.utils import timezone
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+ADVANCED_CHANNEL = 'advanced'
+
+
+def cohort_channel(cohort_id):
+    return f'cohort:{cohort_id}'
+
+
+class Subscription:
+    """One listener's queue on one channel."""
+
+    def __init__(self, channel, loop):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _deliver(self, event):
+        # Runs in the subscriber's event loop
+        if self.queue.full():
+            self.overflowed = True
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Next event, or None if ``timeout`` seconds pass without one."""
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return {'type': 'resync'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """Process-wide channel -> subscriptions registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def has_subscribers(self, channel=None):
+        with self._lock:
+            if channel is None:
+                return bool(self._subscriptions)
+            return bool(self._subscriptions.get(channel))
+
+    def publish(self, channel, event):
+        """Hand ``event`` to every subscriber of ``channel`` (from any thread)."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        if not subscriptions:
+            return
+        event = {**event, 'at': timezone.now().isoformat()}
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # Loop already closed; the subscription is being torn down
+                pass
+
+    @contextmanager
+    def subscribe(self, channel):
+        """Subscribe for the duration of the block (call from inside the event loop)."""
+        subscription = Subscription(channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[channel]
+
+    def stats(self):
+        with self._lock:
+            return {channel: len(subscriptions) for channel, subscriptions in self._subscriptions.items()}
+
+
+event_bus = EventBus()
+
+
+def publish_on_commit(build):
+    """
+    Publish the events returned by ``build()`` after the current transaction commits.
+
+    ``build`` returns (channel, event) pairs and is only called when someone
+    is subscribed, so any lookups it needs are skipped otherwise.
+    """
+    def send():
+        if not event_bus.has_subscribers():
+            return
+        for channel, event in build():
+            event_bus.publish(channel, event)
+
+    transaction.on_commit(send)
+
+
+def publish_signoff_change(event_type, trainee_ids, task_ids):
+    """Announce created/updated ('signoff') or removed ('unsign') sign-offs to each trainee's cohort."""
+    from .models import Trainee
+
+    trainee_ids = sorted(set(trainee_ids))
+    task_ids = sorted(set(task_ids))
+
+    def build():
+        by_cohort = defaultdict(list)
+        for trainee_id, cohort_id in Trainee.objects.filter(id__in=trainee_ids).values_list('id', 'cohort_id'):
+            by_cohort[cohort_id].append(trainee_id)
+        return [
+            (cohort_channel(cohort_id), {'type': event_type, 'trainee_ids': ids, 'task_ids': task_ids})
+            for cohort_id, ids in by_cohort.items()
+        ]
+
+    publish_on_commit(build)
+
+
+def publish_advanced_change(training, action):
+    """Announce a saved/deleted AdvancedTraining on the advanced channel and the matching trainee's cohort."""
+    from .models import AdvancedStaff, Trainee
+    from .utils import normalize_badge_for_trainee
+
+    staff_id, training_type_id = training.staff_id, training.training_type_id
+
+    def build():
+        event = {'type': 'advanced', 'action': action, 'staff_id': staff_id, 'training_type_id': training_type_id}
+        events = [(ADVANCED_CHANNEL, event)]
+        badge = AdvancedStaff.objects.filter(pk=staff_id).values_list('badge_number', flat=True).first()
+        if badge:
+            trainee = Trainee.objects.filter(badge_number=normalize_badge_for_trainee(badge)).values('id', 'cohort_id').first()
+            if trainee:
+                events.append((cohort_channel(trainee['cohort_id']), {**event, 'trainee_ids': [trainee['id']]}))
+        return events
+
+    publish_on_commit(build)
@@ -0,0 +1,7 @@
+"""
+Excel export helpers.
+
+config.py holds template paths and column mappings; layout.py compiles a
+template's structure once (cached until the file changes) so exports only
+touch the cells they write.
+"""
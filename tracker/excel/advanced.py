@@ -0,0 +1,158 @@
+"""
+Advanced training status export (ADV_TrainingStatus_WIP.xlsx).
+
+The export is a single indexed pass:
+
+    export = AdvancedExport(is_active=False)
+    export.write(fileobj)               # picks one of the two paths below
+    export.fill_template(workbook)      # in-place, keeps every template sheet
+    export.stream_to(template_sheet, fileobj)   # write-only, for large sheets
+
+Training types are resolved with one query and staff rows are read with the
+staff x training-type pivot (pivot.TrainingPivot: one small query for the
+slot depth, then one chunked query with a column per training field). Each
+staff member becomes one flat row of values, so writing is proportional to
+the cells actually filled. The template's sample rows are cleared in place rather
+than removed with ``delete_rows``, which shifts every cell below the cut.
+
+``stream_to`` copies the header rows, merged header cells and column widths
+of the template sheet into a write-only workbook and appends rows as they are
+produced, so memory stays flat however many staff a sheet has. The streamed
+file contains only the exported sheet.
+"""
+
+from copy import copy
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils.cell import range_boundaries
+
+from ..exceptions import ExcelImportError, TemplateNotFoundError
+from ..models import AdvancedStaff, AdvancedTrainingType
+from ..pivot import TrainingPivot
+from .assets import template_cache
+from .config import (
+    ADVANCED_EXPORT_WIDTH, ADVANCED_HEADER_ROWS, ADVANCED_SHEET_NAMES, ADVANCED_STAFF_FIELDS,
+    ADVANCED_STREAM_THRESHOLD, ADVANCED_TEMPLATE_PATH, ADVANCED_TRAINING_COLUMNS,
+)
+
+DATE_FORMAT = '%m/%d/%Y'
+STAFF_CHUNK_SIZE = 2000
+
+
+class AdvancedExport:
+    """One advanced-training sheet export (active or removed staff)."""
+
+    def __init__(self, is_active=True, stream_threshold=ADVANCED_STREAM_THRESHOLD):
+        self.is_active = is_active
+        self.stream_threshold = stream_threshold
+        self.sheet_name = ADVANCED_SHEET_NAMES[is_active]
+
+    def staff_queryset(self):
+        return AdvancedStaff.objects.filter(is_active=self.is_active).order_by('badge_number')
+
+    def should_stream(self):
+        """True when the sheet is large enough to be written with a write-only workbook."""
+        return self.staff_queryset().count() > self.stream_threshold
+
+    def column_groups(self):
+        """(training type id, column groups) pairs for the types present in the database."""
+        type_ids = dict(
+            AdvancedTrainingType.objects.filter(
+                name__in=ADVANCED_TRAINING_COLUMNS
+            ).values_list('name', 'id')
+        )
+        return [
+            (type_ids[name], groups)
+            for name, groups in ADVANCED_TRAINING_COLUMNS.items()
+            if name in type_ids
+        ]
+
+    def rows(self):
+        """Yield one list of ADVANCED_EXPORT_WIDTH cell values per staff member, by badge number."""
+        column_groups = dict(self.column_groups())
+        pivot = TrainingPivot(
+            self.staff_queryset(), column_groups,
+            staff_fields=('id',) + ADVANCED_STAFF_FIELDS,
+            training_fields=('completion_date', 'approver_initials', 'termination_date', 'custom_type'),
+            max_slots={type_id: len(groups) for type_id, groups in column_groups.items()},
+        )
+
+        for row in pivot.rows(chunk_size=STAFF_CHUNK_SIZE):
+            values = [None] * ADVANCED_EXPORT_WIDTH
+            values[:len(ADVANCED_STAFF_FIELDS)] = [getattr(row, field) for field in ADVANCED_STAFF_FIELDS]
+            for cell in row.cells:
+                groups = column_groups[cell.training_type]
+                for training, (date_col, apprvd_col, term_col, type_col) in zip(cell.trainings, groups):
+                    if training.completion_date:
+                        values[date_col - 1] = training.completion_date.strftime(DATE_FORMAT)
+                    if training.approver_initials:
+                        values[apprvd_col - 1] = training.approver_initials
+                    if training.termination_date:
+                        values[term_col - 1] = training.termination_date.strftime(DATE_FORMAT)
+                    if training.custom_type and type_col:
+                        values[type_col - 1] = training.custom_type
+            yield values
+
+    def write(self, fileobj, template_path=ADVANCED_TEMPLATE_PATH):
+        """Save the export to ``fileobj``, streaming it when the sheet is large."""
+        try:
+            workbook = template_cache.load_workbook(template_path)
+        except FileNotFoundError:
+            raise TemplateNotFoundError(template_path)
+        if self.sheet_name not in workbook.sheetnames:
+            raise ExcelImportError(f'Sheet "{self.sheet_name}" not found in template')
+
+        if self.should_stream():
+            self.stream_to(workbook[self.sheet_name], fileobj)
+        else:
+            self.fill_template(workbook)
+            workbook.save(fileobj)
+
+    def fill_template(self, workbook):
+        """Replace the sample rows of the template sheet with the export rows, in place."""
+        ws = workbook[self.sheet_name]
+        first_row = ADVANCED_HEADER_ROWS + 1
+
+        # Clear sample data without shifting cells (delete_rows moves every cell below)
+        for row in ws.iter_rows(min_row=first_row, max_row=ws.max_row):
+            for cell in row:
+                if cell.value is not None:
+                    cell.value = None
+
+        for row_number, values in enumerate(self.rows(), start=first_row):
+            for column, value in enumerate(values, start=1):
+                if value is not None and value != '':
+                    ws.cell(row=row_number, column=column, value=value)
+        return ws
+
+    def stream_to(self, template_sheet, fileobj):
+        """Write the header of ``template_sheet`` and every export row to ``fileobj`` as a new workbook."""
+        workbook = Workbook(write_only=True)
+        ws = workbook.create_sheet(template_sheet.title)
+
+        for key, dimension in template_sheet.column_dimensions.items():
+            if dimension.width:
+                ws.column_dimensions[key].width = dimension.width
+        for cell_range in template_sheet.merged_cells.ranges:
+            if range_boundaries(str(cell_range))[3] <= ADVANCED_HEADER_ROWS:
+                ws.merged_cells.add(str(cell_range))
+
+        for template_row in template_sheet.iter_rows(min_row=1, max_row=ADVANCED_HEADER_ROWS):
+            ws.append([self._header_cell(ws, cell) for cell in template_row])
+
+        for values in self.rows():
+            ws.append(values)
+
+        workbook.save(fileobj)
+
+    @staticmethod
+    def _header_cell(ws, template_cell):
+        cell = WriteOnlyCell(ws, value=getattr(template_cell, 'value', None))
+        if template_cell.has_style:
+            cell.font = copy(template_cell.font)
+            cell.fill = copy(template_cell.fill)
+            cell.border = copy(template_cell.border)
+            cell.alignment = copy(template_cell.alignment)
+            cell.number_format = template_cell.number_format
+        return cell
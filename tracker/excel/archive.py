@@ -0,0 +1,153 @@
+"""
+Multi-cohort archive export: one orientation workbook per cohort, in one zip.
+
+    for chunk in stream_cohort_archive(cohorts, workers=4):
+        ...                                   # zip bytes, as they are produced
+
+Workbooks are built in a process pool (the "spawn" start method, so workers
+behave the same on Windows and Linux and never inherit a database
+connection). Each worker writes its workbook to a temporary file and returns
+only the path; the parent adds finished files to the zip in completion order
+and deletes them. At most ``workers`` builds are in flight, so memory is
+bounded by the worker count rather than the number of cohorts. The zip is
+written to a non-seekable sink and drained after every entry, which lets the
+response stream it.
+
+Inside an atomic block (tests, or a caller's transaction) the workbooks are
+built in-process, because worker connections could not see uncommitted rows.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.db import connection
+from django.utils.text import slugify
+
+# Text file added to the zip when some cohorts produced warnings or failed
+REPORT_NAME = 'export_report.txt'
+
+
+def _init_worker():
+    """Process pool initializer: configure Django in the fresh interpreter."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'trainee_tracker.settings')
+    import django
+    django.setup()
+
+
+def build_cohort_file(cohort_id, directory):
+    """Build one cohort's workbook into ``directory``; returns (cohort_id, path, warnings)."""
+    from django.db import close_old_connections
+    from ..models import Cohort
+    from .orientation import write_cohort_workbook
+
+    try:
+        cohort = Cohort.objects.get(pk=cohort_id)
+        fd, path = tempfile.mkstemp(dir=directory, suffix='.xlsx')
+        with os.fdopen(fd, 'wb') as output:
+            warnings = write_cohort_workbook(cohort, output)
+        return cohort_id, path, warnings
+    finally:
+        close_old_connections()
+
+
+def build_cohort_files(cohort_ids, directory, workers):
+    """
+    Yield (cohort_id, path, warnings, error) for every cohort, in completion order.
+
+    ``error`` is the failure message of a cohort that could not be built (path is None).
+    """
+    cohort_ids = list(cohort_ids)
+    if workers <= 1 or len(cohort_ids) <= 1 or connection.in_atomic_block:
+        for cohort_id in cohort_ids:
+            try:
+                yield (*build_cohort_file(cohort_id, directory), None)
+            except Exception as exc:
+                yield cohort_id, None, [], str(exc)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(cohort_ids)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+    )
+    pending = {}
+    remaining = iter(cohort_ids)
+    try:
+        while True:
+            # Keep at most `workers` builds in flight
+            while len(pending) < workers:
+                cohort_id = next(remaining, None)
+                if cohort_id is None:
+                    break
+                pending[executor.submit(build_cohort_file, cohort_id, directory)] = cohort_id
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                cohort_id = pending.pop(future)
+                try:
+                    yield (*future.result(), None)
+                except Exception as exc:
+                    yield cohort_id, None, [], str(exc)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _ZipSink:
+    """Write-only, non-seekable file object collecting zip output until drained."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def archive_member_names(cohorts):
+    """cohort id -> unique workbook name inside the zip"""
+    names = {}
+    used = set()
+    for cohort in cohorts:
+        name = f'Check_list_Orientation_{slugify(cohort.name)}.xlsx'
+        if name in used:
+            name = f'Check_list_Orientation_{slugify(cohort.name)}_{cohort.pk}.xlsx'
+        used.add(name)
+        names[cohort.pk] = name
+    return names
+
+
+def stream_cohort_archive(cohorts, workers):
+    """Yield the bytes of a zip holding one orientation workbook per cohort."""
+    names = archive_member_names(cohorts)
+    report = []
+    sink = _ZipSink()
+    with tempfile.TemporaryDirectory() as directory:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for cohort_id, path, warnings, error in build_cohort_files(names, directory, workers):
+                if error:
+                    report.append(f'{names[cohort_id]}: FAILED - {error}')
+                    continue
+                archive.write(path, names[cohort_id])
+                os.unlink(path)
+                report.extend(f'{names[cohort_id]}: {warning}' for warning in warnings)
+                yield sink.drain()
+            if report:
+                archive.writestr(REPORT_NAME, '\n'.join(report) + '\n')
+        yield sink.drain()
@@ -0,0 +1,93 @@
+"""
+Shared in-memory cache of the Excel template files.
+
+The templates live next to the database, on a slow network share, and every
+export used to read and parse them from there:
+
+    wb = template_cache.load_workbook(ORIENTATION_TEMPLATE_PATH)   # private, fresh Workbook
+    template_cache.get(ORIENTATION_TEMPLATE_PATH).data             # raw bytes
+    template_cache.get(ORIENTATION_TEMPLATE_PATH).mtime
+
+Each template is read once per modification time and kept as raw bytes. The
+first parse also keeps a pickled master copy; every later ``load_workbook``
+returns an independent copy of it without re-parsing the XML. (A pickle round
+trip is used as the deep copy: openpyxl workbooks do not survive
+``copy.deepcopy``, whose copies lose the shared style tables.) The file's
+mtime is re-checked at most every ``RECHECK_SECONDS``, so a burst of exports
+does not stat the share for each one.
+"""
+
+import io
+import os
+import pickle
+import threading
+import time
+
+import openpyxl
+
+
+class TemplateAsset:
+    """One template file at one modification time."""
+
+    def __init__(self, path, mtime, data):
+        self.path = path
+        self.mtime = mtime
+        self.data = data
+        self._master = None
+        self._lock = threading.Lock()
+
+    def workbook(self):
+        """A fresh Workbook; the first call parses the bytes, later calls copy the parsed master."""
+        master = self._master
+        if master is None:
+            with self._lock:
+                if self._master is None:
+                    workbook = openpyxl.load_workbook(io.BytesIO(self.data))
+                    self._master = pickle.dumps(workbook, pickle.HIGHEST_PROTOCOL)
+                    return workbook
+                master = self._master
+        return pickle.loads(master)
+
+
+class TemplateCache:
+    """Process-wide TemplateAsset cache keyed by path and modification time."""
+
+    RECHECK_SECONDS = 2.0
+
+    def __init__(self, preparse=True):
+        self.preparse = preparse
+        self._lock = threading.Lock()
+        self._assets = {}  # path -> (asset, monotonic time of the last mtime check)
+
+    def get(self, path):
+        """Return the cached asset for ``path``; raises FileNotFoundError if the file is missing."""
+        path = os.fspath(path)
+        now = time.monotonic()
+        entry = self._assets.get(path)
+        if entry is not None and now - entry[1] < self.RECHECK_SECONDS:
+            return entry[0]
+
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._assets.get(path)
+            if entry is not None and entry[0].mtime == mtime:
+                asset = entry[0]
+            else:
+                with open(path, 'rb') as template_file:
+                    asset = TemplateAsset(path, mtime, template_file.read())
+            self._assets[path] = (asset, now)
+        return asset
+
+    def load_workbook(self, path):
+        """A workbook of the template that the caller may modify freely."""
+        asset = self.get(path)
+        if self.preparse:
+            return asset.workbook()
+        return openpyxl.load_workbook(io.BytesIO(asset.data))
+
+    def clear(self):
+        with self._lock:
+            self._assets = {}
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,51 @@
+"""Template locations and column mappings for the Excel exports."""
+
+# Orientation checklist template (relative to the project root, like the other templates)
+ORIENTATION_TEMPLATE_PATH = 'Check list Orientation Blank.xlsx'
+
+# Column holding the cohort name in every section header (T2 is top-left of merged T2:U2)
+ORIENTATION_COHORT_NAME_COLUMN = 20
+
+# Task order to Excel column mapping
+# Based on template structure
+ORIENTATION_TASK_COLUMNS = {
+    1: 3,   # Onboarding Process Brief -> Column C (3)
+    2: 4,   # Police Clearance Form -> Column D (4)
+    3: 7,   # Document Release Form/NDA -> Column G (7)
+    4: 8,   # U.S. Citizen / ID Check -> Column H (8)
+    5: 9,   # Read SOP's 208, 210 -> Column I (9)
+    6: 10,  # Read SOP 501 A&B -> Column J (10)
+    7: 11,  # Read SOP's 505, 506, 508, 509, 510 -> Column K (11)
+    8: 12,  # Read SOP's 600, 601 -> Column L (12)
+    9: 13,  # Onboarding Tour -> Column M (13)
+    10: 14, # Onboarding Tour Quiz -> Column N (14)
+    11: 15, # Read R.G. 8.13, R.G. 8.29 -> Column O (15)
+    12: 16, # ALARA Statement -> Column P (16)
+    13: 17, # Radiation Safety PowerPoint & Video -> Column Q (17)
+    14: 18, # Reg Guides 8.13 / 8.29 Quiz -> Column R (18)
+    15: 19, # Review Deficiencies -> Column S (19)
+}
+
+# Advanced training status workbook
+ADVANCED_TEMPLATE_PATH = 'ADV_TrainingStatus_WIP.xlsx'
+
+# Sheet per staff state (active / removed); rows 1-2 are headers, staff start on row 3
+ADVANCED_SHEET_NAMES = {True: 'ADV', False: 'ADV_Removed'}
+ADVANCED_HEADER_ROWS = 2
+
+# Staff columns: Badge(1), Last(2), First(3), Role(4)
+ADVANCED_STAFF_FIELDS = ('badge_number', 'last_name', 'first_name', 'role')
+
+# Training type name -> column groups (date_col, apprvd_col, term_col, type_col).
+# The n-th record of a type (newest completion first) fills the n-th group, so
+# the "Other Training 2" columns hold a staff member's second Other Training.
+ADVANCED_TRAINING_COLUMNS = {
+    'KP Training': [(5, 6, 7, None)],
+    'Escort Training': [(8, 9, 10, None)],
+    'ExpSamp Training': [(11, 12, 13, None)],
+    'Other Training': [(15, 16, 17, 14), (19, 20, 21, 18)],
+}
+ADVANCED_EXPORT_WIDTH = 21
+
+# Sheets with more staff than this are written with a write-only (streaming) workbook
+ADVANCED_STREAM_THRESHOLD = 2000
@@ -0,0 +1,105 @@
+"""
+Compiled layout of the orientation checklist template.
+
+The template has several "Badge Number" sections, each followed (three rows
+down) by a run of pre-numbered trainee rows. Finding them means scanning the
+sheet, so the result is compiled once per template file and cached until its
+modification time (as seen by the template cache in assets.py) changes:
+
+    layout = get_orientation_layout(ORIENTATION_TEMPLATE_PATH)
+    layout.header_rows        # rows whose cohort-name cell must be updated
+    layout.data_rows          # writable trainee rows, in fill order
+    layout.is_writable(row, column)
+
+Exports then write only the cells they need.
+"""
+
+import threading
+
+from openpyxl.utils.cell import range_boundaries
+
+from .assets import template_cache
+
+# Rows scanned for section headers, and the longest run of trainee rows per section
+SCAN_ROWS = 100
+MAX_SECTION_ROWS = 30
+
+
+class OrientationLayout:
+    """Immutable description of where trainee data goes in the template."""
+
+    def __init__(self, sections, merged_ranges):
+        self.sections = tuple(sections)
+        self.header_rows = tuple(section['header_row'] for section in self.sections)
+        # Cells covered by a merged range (min_col, min_row, max_col, max_row);
+        # only the top-left cell of a range can hold a value
+        self.blocked = frozenset(
+            (row, column)
+            for min_col, min_row, max_col, max_row in merged_ranges
+            for row in range(min_row, max_row + 1)
+            for column in range(min_col, max_col + 1)
+            if (row, column) != (min_row, min_col)
+        )
+        self.data_rows = tuple(
+            row
+            for section in self.sections
+            for row in range(section['data_start'], section['data_start'] + section['capacity'])
+            if self.is_writable(row, 1)
+        )
+
+    @property
+    def capacity(self):
+        return len(self.data_rows)
+
+    def is_writable(self, row, column):
+        """False for cells covered by (but not anchoring) a merged range."""
+        return (row, column) not in self.blocked
+
+    @classmethod
+    def compile(cls, worksheet):
+        """Scan column A once for "Badge" headers and the badge-numbered rows under them."""
+        column_a = [
+            row[0] for row in worksheet.iter_rows(min_row=1, max_row=SCAN_ROWS + MAX_SECTION_ROWS + 3,
+                                                   min_col=1, max_col=1, values_only=True)
+        ]
+
+        def value(row):
+            return column_a[row - 1] if row <= len(column_a) else None
+
+        sections = []
+        for row in range(1, SCAN_ROWS):
+            header = value(row)
+            if header and 'Badge' in str(header):
+                # Data starts 3 rows after header
+                data_start = row + 3
+                capacity = 0
+                while capacity < MAX_SECTION_ROWS:
+                    cell_value = value(data_start + capacity)
+                    if not (cell_value and '#' in str(cell_value)):
+                        break
+                    capacity += 1
+                sections.append({'header_row': row, 'data_start': data_start, 'capacity': capacity})
+
+        merged = [range_boundaries(str(cell_range)) for cell_range in worksheet.merged_cells.ranges]
+        return cls(sections, merged)
+
+
+_cache_lock = threading.Lock()
+_layout_cache = {}  # path -> (mtime, layout)
+
+
+def get_orientation_layout(path):
+    """Return the compiled layout for ``path``, recompiling only when the file changes."""
+    asset = template_cache.get(path)
+    mtime = asset.mtime
+    cached = _layout_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _cache_lock:
+        cached = _layout_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        layout = OrientationLayout.compile(asset.workbook().active)
+        _layout_cache[path] = (mtime, layout)
+        return layout
@@ -0,0 +1,90 @@
+"""
+Orientation checklist export (Check list Orientation Blank.xlsx).
+
+    warnings = write_cohort_workbook(cohort, fileobj)
+
+Trainees and every sign-off (with signer initials) are loaded with two
+queries; trainee rows and section headers come from the compiled template
+layout, and only completed cells are written.
+"""
+
+import numpy as np
+from openpyxl.styles import Alignment
+
+from ..completion import CompletionMatrix
+from ..exceptions import TemplateNotFoundError
+from ..models import Trainee
+from ..registry import task_registry
+from .assets import template_cache
+from .config import ORIENTATION_COHORT_NAME_COLUMN, ORIENTATION_TASK_COLUMNS, ORIENTATION_TEMPLATE_PATH
+from .layout import get_orientation_layout
+
+CENTERED = Alignment(horizontal='center', vertical='center')
+
+
+def write_cohort_workbook(cohort, fileobj, template_path=ORIENTATION_TEMPLATE_PATH):
+    """Fill the orientation template for ``cohort`` and save it to ``fileobj``; returns warning messages."""
+    try:
+        layout = get_orientation_layout(template_path)
+        wb = template_cache.load_workbook(template_path)
+    except FileNotFoundError:
+        raise TemplateNotFoundError(template_path)
+    ws = wb.active
+
+    warnings = []
+
+    # Update cohort name in the top header and in every section header
+    ws.cell(row=2, column=ORIENTATION_COHORT_NAME_COLUMN, value=cohort.name)
+    for header_row in layout.header_rows:
+        ws.cell(row=header_row, column=ORIENTATION_COHORT_NAME_COLUMN, value=cohort.name)
+
+    # Get all trainees for this cohort
+    trainees = list(Trainee.objects.filter(
+        cohort=cohort,
+        is_active=True
+    ).order_by('badge_number').only('id', 'badge_number', 'first_name', 'last_name'))
+
+    if len(trainees) > layout.capacity:
+        # More trainees than template capacity
+        warnings.append(
+            f'Template capacity exceeded: {len(trainees)} trainees but only {layout.capacity} rows available. '
+            f'Only first {layout.capacity} trainees exported.'
+        )
+        trainees = trainees[:layout.capacity]
+
+    # Tasks of the cohort's curriculum (cached catalog)
+    tasks = task_registry.snapshot().tasks_for(cohort.curriculum_id)
+
+    # The template has a column per orientation task (orders 1-15); others cannot be exported
+    unmapped = [task.name for task in tasks if task.order not in ORIENTATION_TASK_COLUMNS]
+    if unmapped:
+        warnings.append(
+            f'No template column for {len(unmapped)} task(s): {", ".join(unmapped)}. '
+            f'Their sign-offs were not exported.'
+        )
+
+    # Load every sign-off (with signer initials) for the cohort in one query
+    matrix = CompletionMatrix.for_trainees(
+        trainees, tasks, value_field='signed_by__staff_profile__initials'
+    )
+
+    # Write trainee data to available rows
+    for trainee, current_row in zip(trainees, layout.data_rows):
+        ws.cell(row=current_row, column=1).value = trainee.badge_number
+        if layout.is_writable(current_row, 2):
+            ws.cell(row=current_row, column=2).value = trainee.full_name
+
+    # Fill in sign-offs with staff initials: visit only completed cells
+    excel_columns = [ORIENTATION_TASK_COLUMNS.get(task.order) for task in tasks]
+    for row_index, col_index in zip(*np.nonzero(matrix.matrix)):
+        excel_col = excel_columns[col_index]
+        current_row = layout.data_rows[row_index]
+        if excel_col and layout.is_writable(current_row, excel_col):
+            # Fallback to 'X' if the signer or their staff profile is missing
+            initials = matrix.values[row_index, col_index] or 'X'
+            cell = ws.cell(row=current_row, column=excel_col)
+            cell.value = initials
+            cell.alignment = CENTERED
+
+    wb.save(fileobj)
+    return warnings
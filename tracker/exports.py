@@ -0,0 +1,257 @@
+"""
+Background Excel export jobs with a versioned file cache.
+
+Building an xlsx takes seconds; on runserver that blocks every other request.
+Views hand an export spec to the shared queue instead:
+
+    job = export_jobs.submit(CohortExport(cohort))
+    job.status          # 'queued' | 'running' | 'done' | 'failed'
+    job.path            # cached file once done
+
+Each spec computes a data stamp: a hash of cheap aggregates over the rows
+the export reads (SignOff/Trainee for a cohort, AdvancedStaff and
+AdvancedTraining for the advanced sheets), the signer initials, the task
+catalog and the template's modification time. The stamp names the cached
+file, so an unchanged export is served straight from disk and any change to
+the underlying rows produces a new file. Older files of the same export are
+removed once the new one is written.
+
+Jobs run on a small thread pool (settings.EXPORT_JOB_WORKERS) and the
+browser polls ``export_job_status``. A job submitted inside an atomic block
+runs inline, because a worker's connection could not see uncommitted rows.
+Job records are kept in memory; the files survive restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, Max
+from django.utils.text import slugify
+
+from .excel.assets import template_cache
+from .excel.config import ADVANCED_TEMPLATE_PATH, ADVANCED_TRAINING_COLUMNS, ORIENTATION_TEMPLATE_PATH
+from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType, SignOff, StaffProfile, Trainee
+from .registry import task_registry
+
+logger = logging.getLogger('tracker')
+
+# Finished job records are forgotten after this many seconds (their files stay cached)
+JOB_RETENTION_SECONDS = 3600
+
+
+def _file_mtime(path):
+    try:
+        return template_cache.get(path).mtime
+    except OSError:
+        return None
+
+
+def _stamp(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+class CohortExport:
+    """Orientation checklist for one cohort."""
+
+    def __init__(self, cohort):
+        self.cohort = cohort
+        self.name = f'cohort-{cohort.pk}'
+        self.filename = f'Check_list_Orientation_{slugify(cohort.name)}.xlsx'
+
+    def data_stamp(self):
+        signoffs = SignOff.objects.filter(trainee__cohort=self.cohort).aggregate(
+            count=Count('id'), last=Max('id')
+        )
+        # Progress rows are touched by every sign-off edit (e.g. a new signer), not just adds and removes
+        trainees = Trainee.objects.filter(cohort=self.cohort).aggregate(
+            count=Count('id'), changed=Max('updated_at'), progress=Max('progress__updated_at')
+        )
+        initials = list(StaffProfile.objects.order_by('user_id').values_list('user_id', 'initials'))
+        tasks = [(task.id, task.order) for task in task_registry.snapshot().tasks_for(self.cohort.curriculum_id)]
+        return _stamp(
+            self.cohort.name, sorted(signoffs.items()), sorted(trainees.items()), initials, tasks,
+            _file_mtime(ORIENTATION_TEMPLATE_PATH),
+        )
+
+    def write(self, fileobj):
+        from .excel.orientation import write_cohort_workbook
+        return write_cohort_workbook(self.cohort, fileobj)
+
+
+class AdvancedStatusExport:
+    """Advanced training status sheet for active or removed staff."""
+
+    def __init__(self, is_active=True):
+        self.is_active = is_active
+        self.name = f'advanced-{"active" if is_active else "removed"}'
+
+    @property
+    def filename(self):
+        return f'ADV_TrainingStatus_{"Active" if self.is_active else "Removed"}_{datetime.now().strftime("%Y%m%d")}.xlsx'
+
+    def data_stamp(self):
+        # AdvancedStaff has no timestamp, so its exported columns are hashed directly
+        staff = list(
+            AdvancedStaff.objects.filter(is_active=self.is_active)
+            .order_by('id').values_list('id', 'badge_number', 'first_name', 'last_name', 'role')
+        )
+        trainings = AdvancedTraining.objects.filter(staff__is_active=self.is_active).aggregate(
+            count=Count('id'), last=Max('id'), changed=Max('updated_at')
+        )
+        types = list(
+            AdvancedTrainingType.objects.filter(name__in=ADVANCED_TRAINING_COLUMNS)
+            .order_by('name').values_list('name', 'id')
+        )
+        return _stamp(staff, sorted(trainings.items()), types, _file_mtime(ADVANCED_TEMPLATE_PATH))
+
+    def write(self, fileobj):
+        from .excel.advanced import AdvancedExport
+        AdvancedExport(is_active=self.is_active).write(fileobj)
+        return []
+
+
+class ExportJob:
+    """One export build, identified by the export name and its data stamp."""
+
+    def __init__(self, job_id, spec, path):
+        self.id = job_id
+        self.name = spec.name
+        self.filename = spec.filename
+        self.path = path
+        self.status = 'queued'
+        self.error = ''
+        self.warnings = []
+        self.created = time.monotonic()
+        self._spec = spec
+
+    @property
+    def done(self):
+        return self.status == 'done'
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'error': self.error,
+            'warnings': self.warnings,
+            'filename': self.filename,
+        }
+
+
+class ExportJobQueue:
+    """Process-wide export job registry backed by a thread pool and the on-disk cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = None
+
+    @property
+    def cache_dir(self):
+        return Path(settings.EXPORT_CACHE_DIR)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def submit(self, spec):
+        """Return the job for ``spec``'s current data, starting a build only if nothing is cached."""
+        job_id = _stamp(spec.name, spec.data_stamp())
+        path = self.cache_dir / f'{spec.name}-{job_id}.xlsx'
+
+        with self._lock:
+            self._forget_old_jobs()
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != 'failed':
+                job.filename = spec.filename
+                return job
+
+            job = ExportJob(job_id, spec, path)
+            self._jobs[job_id] = job
+            if path.exists():
+                job.warnings = self._read_warnings(path)
+                job.status = 'done'
+                return job
+
+        if connection.in_atomic_block:
+            self._build(job)
+        else:
+            self._get_executor().submit(self._build_in_worker, job)
+        return job
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.EXPORT_JOB_WORKERS, thread_name_prefix='export'
+                )
+            return self._executor
+
+    def _build_in_worker(self, job):
+        close_old_connections()
+        try:
+            self._build(job)
+        finally:
+            close_old_connections()
+
+    def _build(self, job):
+        job.status = 'running'
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write next to the target and rename, so a half-written file is never served
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as output:
+                    job.warnings = list(job._spec.write(output) or [])
+                job.path.with_suffix('.json').write_text(json.dumps({'warnings': job.warnings}))
+                os.replace(tmp_path, job.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._remove_stale_files(job)
+            job.status = 'done'
+        except Exception as exc:
+            logger.exception('Export %s failed', job.name)
+            job.error = str(exc)
+            job.status = 'failed'
+        finally:
+            job._spec = None
+
+    def _remove_stale_files(self, job):
+        """Drop cached files of the same export built from older data."""
+        for stale in self.cache_dir.glob(f'{job.name}-*'):
+            if stale.stem != job.path.stem:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _read_warnings(path):
+        try:
+            return json.loads(path.with_suffix('.json').read_text()).get('warnings', [])
+        except (OSError, ValueError):
+            return []
+
+    def _forget_old_jobs(self):
+        cutoff = time.monotonic() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.created < cutoff:
+                del self._jobs[job_id]
+
+
+export_jobs = ExportJobQueue()
@@ -0,0 +1,113 @@
+"""
+Commit-aware invalidation shared by the process-wide caches.
+
+The task registry, current cohort cache, permission index and roster cache
+all follow the same rules: invalidate() drops the cached value immediately,
+and again once the current transaction commits, so other threads never
+keep a value built from uncommitted rows. While the current thread's
+transaction holds an uncommitted invalidation, the shared value is bypassed
+(another thread may have cached one built from the committed rows) in
+favour of a private one built from this transaction's rows.
+
+Pending invalidations are tracked per thread (Django connections are per
+thread). They are cleared when the commit callback runs, or the next time
+the cache is read outside any atomic block, which covers rollbacks: a rolled
+back transaction only leaves caching bypassed until it ends.
+
+Usage:
+    class MyCache(CommitInvalidatedCache):
+        def _clear(self):
+            self._entry = None
+
+        def get(self):
+            if self._pending():
+                return self._uncommitted(key, self._build)
+            if self._entry is None:
+                self._entry = self._build()
+            return self._entry
+
+    my_cache.invalidate()      # from signals
+
+The caches live in the server process and are invalidated by model signals
+in that process only. Changes written by another process (import_data.py,
+``manage.py shell``, management commands) are not seen by a running server
+until it restarts. Tests reset every cache with reset_process_caches().
+"""
+
+import threading
+
+from django.db import connection, transaction
+
+_local = threading.local()
+_caches = []
+
+
+def _pending_caches():
+    """Caches with an uncommitted invalidation in this thread's open transaction."""
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        pending = _local.pending = set()
+    if pending and not connection.in_atomic_block:
+        # The transaction ended without committing (rollback): nothing is pending any more
+        pending.clear()
+    return pending
+
+
+def reset_process_caches():
+    """Drop every cache and forget this thread's pending invalidations (for tests)."""
+    _pending_caches().clear()
+    for cache in _caches:
+        cache._drop()
+
+
+class CommitInvalidatedCache:
+    """Base for versioned process-wide caches invalidated now and on commit."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._private = threading.local()
+        _caches.append(self)
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        """Drop the cached value now and again once the current transaction commits."""
+        self._drop()
+        if connection.in_atomic_block:
+            _pending_caches().add(self)
+            transaction.on_commit(self._commit_invalidation)
+
+    def _commit_invalidation(self):
+        _pending_caches().discard(self)
+        self._drop()
+
+    def _pending(self):
+        """True while this thread's open transaction holds an uncommitted invalidation."""
+        return self in _pending_caches()
+
+    def _uncommitted(self, key, build):
+        """
+        Value built from this thread's uncommitted rows, reused until the next invalidation.
+
+        Used instead of the shared cache while _pending() is true; never visible
+        to other threads.
+        """
+        version = self._version
+        entries = getattr(self._private, 'entries', None)
+        if entries is None or entries[0] != version:
+            entries = self._private.entries = (version, {})
+        if key not in entries[1]:
+            entries[1][key] = build()
+        return entries[1][key]
+
+    def _drop(self):
+        with self._lock:
+            self._version += 1
+            self._clear()
+
+    def _clear(self):
+        """Forget the cached value(s); called with the lock held."""
+        raise NotImplementedError
@@ -0,0 +1,130 @@
+"""
+Benchmark the advanced training Excel export.
+
+Creates synthetic removed (or active) staff with one record per training
+column group, runs the in-place template export and the streaming export,
+and reports wall time and peak Python memory (tracemalloc, measured on a
+second run) for each.
+
+The synthetic data lives in a temporary database built like the test
+runner's (migrated from scratch, in memory for SQLite) and dropped
+afterwards, so the live database is never written or locked.
+
+Usage:
+    python manage.py benchmark_advanced_export
+    python manage.py benchmark_advanced_export --staff 5000 --active
+"""
+
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from tracker.excel.advanced import AdvancedExport
+from tracker.excel.assets import template_cache
+from tracker.excel.config import ADVANCED_TEMPLATE_PATH, ADVANCED_TRAINING_COLUMNS
+from tracker.models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+
+
+class Command(BaseCommand):
+    help = 'Measure time and peak memory of the advanced training Excel export on synthetic staff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--staff',
+            type=int,
+            default=5000,
+            help='Number of synthetic staff to export (default: 5000)',
+        )
+        parser.add_argument(
+            '--active',
+            action='store_true',
+            help='Export the active-staff sheet instead of the removed-staff sheet',
+        )
+
+    def handle(self, *args, **options):
+        is_active = options['active']
+        try:
+            template_cache.get(ADVANCED_TEMPLATE_PATH)
+        except FileNotFoundError:
+            raise CommandError(f'Template not found: {ADVANCED_TEMPLATE_PATH}')
+
+        live_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._create_staff(options['staff'], is_active)
+            results = [
+                ('template', self._measure(lambda: self._export_template(is_active))),
+                ('streaming', self._measure(lambda: self._export_streaming(is_active))),
+            ]
+        finally:
+            connection.creation.destroy_test_db(live_name, verbosity=0)
+
+        sheet = 'active' if is_active else 'removed'
+        self.stdout.write(f'{options["staff"]} {sheet} staff')
+        for name, (seconds, peak) in results:
+            self.stdout.write(f'  {name:<10} {seconds:8.2f} s   peak {peak / 1024 / 1024:8.1f} MiB')
+
+    @staticmethod
+    def _create_staff(count, is_active):
+        AdvancedStaff.objects.bulk_create([
+            AdvancedStaff(
+                badge_number=f'BENCH{n:06d}',
+                first_name=f'First{n}',
+                last_name=f'Last{n}',
+                role='Staff',
+                is_active=is_active,
+            )
+            for n in range(count)
+        ], batch_size=500)
+        staff = list(AdvancedStaff.objects.filter(badge_number__startswith='BENCH').only('id'))
+
+        types = dict(
+            AdvancedTrainingType.objects.filter(name__in=ADVANCED_TRAINING_COLUMNS).values_list('name', 'id')
+        )
+        completed = date(2024, 1, 1)
+        trainings = []
+        for member in staff:
+            for name, groups in ADVANCED_TRAINING_COLUMNS.items():
+                if name not in types:
+                    continue
+                for slot in range(len(groups)):
+                    trainings.append(AdvancedTraining(
+                        staff_id=member.id,
+                        training_type_id=types[name],
+                        custom_type=f'Custom {slot}' if groups[slot][3] else '',
+                        completion_date=completed - timedelta(days=slot),
+                        approver_initials='BM',
+                        termination_date=completed + timedelta(days=365),
+                    ))
+        AdvancedTraining.objects.bulk_create(trainings, batch_size=1000)
+
+    @staticmethod
+    def _measure(func):
+        """(seconds, peak bytes); timed and traced separately since tracemalloc slows the run down."""
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            func()
+            return seconds, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    @staticmethod
+    def _export_template(is_active):
+        workbook = template_cache.load_workbook(ADVANCED_TEMPLATE_PATH)
+        AdvancedExport(is_active=is_active).fill_template(workbook)
+        with tempfile.TemporaryFile() as output:
+            workbook.save(output)
+
+    @staticmethod
+    def _export_streaming(is_active):
+        export = AdvancedExport(is_active=is_active)
+        workbook = template_cache.load_workbook(ADVANCED_TEMPLATE_PATH)
+        with tempfile.TemporaryFile() as output:
+            export.stream_to(workbook[export.sheet_name], output)
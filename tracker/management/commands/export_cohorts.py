@@ -0,0 +1,58 @@
+"""
+Export orientation checklists for several cohorts into one zip file.
+
+Workbooks are built in parallel worker processes (one per cohort) and written
+to the zip as they finish; see tracker/excel/archive.py. Warnings and failed
+cohorts are listed in export_report.txt inside the zip.
+
+Usage:
+    python manage.py export_cohorts --output archive.zip
+    python manage.py export_cohorts --cohort 3 --cohort 4 --workers 2 --output fall.zip
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.excel.archive import stream_cohort_archive
+from tracker.models import Cohort
+
+
+class Command(BaseCommand):
+    help = 'Export the orientation checklist of every (or each selected) cohort into a single zip'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            required=True,
+            help='Path of the zip file to write',
+        )
+        parser.add_argument(
+            '--cohort',
+            type=int,
+            action='append',
+            dest='cohort_ids',
+            help='Cohort id to export (repeatable; default: all cohorts)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.ARCHIVE_EXPORT_WORKERS,
+            help=f'Worker processes (default: {settings.ARCHIVE_EXPORT_WORKERS})',
+        )
+
+    def handle(self, *args, **options):
+        cohorts = Cohort.objects.all()
+        if options['cohort_ids']:
+            cohorts = cohorts.filter(id__in=options['cohort_ids'])
+            missing = set(options['cohort_ids']) - {cohort.id for cohort in cohorts}
+            if missing:
+                raise CommandError(f'Unknown cohort id(s): {", ".join(map(str, sorted(missing)))}')
+        cohorts = list(cohorts)
+        if not cohorts:
+            raise CommandError('No cohorts to export')
+
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_cohort_archive(cohorts, workers=options['workers']):
+                output.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Exported {len(cohorts)} cohort(s) to {options["output"]}'))
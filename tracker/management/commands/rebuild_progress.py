@@ -0,0 +1,37 @@
+"""
+Rebuild the materialized TraineeProgress table and Trainee.completion_bits from SignOff data.
+
+Both are maintained automatically by signals; run this after bulk imports,
+raw SQL edits or restoring a database backup.
+
+Usage:
+    python manage.py rebuild_progress
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.models import Trainee, TraineeProgress
+
+
+class Command(BaseCommand):
+    help = 'Recalculate completed task counts, percentages and completion bitsets for every trainee'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of trainees recalculated per query batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        count = TraineeProgress.recalculate_all(batch_size=batch_size)
+
+        trainee_ids = list(Trainee.objects.values_list('id', flat=True))
+        with transaction.atomic():
+            for start in range(0, len(trainee_ids), batch_size):
+                Trainee.recalculate_completion_bits(trainee_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt progress for {count} trainee(s)'))
@@ -0,0 +1,54 @@
+"""
+Promote advanced staff whose orientation is complete from 'badging_in_progress'
+to 'ready_to_issue'.
+
+Promotion normally happens when a trainee's last task is signed off (see
+TraineeProgress.recalculate); run this to backfill after upgrading, after
+rebuild_progress or raw imports, or when a trainee is reactivated.
+
+Usage:
+    python manage.py reconcile_badge_status
+    python manage.py reconcile_badge_status --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.models import AdvancedStaff, Trainee, TraineeProgress
+from tracker.registry import task_registry
+from tracker.utils import normalize_badge_for_advanced
+
+
+class Command(BaseCommand):
+    help = "Promote 'badging_in_progress' advanced staff whose matching trainee has completed every task"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the staff that would be promoted without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        snapshot = task_registry.snapshot()
+        completed_badges = [
+            badge_number
+            for badge_number, curriculum_id, completed_count in Trainee.objects.filter(
+                is_active=True
+            ).values_list('badge_number', 'cohort__curriculum_id', 'progress__completed_count')
+            if TraineeProgress.is_complete(completed_count or 0, snapshot.total_for(curriculum_id))
+        ]
+
+        if options['dry_run']:
+            pending = AdvancedStaff.objects.filter(
+                badge_status='badging_in_progress',
+                badge_number__in={normalize_badge_for_advanced(badge) for badge in completed_badges},
+            ).values_list('badge_number', flat=True)
+            for badge_number in pending:
+                self.stdout.write(f'Would promote {badge_number}')
+            self.stdout.write(self.style.SUCCESS(f'{len(pending)} staff would be promoted'))
+            return
+
+        with transaction.atomic():
+            count = AdvancedStaff.promote_ready_to_issue(completed_badges)
+        self.stdout.write(self.style.SUCCESS(f'Promoted {count} staff to ready_to_issue'))
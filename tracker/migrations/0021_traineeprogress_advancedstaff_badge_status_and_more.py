@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0020_alter_advancedtraining_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TraineeProgress',
+            fields=[
+                ('trainee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='tracker.trainee')),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('percentage', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Trainee Progress',
+                'verbose_name_plural': 'Trainee Progress',
+            },
+        ),
+        migrations.AddField(
+            model_name='advancedstaff',
+            name='badge_status',
+            field=models.CharField(choices=[('badging_in_progress', 'Badging in Progress'), ('ready_to_issue', 'Ready to Issue Badge'), ('issued_active', 'Issued Badge/Active'), ('terminated', 'Terminated Access'), ('onboarding_halted', 'Onboarding Halted')], db_index=True, default='badging_in_progress', help_text='Current badge issuance status', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='trainee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
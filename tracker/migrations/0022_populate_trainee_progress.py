@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:15
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def populate_trainee_progress(apps, schema_editor):
+    """Create a TraineeProgress row for every existing trainee"""
+    Trainee = apps.get_model('tracker', 'Trainee')
+    Task = apps.get_model('tracker', 'Task')
+    SignOff = apps.get_model('tracker', 'SignOff')
+    TraineeProgress = apps.get_model('tracker', 'TraineeProgress')
+
+    total_tasks = Task.objects.filter(is_active=True).count()
+    completed = dict(
+        SignOff.objects.filter(task__is_active=True)
+        .values('trainee_id')
+        .annotate(completed=Count('task', distinct=True))
+        .values_list('trainee_id', 'completed')
+    )
+
+    records = []
+    for trainee_id in Trainee.objects.values_list('id', flat=True):
+        completed_count = completed.get(trainee_id, 0)
+        percentage = round((completed_count / total_tasks) * 100, 1) if total_tasks else 0
+        records.append(TraineeProgress(
+            trainee_id=trainee_id,
+            completed_count=completed_count,
+            percentage=percentage,
+        ))
+    TraineeProgress.objects.bulk_create(records, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0021_traineeprogress_advancedstaff_badge_status_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_trainee_progress, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0022_populate_trainee_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='slot',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Bit position in Trainee.completion_bits (assigned automatically)', null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='trainee',
+            name='completion_bits',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Bitmask of signed-off tasks keyed by Task.slot (maintained automatically)'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-16 21:02
+
+from django.db import migrations
+
+
+MAX_SLOTS = 63
+
+
+def populate_task_slots(apps, schema_editor):
+    """Assign bitset slots to existing tasks and build each trainee's completion bits"""
+    Task = apps.get_model('tracker', 'Task')
+    Trainee = apps.get_model('tracker', 'Trainee')
+    SignOff = apps.get_model('tracker', 'SignOff')
+
+    slots = {}
+    for slot, task in enumerate(Task.objects.order_by('order')[:MAX_SLOTS]):
+        task.slot = slot
+        task.save(update_fields=['slot'])
+        slots[task.id] = slot
+
+    bits = {}
+    for trainee_id, task_id in SignOff.objects.values_list('trainee_id', 'task_id'):
+        if task_id in slots:
+            bits[trainee_id] = bits.get(trainee_id, 0) | (1 << slots[task_id])
+
+    trainees = [Trainee(pk=trainee_id, completion_bits=value) for trainee_id, value in bits.items()]
+    Trainee.objects.bulk_update(trainees, ['completion_bits'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0023_task_slot_trainee_completion_bits'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_task_slots, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:10
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def populate_cohort_dates(apps, schema_editor):
+    """Store each cohort's semester date range (Spring Jan-Jun, Fall Jul-Dec)"""
+    Cohort = apps.get_model('tracker', 'Cohort')
+    cohorts = list(Cohort.objects.all())
+    for cohort in cohorts:
+        if cohort.semester == 'Spring':
+            cohort.start_date, cohort.end_date = date(cohort.year, 1, 1), date(cohort.year, 6, 30)
+        else:
+            cohort.start_date, cohort.end_date = date(cohort.year, 7, 1), date(cohort.year, 12, 31)
+    Cohort.objects.bulk_update(cohorts, ['start_date', 'end_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0024_populate_task_slots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cohort',
+            name='start_date',
+            field=models.DateField(editable=False, null=True, help_text='Derived from year and semester'),
+        ),
+        migrations.AddField(
+            model_name='cohort',
+            name='end_date',
+            field=models.DateField(editable=False, null=True, help_text='Derived from year and semester'),
+        ),
+        migrations.RunPython(populate_cohort_dates, reverse_code=migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cohort',
+            name='start_date',
+            field=models.DateField(editable=False, help_text='Derived from year and semester'),
+        ),
+        migrations.AlterField(
+            model_name='cohort',
+            name='end_date',
+            field=models.DateField(editable=False, help_text='Derived from year and semester'),
+        ),
+        migrations.AddIndex(
+            model_name='cohort',
+            index=models.Index(fields=['start_date', 'end_date'], name='cohort_date_range_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0025_cohort_start_date_end_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='prerequisites',
+            field=models.ManyToManyField(blank=True, help_text='Tasks that must be completed before this one', related_name='dependent_tasks', to='tracker.task'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0026_task_prerequisites'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Curriculum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, max_length=10000)),
+                ('tasks', models.ManyToManyField(blank=True, help_text='Tasks trainees in cohorts using this curriculum must complete', related_name='curricula', to='tracker.task')),
+            ],
+            options={
+                'verbose_name_plural': 'Curricula',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='cohort',
+            name='curriculum',
+            field=models.ForeignKey(blank=True, help_text='Task set for this cohort (leave empty to use every active task)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cohorts', to='tracker.curriculum'),
+        ),
+    ]
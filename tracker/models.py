@@ -1,6 +1,7 @@
 from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from datetime import date
 
 class Cohort(models.Model):
@@ -24,37 +25,44 @@ class Cohort(models.Model):
         db_index=True,
         help_text="Manually set this cohort as current (overrides automatic detection)"
     )
+    start_date = models.DateField(editable=False, help_text="Derived from year and semester")
+    end_date = models.DateField(editable=False, help_text="Derived from year and semester")
+    curriculum = models.ForeignKey(
+        'Curriculum',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cohorts',
+        help_text="Task set for this cohort (leave empty to use every active task)"
+    )
 
     class Meta:
         ordering = ['-year', '-semester_order']  # Year descending, then Fall before Spring
         unique_together = ['year', 'semester']
         indexes = [
             models.Index(fields=['-year', '-semester_order'], name='cohort_year_semester_idx'),
+            models.Index(fields=['start_date', 'end_date'], name='cohort_date_range_idx'),
         ]
 
     def save(self, *args, **kwargs):
-        """Auto-set semester_order based on semester"""
+        """Auto-set semester_order and the stored date range based on year and semester"""
         self.semester_order = self.SEMESTER_ORDER.get(self.semester, 1)
+        self.start_date, self.end_date = self.semester_dates(self.year, self.semester)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'year', 'semester'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'semester_order', 'start_date', 'end_date'}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
-    @property
-    def start_date(self):
-        """Calculate cohort start date based on semester"""
-        if self.semester == 'Spring':
-            return date(self.year, 1, 1)
+    @staticmethod
+    def semester_dates(year, semester):
+        """(start, end) dates of a semester: Spring is Jan-Jun, Fall is Jul-Dec"""
+        if semester == 'Spring':
+            return date(year, 1, 1), date(year, 6, 30)
         else:  # Fall
-            return date(self.year, 7, 1)
-
-    @property
-    def end_date(self):
-        """Calculate cohort end date based on semester"""
-        if self.semester == 'Spring':
-            return date(self.year, 6, 30)
-        else:  # Fall
-            return date(self.year, 12, 31)
+            return date(year, 7, 1), date(year, 12, 31)
 
     def is_current(self):
         """Check if this cohort is current based on today's date"""
@@ -63,21 +71,49 @@ class Cohort(models.Model):
 
     @classmethod
     def get_current_cohort(cls):
-        """Get the current cohort (override takes precedence)"""
-        # Check for manual override first
-        override = cls.objects.filter(is_current_override=True).first()
-        if override:
-            return override
+        """
+        Get the current cohort (override takes precedence).
 
-        # Auto-detect based on today's date
-        today = date.today()
-        for cohort in cls.objects.all():
-            if cohort.is_current():
-                return cohort
+        Resolved with one range query on the indexed start/end dates and
+        memoized for the rest of the day (see registry.current_cohort_cache).
+        """
+        from .registry import current_cohort_cache
+        return current_cohort_cache.get()
+
+    @classmethod
+    def resolve_current_cohort(cls, today=None):
+        """Uncached lookup used by the cache: override, then date range, then most recent"""
+        today = today or date.today()
+        current = cls.objects.filter(
+            models.Q(is_current_override=True) |
+            models.Q(start_date__lte=today, end_date__gte=today)
+        ).order_by('-is_current_override', '-year', '-semester_order').first()
+        if current:
+            return current
 
         # If no current cohort found, return the most recent one
         return cls.objects.first()
 
+class TraineeQuerySet(models.QuerySet):
+    """Trainee queries that use the completion_bits bitset instead of joining SignOff"""
+
+    def _filter_by_task(self, task, completed):
+        if task.slot is None:
+            # Tasks beyond the bitset capacity fall back to an (anti-)join
+            signed = models.Exists(SignOff.objects.filter(trainee=models.OuterRef('pk'), task=task))
+            return self.filter(signed if completed else ~signed)
+        qs = self.alias(task_bit=models.F('completion_bits').bitand(task.bit))
+        return qs.exclude(task_bit=0) if completed else qs.filter(task_bit=0)
+
+    def missing_task(self, task):
+        """Trainees who have not signed off ``task``"""
+        return self._filter_by_task(task, completed=False)
+
+    def completed_task(self, task):
+        """Trainees who have signed off ``task``"""
+        return self._filter_by_task(task, completed=True)
+
+
 class Trainee(models.Model):
     badge_number = models.CharField(max_length=20, unique=True, db_index=True)
     first_name = models.CharField(max_length=100, db_index=True)
@@ -86,6 +122,13 @@ class Trainee(models.Model):
     date_added = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, db_index=True)
+    completion_bits = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bitmask of signed-off tasks keyed by Task.slot (maintained automatically)"
+    )
+
+    objects = TraineeQuerySet.as_manager()
 
     class Meta:
         ordering = ['badge_number']
@@ -101,16 +144,59 @@ class Trainee(models.Model):
     def full_name(self):
         return f"{self.last_name}, {self.first_name}"
 
+    def get_progress_record(self):
+        """
+        Return the materialized TraineeProgress row for this trainee.
+
+        Reads the cached relation when the queryset used select_related('progress'),
+        so list views pay no extra queries. Missing rows are rebuilt on demand.
+        """
+        try:
+            return self.progress
+        except TraineeProgress.DoesNotExist:
+            TraineeProgress.recalculate([self.pk])
+            return TraineeProgress.objects.get(trainee_id=self.pk)
+
     def get_progress_percentage(self):
-        """Calculate percentage of tasks completed"""
-        total_tasks = Task.objects.filter(is_active=True).count()
-        if total_tasks == 0:
-            return 0
-        completed_tasks = SignOff.objects.filter(trainee=self).values('task').distinct().count()
-        return round((completed_tasks / total_tasks) * 100, 1)
+        """Percentage of the cohort curriculum's active tasks completed (read from TraineeProgress)"""
+        return self.get_progress_record().percentage
+
+    def get_completed_task_count(self):
+        """Number of the cohort curriculum's active tasks completed (read from TraineeProgress)"""
+        return self.get_progress_record().completed_count
+
+    def has_completed(self, task):
+        """Check a sign-off using the bitset (no query for tasks that have a slot)"""
+        if task.slot is None:
+            return self.signoffs.filter(task=task).exists()
+        return bool(self.completion_bits & task.bit)
+
+    def count_completed(self, slot_mask):
+        """Popcount of completed tasks within ``slot_mask`` (see Task.active_slot_mask)"""
+        return bin(self.completion_bits & slot_mask).count('1')
+
+    @classmethod
+    def recalculate_completion_bits(cls, trainee_ids):
+        """Rebuild completion_bits for the given trainees from SignOff rows (two queries)"""
+        bits = dict.fromkeys(set(trainee_ids), 0)
+        if not bits:
+            return
+        rows = SignOff.objects.filter(
+            trainee_id__in=bits.keys(), task__slot__isnull=False
+        ).values_list('trainee_id', 'task__slot')
+        for trainee_id, slot in rows:
+            bits[trainee_id] |= 1 << slot
+        cls.objects.bulk_update(
+            [cls(pk=trainee_id, completion_bits=value) for trainee_id, value in bits.items()],
+            ['completion_bits'],
+            batch_size=500,
+        )
 
 
 class Task(models.Model):
+    # Bit positions available in Trainee.completion_bits (signed 64-bit column)
+    MAX_SLOTS = 63
+
     order = models.IntegerField(unique=True, db_index=True, help_text="Display order (must be unique)")
     name = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True, max_length=10000)
@@ -130,6 +216,20 @@ class Task(models.Model):
         related_name='authorized_tasks',
         help_text="Specific staff members authorized to sign off this task. Leave empty to allow all staff."
     )
+    prerequisites = models.ManyToManyField(
+        'self',
+        symmetrical=False,
+        related_name='dependent_tasks',
+        blank=True,
+        help_text="Tasks that must be completed before this one"
+    )
+    slot = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        help_text="Bit position in Trainee.completion_bits (assigned automatically)"
+    )
 
     class Meta:
         ordering = ['order']
@@ -143,11 +243,113 @@ class Task(models.Model):
 
     def can_user_sign_off(self, user):
         """Check if a user is authorized to sign off this task"""
-        # If no specific signers are set, any authenticated staff can sign off
-        if not self.authorized_signers.exists():
-            return True
-        # Otherwise, check if user is in the authorized list
-        return self.authorized_signers.filter(id=user.id).exists()
+        # If no specific signers are set, any authenticated staff can sign off.
+        # Answered from the cached per-user index (see permissions.py).
+        from .permissions import permission_index
+        return permission_index.for_user(user).can_sign_task(self.pk)
+
+    @property
+    def bit(self):
+        """Mask for this task in Trainee.completion_bits (0 if it has no slot)"""
+        return 1 << self.slot if self.slot is not None else 0
+
+    @classmethod
+    def next_free_slot(cls):
+        """Lowest unused slot, or None when all MAX_SLOTS are taken"""
+        used = set(cls.objects.filter(slot__isnull=False).values_list('slot', flat=True))
+        for slot in range(cls.MAX_SLOTS):
+            if slot not in used:
+                return slot
+        return None
+
+    @classmethod
+    def active_slot_mask(cls):
+        """Bitmask covering every active task that has a slot (from the task registry)"""
+        from .registry import task_registry
+        return task_registry.snapshot().slot_mask
+
+    @staticmethod
+    def creates_prerequisite_loop(links):
+        """
+        True if adding the (task_id, prerequisite_id) pairs in ``links`` makes a task require itself.
+
+        Every prerequisite link is followed, active or not, so a loop through an
+        inactive task is caught before that task is reactivated.
+        """
+        from collections import defaultdict
+
+        direct = defaultdict(set)
+        rows = Task.prerequisites.through.objects.values_list('from_task_id', 'to_task_id')
+        for task_id, prerequisite_id in [*rows, *links]:
+            direct[task_id].add(prerequisite_id)
+
+        for task_id in {task_id for task_id, _ in links}:
+            seen = set()
+            stack = list(direct[task_id])
+            while stack:
+                prerequisite_id = stack.pop()
+                if prerequisite_id == task_id:
+                    return True
+                if prerequisite_id not in seen:
+                    seen.add(prerequisite_id)
+                    stack.extend(direct[prerequisite_id])
+        return False
+
+    @staticmethod
+    def _order_offset(*extra_orders):
+        """Offset that moves every current (and given) order above all of them"""
+        bounds = Task.objects.aggregate(low=models.Min('order'), high=models.Max('order'))
+        orders = [o for o in (bounds['low'], bounds['high'], *extra_orders) if o is not None]
+        if not orders:
+            return 1
+        return max(orders) - min(min(orders), 0) + 1
+
+    def _shift_orders_from(self, position):
+        """
+        Shift every other task at or after ``position`` up by 1 in two statements.
+
+        The unique constraint on order is checked row by row, so the rows
+        (and this task's old row) are first moved above every existing order,
+        then brought back down to their original order + 1.
+        """
+        offset = self._order_offset()
+        shifting = models.Q(order__gte=position)
+        if self.pk:
+            shifting |= models.Q(pk=self.pk)
+        Task.objects.filter(shifting).update(order=models.F('order') + offset)
+        Task.objects.filter(order__gte=position + offset).exclude(pk=self.pk).update(
+            order=models.F('order') - offset + 1
+        )
+
+    @classmethod
+    @transaction.atomic
+    def apply_order(cls, task_ids):
+        """
+        Renumber tasks 1..n following ``task_ids`` (which must list every task).
+
+        Runs a constant number of statements regardless of catalog size: a
+        move into a free range above every order, then one CASE update.
+        Raises ValueError if ``task_ids`` is not exactly the set of task ids.
+        """
+        task_ids = [int(task_id) for task_id in task_ids]
+        existing = set(cls.objects.order_by().values_list('pk', flat=True))
+        if len(task_ids) != len(set(task_ids)) or set(task_ids) != existing:
+            raise ValueError('task_ids must list every task exactly once')
+        if not task_ids:
+            return 0
+
+        offset = cls._order_offset(len(task_ids))
+        cls.objects.update(order=models.F('order') + offset)
+        cls.objects.update(order=models.Case(
+            *[models.When(pk=task_id, then=models.Value(position))
+              for position, task_id in enumerate(task_ids, start=1)],
+            output_field=models.IntegerField(),
+        ))
+
+        # update() skips post_save, so refresh the cached catalog explicitly
+        from .registry import task_registry
+        task_registry.invalidate()
+        return len(task_ids)
 
     @transaction.atomic
     def save(self, *args, **kwargs):
@@ -159,13 +361,16 @@ class Task(models.Model):
                 old_task = Task.objects.get(pk=self.pk)
                 order_changed = old_task.order != self.order
                 old_order = old_task.order
+                activation_changed = old_task.is_active != self.is_active
             except Task.DoesNotExist:
                 order_changed = False
                 old_order = None
+                activation_changed = self.is_active
         else:
             # New task
             order_changed = True
             old_order = None
+            activation_changed = self.is_active
 
         if order_changed:
             # Check if there's already a task at this order position
@@ -173,17 +378,77 @@ class Task(models.Model):
 
             if conflict_exists:
                 # Only shift if there's an actual conflict
-                # Temporarily move existing task to a safe position to avoid conflicts
-                if old_order is not None:
-                    Task.objects.filter(pk=self.pk).update(order=999999)
+                self._shift_orders_from(self.order)
 
-                # Shift all tasks at or after this position up by 1
-                tasks_to_shift = Task.objects.filter(order__gte=self.order).exclude(pk=self.pk).order_by('-order')
-                for task in tasks_to_shift:
-                    Task.objects.filter(pk=task.pk).update(order=task.order + 1)
+        # Give the task a bitset slot (tasks created while all slots were taken retry here)
+        slot_assigned = False
+        if self.slot is None:
+            self.slot = Task.next_free_slot()
+            slot_assigned = self.slot is not None and old_order is not None
 
         super().save(*args, **kwargs)
 
+        # Existing sign-offs of a task that just received a slot need their bit set
+        if slot_assigned:
+            Trainee.objects.filter(signoffs__task=self).update(
+                completion_bits=models.F('completion_bits').bitor(self.bit)
+            )
+
+        # Adding, activating or deactivating a task changes every trainee's denominator
+        if activation_changed:
+            TraineeProgress.recalculate_all()
+
+
+class Curriculum(models.Model):
+    """Named set of tasks assigned to cohorts (cohorts without one use every active task)"""
+    name = models.CharField(max_length=100, unique=True)
+    description = models.TextField(blank=True, max_length=10000)
+    tasks = models.ManyToManyField(
+        Task,
+        blank=True,
+        related_name='curricula',
+        help_text="Tasks trainees in cohorts using this curriculum must complete"
+    )
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'Curricula'
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def unmet_prerequisites(task_ids, member_ids, extra_links=()):
+        """
+        Ids of tasks that ``task_ids`` require (directly or indirectly) but are not in ``member_ids``.
+
+        A curriculum must contain every prerequisite of its tasks, or trainees of
+        its cohorts could never unlock them. Every prerequisite link is followed,
+        active or not, so reactivating a task cannot break a curriculum.
+        ``extra_links`` are (task_id, prerequisite_id) pairs about to be added.
+        """
+        from collections import defaultdict
+
+        direct = defaultdict(set)
+        rows = Task.prerequisites.through.objects.values_list('from_task_id', 'to_task_id')
+        for task_id, prerequisite_id in [*rows, *extra_links]:
+            direct[task_id].add(prerequisite_id)
+
+        member_ids = set(member_ids)
+        required = set()
+        stack = list(task_ids)
+        while stack:
+            for prerequisite_id in direct[stack.pop()]:
+                if prerequisite_id not in required:
+                    required.add(prerequisite_id)
+                    stack.append(prerequisite_id)
+        return required - member_ids
+
+    @staticmethod
+    def unmet_prerequisites_message(curriculum_name, missing_ids):
+        names = ', '.join(Task.objects.filter(id__in=missing_ids).order_by('order').values_list('name', flat=True))
+        return f'Curriculum "{curriculum_name}" must also include these prerequisite tasks: {names}.'
+
 
 class SignOff(models.Model):
     # Score validator: allows decimal numbers like "95", "95.5", "100.00"
@@ -257,6 +522,132 @@ class UnsignLog(models.Model):
         return f"Unsigned: {self.trainee.badge_number} - {self.task.name} by {self.unsigned_by}"
 
 
+class TraineeProgress(models.Model):
+    """
+    Materialized progress for a trainee (completed active tasks of their cohort's
+    curriculum, and percentage).
+
+    Maintained transactionally by the SignOff/Task signals in signals.py so that
+    list views can read progress through select_related('progress') instead of
+    running COUNT queries per row. Rebuild with `manage.py rebuild_progress`.
+
+    updated_at moves whenever the trainee's sign-offs change (including bulk
+    writes, which set it explicitly), so it doubles as the change watermark
+    for the delta-sync endpoint (see changes.py).
+
+    recalculate() also promotes the matching AdvancedStaff record to
+    'ready_to_issue' when an active trainee completes every task, in the same
+    transaction as the sign-off that completed it.
+    """
+    trainee = models.OneToOneField(
+        Trainee,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='progress'
+    )
+    completed_count = models.PositiveIntegerField(default=0)
+    percentage = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Trainee Progress'
+        verbose_name_plural = 'Trainee Progress'
+
+    def __str__(self):
+        return f"{self.trainee_id}: {self.percentage}%"
+
+    @staticmethod
+    def calculate_percentage(completed_count, total_tasks):
+        """Percentage rounded to one decimal place (0 when there are no active tasks)"""
+        if total_tasks == 0:
+            return 0
+        return round((completed_count / total_tasks) * 100, 1)
+
+    @classmethod
+    def recalculate(cls, trainee_ids, create_missing=True):
+        """
+        Recompute progress rows for the given trainees in a constant number of queries.
+
+        Args:
+            trainee_ids: Iterable of Trainee primary keys
+            create_missing: Create rows for trainees that don't have one yet. Disabled
+                from delete signals, where the trainee itself may be mid-deletion.
+        """
+        from .registry import task_registry
+
+        trainee_ids = set(trainee_ids)
+        if not trainee_ids:
+            return
+
+        # Each trainee is measured against their cohort's curriculum (cached task-id sets)
+        snapshot = task_registry.snapshot()
+        curriculum_by_trainee = {}
+        active_badges = {}
+        for trainee_id, curriculum_id, badge_number, is_active in Trainee.objects.filter(
+            id__in=trainee_ids
+        ).values_list('id', 'cohort__curriculum_id', 'badge_number', 'is_active'):
+            curriculum_by_trainee[trainee_id] = curriculum_id
+            if is_active:
+                active_badges[trainee_id] = badge_number
+        completed = dict.fromkeys(curriculum_by_trainee, 0)
+        rows = SignOff.objects.filter(
+            trainee_id__in=trainee_ids, task__is_active=True
+        ).values_list('trainee_id', 'task_id').distinct()
+        for trainee_id, task_id in rows:
+            if task_id in snapshot.task_id_set_for(curriculum_by_trainee.get(trainee_id)):
+                completed[trainee_id] = completed.get(trainee_id, 0) + 1
+
+        def percentage(trainee_id):
+            total_tasks = snapshot.total_for(curriculum_by_trainee.get(trainee_id))
+            return cls.calculate_percentage(completed.get(trainee_id, 0), total_tasks)
+
+        existing = {p.trainee_id: p for p in cls.objects.filter(trainee_id__in=trainee_ids)}
+        to_update = []
+        now = timezone.now()
+        for trainee_id, record in existing.items():
+            record.completed_count = completed.get(trainee_id, 0)
+            record.percentage = percentage(trainee_id)
+            # bulk_update skips auto_now
+            record.updated_at = now
+            to_update.append(record)
+        if to_update:
+            cls.objects.bulk_update(to_update, ['completed_count', 'percentage', 'updated_at'])
+
+        if create_missing:
+            cls.objects.bulk_create([
+                cls(
+                    trainee_id=trainee_id,
+                    completed_count=completed.get(trainee_id, 0),
+                    percentage=percentage(trainee_id),
+                )
+                for trainee_id in curriculum_by_trainee.keys() - existing.keys()
+            ])
+
+        AdvancedStaff.promote_ready_to_issue(
+            badge_number for trainee_id, badge_number in active_badges.items()
+            if cls.is_complete(completed.get(trainee_id, 0), snapshot.total_for(curriculum_by_trainee[trainee_id]))
+        )
+
+    @staticmethod
+    def is_complete(completed_count, total_tasks):
+        """Every active task signed off (exact count, not the rounded percentage)"""
+        return total_tasks > 0 and completed_count >= total_tasks
+
+    @classmethod
+    def touch(cls, trainee_ids):
+        """Mark trainees as changed (sign-off edits that leave progress as it is)"""
+        cls.objects.filter(trainee_id__in=set(trainee_ids)).update(updated_at=timezone.now())
+
+    @classmethod
+    @transaction.atomic
+    def recalculate_all(cls, batch_size=500):
+        """Recompute progress for every trainee (used on task changes and by rebuild_progress)"""
+        trainee_ids = list(Trainee.objects.values_list('id', flat=True))
+        for start in range(0, len(trainee_ids), batch_size):
+            cls.recalculate(trainee_ids[start:start + batch_size])
+        return len(trainee_ids)
+
+
 # ============================================================================
 # Advanced Training Models
 # ============================================================================
@@ -316,6 +707,21 @@ class AdvancedStaff(models.Model):
     def full_name(self):
         return self.get_full_name()
 
+    @classmethod
+    def promote_ready_to_issue(cls, trainee_badges):
+        """
+        Move 'badging_in_progress' staff matching the given (completed) trainee
+        badges to 'ready_to_issue' in a single UPDATE. Returns the number promoted.
+        """
+        from .utils import normalize_badge_for_advanced
+
+        badges = {normalize_badge_for_advanced(badge) for badge in trainee_badges if badge}
+        if not badges:
+            return 0
+        return cls.objects.filter(
+            badge_status='badging_in_progress', badge_number__in=badges
+        ).update(badge_status='ready_to_issue')
+
 
 class AdvancedTrainingType(models.Model):
     """Types of advanced training (KP, Escort, ExpSamp, Other)"""
@@ -344,11 +750,10 @@ class AdvancedTrainingType(models.Model):
 
     def can_user_sign_off(self, user):
         """Check if a user is authorized to sign off this training type"""
-        # If no specific signers are set, any authenticated staff can sign off
-        if not self.authorized_signers.exists():
-            return True
-        # Otherwise, check if user is in the authorized list
-        return self.authorized_signers.filter(id=user.id).exists()
+        # If no specific signers are set, any authenticated staff can sign off.
+        # Answered from the cached per-user index (see permissions.py).
+        from .permissions import permission_index
+        return permission_index.for_user(user).can_sign_advanced(self.pk)
 
 
 class AdvancedTraining(models.Model):
@@ -0,0 +1,131 @@
+"""
+Keyset (cursor) pagination for the trainee lists and archive search.
+
+OFFSET pagination gets slower the further one pages, and a COUNT(*) over an
+icontains search scans the whole table. A keyset page instead filters on the
+sort key of the last row shown, so every page costs one indexed query of
+page_size + 1 rows no matter how large the archive grows:
+
+    page = paginate(trainees, ('badge_number',), request.GET, settings.TRAINEE_PAGE_SIZE)
+    page.items          # this page's rows, in key order
+    page.next_query     # query string for the next page ('' if none)
+    page.prev_query     # query string for the previous page ('' if none)
+
+Keys are field lookups sorted ascending and must identify a row uniquely
+(end with badge_number). Cursors are the key values of the boundary row,
+JSON-encoded in URL-safe base64 and carried in ``?after=`` / ``?before=``.
+Other query parameters (filters, search terms) are kept in the page links.
+An unreadable cursor falls back to the first page.
+"""
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of rows plus the query strings of its neighbours."""
+
+    def __init__(self, items, next_query='', prev_query=''):
+        self.items = items
+        self.next_query = next_query
+        self.prev_query = prev_query
+
+    @property
+    def has_next(self):
+        return bool(self.next_query)
+
+    @property
+    def has_prev(self):
+        return bool(self.prev_query)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_prev
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """Key values from a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+def _key_values(item, keys):
+    values = []
+    for key in keys:
+        value = item
+        for attr in key.split('__'):
+            value = getattr(value, attr)
+        values.append(value)
+    return values
+
+
+def _beyond(keys, values, op):
+    """Rows strictly after (op='gt') or before (op='lt') ``values`` in key order."""
+    conditions = []
+    for index, key in enumerate(keys):
+        equal = {earlier: value for earlier, value in zip(keys[:index], values[:index])}
+        conditions.append(Q(**equal, **{f'{key}__{op}': values[index]}))
+    return reduce(or_, conditions)
+
+
+def _query(params, **cursor):
+    query = params.copy()
+    for name in ('after', 'before'):
+        query.pop(name, None)
+    for name, value in cursor.items():
+        query[name] = value
+    return query.urlencode()
+
+
+def paginate(queryset, keys, params, page_size):
+    """Return the KeysetPage selected by ``params`` (a QueryDict, usually request.GET)."""
+    keys = tuple(keys)
+    after = decode_cursor(params.get('after'), len(keys))
+    before = None if after is not None else decode_cursor(params.get('before'), len(keys))
+
+    if before is not None:
+        # Walk backwards from the cursor, then restore ascending order
+        rows = list(
+            queryset.filter(_beyond(keys, before, 'lt')).order_by(*(f'-{key}' for key in keys))[:page_size + 1]
+        )
+        has_prev = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            queryset = queryset.filter(_beyond(keys, after, 'gt'))
+        rows = list(queryset.order_by(*keys)[:page_size + 1])
+        has_next = len(rows) > page_size
+        items = rows[:page_size]
+        has_prev = after is not None
+
+    next_query = prev_query = ''
+    if items and has_next:
+        next_query = _query(params, after=encode_cursor(_key_values(items[-1], keys)))
+    if items and has_prev:
+        prev_query = _query(params, before=encode_cursor(_key_values(items[0], keys)))
+    elif has_prev:
+        prev_query = _query(params)
+    return KeysetPage(items, next_query, prev_query)
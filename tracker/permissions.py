@@ -0,0 +1,140 @@
+"""
+Per-user authorization index for sign-off permissions.
+
+Every sign-off path asks the same questions: does the user have a staff
+profile that may sign off, which tasks and advanced training types may they
+sign, and do they hold ``tracker.manage_advanced_training``. The answers are
+loaded once per user into an immutable ``UserPermissions`` snapshot and then
+checked with set lookups instead of two queries per task.
+
+Usage:
+    from .permissions import permissions_for
+
+    perms = permissions_for(request)        # memoized on the request
+    perms.can_sign_task(task.id)
+    perms.can_sign_advanced(training_type.id)
+    perms.can_manage_advanced
+
+Snapshots are also kept process-wide. signals.py invalidates them on
+authorized_signers, group and permission m2m changes and on User or
+StaffProfile saves; as with the task registry, an invalidation inside a
+transaction is repeated on commit.
+"""
+
+from .invalidation import CommitInvalidatedCache
+
+
+class UserPermissions:
+    """Immutable sign-off permissions of one user at one index version."""
+
+    def __init__(self, version, user_id, is_superuser=False, is_staff=False,
+                 staff_profile_status=None, can_manage_advanced=False,
+                 task_signers=(), advanced_signers=()):
+        self.version = version
+        self.user_id = user_id
+        self.is_superuser = is_superuser
+        self.is_staff = is_staff
+        # None = no staff profile, otherwise StaffProfile.can_sign_off
+        self.staff_profile_status = staff_profile_status
+        self.can_manage_advanced = can_manage_advanced
+
+        self.restricted_task_ids, self.signable_task_ids = self._split(task_signers, user_id)
+        self.restricted_advanced_ids, self.signable_advanced_ids = self._split(advanced_signers, user_id)
+
+    @staticmethod
+    def _split(signer_rows, user_id):
+        """(ids with any authorized signer, ids this user is authorized for)"""
+        restricted = set()
+        allowed = set()
+        for object_id, signer_id in signer_rows:
+            restricted.add(object_id)
+            if signer_id == user_id:
+                allowed.add(object_id)
+        return frozenset(restricted), frozenset(allowed)
+
+    @property
+    def has_staff_profile(self):
+        return self.staff_profile_status is not None
+
+    @property
+    def can_sign_off(self):
+        """True if the user's staff profile allows signing off at all"""
+        return bool(self.staff_profile_status)
+
+    def can_sign_task(self, task_id):
+        """Same rule as Task.can_user_sign_off: no signers listed means any staff"""
+        return task_id not in self.restricted_task_ids or task_id in self.signable_task_ids
+
+    def can_sign_advanced(self, training_type_id):
+        """Same rule as AdvancedTrainingType.can_user_sign_off"""
+        return (
+            training_type_id not in self.restricted_advanced_ids
+            or training_type_id in self.signable_advanced_ids
+        )
+
+
+class PermissionIndex(CommitInvalidatedCache):
+    """Process-wide cache of UserPermissions keyed by user id."""
+
+    def __init__(self):
+        super().__init__()
+        self._entries = {}
+
+    def for_user(self, user):
+        """Return the user's snapshot, building it if missing or stale."""
+        if not getattr(user, 'is_authenticated', False):
+            return UserPermissions(self._version, None)
+
+        if self._pending():
+            version = self._version
+            return self._uncommitted(user.pk, lambda: self._build(version, user))
+
+        entry = self._entries.get(user.pk)
+        if entry is not None and entry.version == self._version:
+            return entry
+
+        version = self._version
+        entry = self._build(version, user)
+        with self._lock:
+            if version == self._version:
+                self._entries[user.pk] = entry
+        return entry
+
+    def _clear(self):
+        self._entries = {}
+
+    @staticmethod
+    def _build(version, user):
+        from .models import AdvancedTrainingType, StaffProfile, Task
+
+        staff_profile_status = (
+            StaffProfile.objects.filter(user_id=user.pk)
+            .values_list('can_sign_off', flat=True)
+            .first()
+        )
+        task_signers = Task.authorized_signers.through.objects.values_list('task_id', 'user_id')
+        advanced_signers = AdvancedTrainingType.authorized_signers.through.objects.values_list(
+            'advancedtrainingtype_id', 'user_id'
+        )
+        return UserPermissions(
+            version,
+            user.pk,
+            is_superuser=user.is_superuser,
+            is_staff=user.is_staff,
+            staff_profile_status=staff_profile_status,
+            can_manage_advanced=user.is_superuser or user.has_perm('tracker.manage_advanced_training'),
+            task_signers=task_signers,
+            advanced_signers=advanced_signers,
+        )
+
+
+permission_index = PermissionIndex()
+
+
+def permissions_for(request):
+    """The request user's permissions, computed at most once per request."""
+    perms = getattr(request, '_tracker_permissions', None)
+    if perms is None or perms.user_id != getattr(request.user, 'pk', None):
+        perms = permission_index.for_user(request.user)
+        request._tracker_permissions = perms
+    return perms
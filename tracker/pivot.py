@@ -0,0 +1,192 @@
+"""
+Staff x training-type pivot for the advanced training grids and export.
+
+One GROUP BY query over staff LEFT JOIN trainings turns every (training type,
+slot) into a set of flat columns with conditional aggregation
+(``MAX(CASE WHEN type = t THEN completion_date END)`` and so on), so pages
+render from one row per staff member instead of regrouping trainings in
+Python:
+
+    pivot = TrainingPivot(staff_queryset, training_types)
+    for row in pivot.rows():
+        row.badge_number, row.get_full_name()
+        for cell in row.cells:              # one per training type, in the given order
+            cell.training_type
+            for training in cell.trainings:     # newest completion first
+                training.completion_date, training.approver_initials, training.status
+
+A slot is the n-th training of a type for one staff member, newest
+completion first. Most types have at most one training per staff member (see
+the unique constraint on AdvancedTraining), so a single cheap query finds the
+types where some staff member has several; only those columns rank trainings
+with a correlated count, and only for rows of that type. ``max_slots`` caps
+the slots per type (the export has a fixed number of column groups).
+
+``status`` is computed in SQL with the same rules as
+AdvancedTraining.is_expired / is_expiring_soon: 'none' (no completion date),
+'expired', 'expiring' (within EXPIRING_SOON_DAYS) or 'current'.
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import Case, CharField, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+
+from .models import AdvancedStaff, AdvancedTraining
+
+EXPIRING_SOON_DAYS = 30
+
+STAFF_FIELDS = ('id', 'badge_number', 'first_name', 'last_name', 'role', 'badge_status', 'is_active')
+TRAINING_FIELDS = ('id', 'completion_date', 'approver_initials', 'termination_date', 'custom_type', 'notes')
+
+# Sort key for trainings without a completion date (they rank after every dated one)
+_UNDATED = date(1, 1, 1)
+
+
+class PivotTraining:
+    """One training in a grid cell (the pivoted fields plus ``status``)."""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class PivotCell:
+    """Trainings of one type for one staff member."""
+
+    def __init__(self, training_type, trainings):
+        self.training_type = training_type
+        self.trainings = trainings
+
+
+class PivotRow:
+    """One staff member: the requested staff fields as attributes plus ``cells``."""
+
+    def __init__(self, values, cells):
+        self.__dict__.update(values)
+        self.cells = cells
+
+    def get_full_name(self):
+        return f"{self.last_name}, {self.first_name}"
+
+    @property
+    def full_name(self):
+        return self.get_full_name()
+
+    def get_role_display(self):
+        return dict(AdvancedStaff.ROLE_CHOICES).get(self.role, self.role)
+
+
+def _type_id(training_type):
+    return getattr(training_type, 'id', training_type)
+
+
+class TrainingPivot:
+    """Conditional-aggregation pivot of ``staff_queryset`` over ``training_types`` (instances or ids)."""
+
+    def __init__(self, staff_queryset, training_types, staff_fields=STAFF_FIELDS,
+                 training_fields=TRAINING_FIELDS, max_slots=None, today=None):
+        self.staff_queryset = staff_queryset
+        self.training_types = list(training_types)
+        self.staff_fields = tuple(staff_fields)
+        self.training_fields = tuple(training_fields)
+        self.today = today or date.today()
+
+        type_ids = [_type_id(t) for t in self.training_types]
+        depth = self._depth(type_ids)
+        max_slots = max_slots or {}
+        self.ranked = set(depth)
+        self.slots = {
+            type_id: min(depth.get(type_id, 1), max_slots.get(type_id, depth.get(type_id, 1)))
+            for type_id in type_ids
+        }
+
+    def _depth(self, type_ids):
+        """{type_id: most trainings any one staff member has} for types where that exceeds one."""
+        rows = (
+            AdvancedTraining.objects.filter(staff__in=self.staff_queryset.order_by(), training_type_id__in=type_ids)
+            .order_by().values('staff_id', 'training_type_id')
+            .annotate(n=Count('id')).filter(n__gt=1)
+            .values_list('training_type_id', 'n')
+        )
+        depth = {}
+        for type_id, n in rows:
+            depth[type_id] = max(depth.get(type_id, 1), n)
+        return depth
+
+    @staticmethod
+    def _rank():
+        """1-based position of the joined training among its siblings of the same type, newest first."""
+        sort_key = Coalesce(OuterRef('trainings__completion_date'), Value(_UNDATED))
+        ahead = (
+            AdvancedTraining.objects
+            .annotate(sort_key=Coalesce('completion_date', Value(_UNDATED)))
+            .filter(staff_id=OuterRef('id'), training_type_id=OuterRef('trainings__training_type_id'))
+            .filter(Q(sort_key__gt=sort_key) | Q(sort_key=sort_key, id__lt=OuterRef('trainings__id')))
+            .order_by().values('staff_id').annotate(n=Count('id')).values('n')
+        )
+        return Coalesce(Subquery(ahead, output_field=IntegerField()), 0) + 1
+
+    def _status(self):
+        return Case(
+            When(trainings__completion_date__isnull=True, then=Value('none')),
+            When(trainings__termination_date__lt=self.today, then=Value('expired')),
+            When(trainings__termination_date__lte=self.today + timedelta(days=EXPIRING_SOON_DAYS),
+                 then=Value('expiring')),
+            default=Value('current'),
+            output_field=CharField(),
+        )
+
+    def columns(self):
+        """(type_id, slot) pairs in output order."""
+        return [
+            (_type_id(t), slot)
+            for t in self.training_types
+            for slot in range(1, self.slots[_type_id(t)] + 1)
+        ]
+
+    @staticmethod
+    def column_name(type_id, slot, field):
+        return f't{type_id}_{slot}_{field}'
+
+    def queryset(self):
+        """Values queryset of staff fields plus one column per (type, slot, field), in the caller's order."""
+        rank = self._rank() if self.ranked else None
+        values = {field: F(f'trainings__{field}') for field in self.training_fields}
+        values['status'] = self._status()
+
+        aggregates = {}
+        for type_id, slot in self.columns():
+            for field, value in values.items():
+                if type_id in self.ranked:
+                    # Rank only this type's rows
+                    value = Case(When(Exact(rank, slot), then=value))
+                aggregates[self.column_name(type_id, slot, field)] = Max(
+                    Case(When(trainings__training_type_id=type_id, then=value))
+                )
+        return self.staff_queryset.values(*self.staff_fields).annotate(**aggregates)
+
+    def rows(self, chunk_size=None, start=0, stop=None):
+        """
+        Yield a PivotRow per staff member (streamed in chunks when ``chunk_size`` is given).
+
+        ``start``/``stop`` select a window of rows in the caller's order (LIMIT/OFFSET).
+        """
+        queryset = self.queryset()
+        if start or stop is not None:
+            queryset = queryset[start:stop]
+        records = queryset.iterator(chunk_size=chunk_size) if chunk_size else queryset
+        fields = self.training_fields + ('status',)
+        for record in records:
+            cells = []
+            for training_type in self.training_types:
+                type_id = _type_id(training_type)
+                trainings = []
+                for slot in range(1, self.slots[type_id] + 1):
+                    if record[self.column_name(type_id, slot, 'status')] is None:
+                        break
+                    trainings.append(PivotTraining(**{
+                        field: record[self.column_name(type_id, slot, field)] for field in fields
+                    }))
+                cells.append(PivotCell(training_type, trainings))
+            yield PivotRow({field: record[field] for field in self.staff_fields}, cells)
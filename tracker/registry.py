@@ -0,0 +1,249 @@
+"""
+Process-wide registry of the active task catalog.
+
+The task list changes a few times a semester but is read on almost every
+page. The registry loads it once into an immutable, versioned snapshot and
+rebuilds lazily after an invalidation. Curricula (the task set and progress
+denominator of each) are part of the snapshot. signals.py invalidates it on
+Task and Curriculum save/delete and on authorized_signers, prerequisites
+and curriculum task changes.
+
+Usage:
+    from .registry import task_registry
+
+    snapshot = task_registry.snapshot()
+    snapshot.total                   # number of active tasks
+    snapshot.total_for(cohort.curriculum_id)   # progress denominator for a cohort
+    snapshot.column_by_order[5]      # column position of the task with order 5
+    snapshot.missing_prerequisites(task.id, completed_ids)   # locked if non-empty
+    tasks = task_registry.get_active_tasks()   # fresh Task copies, safe to annotate
+
+Invalidation inside a transaction is repeated on commit so other threads
+never keep a snapshot built from uncommitted rows. A transaction that has
+pending task changes ignores the shared snapshot and uses one built from
+its own rows, which is not shared (see invalidation.CommitInvalidatedCache).
+
+The module also holds ``current_cohort_cache``, which memoizes
+Cohort.get_current_cohort() for the day and is invalidated the same way on
+Cohort save/delete.
+"""
+
+import copy
+from collections import defaultdict
+from datetime import date
+
+from .invalidation import CommitInvalidatedCache
+
+
+class TaskSnapshot:
+    """Immutable view of the active task catalog at one registry version."""
+
+    def __init__(self, version, tasks, signer_rows, prerequisite_rows=(), curriculum_rows=(), curriculum_ids=()):
+        self.version = version
+        self.tasks = tuple(tasks)
+        self.ids = tuple(task.id for task in self.tasks)
+        self.by_id = {task.id: task for task in self.tasks}
+        self.total = len(self.tasks)
+
+        # Column position (0-based) of each task in grids, matrices and exports
+        self.column_by_id = {task.id: index for index, task in enumerate(self.tasks)}
+        self.column_by_order = {task.order: index for index, task in enumerate(self.tasks)}
+
+        self.score_rules = {
+            task.id: (task.requires_score, task.minimum_score) for task in self.tasks
+        }
+
+        signers = defaultdict(set)
+        for task_id, user_id in signer_rows:
+            signers[task_id].add(user_id)
+        # Empty set means "any staff member may sign off"
+        self.signer_ids = {task.id: frozenset(signers.get(task.id, ())) for task in self.tasks}
+
+        self.slot_mask = 0
+        for task in self.tasks:
+            if task.slot is not None:
+                self.slot_mask |= 1 << task.slot
+
+        # Prerequisites between active tasks (inactive ones cannot be completed)
+        direct = defaultdict(set)
+        for task_id, prerequisite_id in prerequisite_rows:
+            if task_id in self.by_id and prerequisite_id in self.by_id and task_id != prerequisite_id:
+                direct[task_id].add(prerequisite_id)
+        self.prerequisite_ids = {task_id: frozenset(direct.get(task_id, ())) for task_id in self.ids}
+        self.required_ids = self._transitive_closure(self.ids, self.prerequisite_ids)
+        self.topological_order = self._topological_order(self.ids, self.prerequisite_ids)
+
+        # Curricula: active task ids per curriculum, in display order
+        members = defaultdict(set)
+        for curriculum_id, task_id in curriculum_rows:
+            if task_id in self.by_id:
+                members[curriculum_id].add(task_id)
+        self.curriculum_task_ids = {
+            curriculum_id: tuple(task_id for task_id in self.ids if task_id in members[curriculum_id])
+            for curriculum_id in set(curriculum_ids) | members.keys()
+        }
+        self._curriculum_id_sets = {
+            curriculum_id: frozenset(ids) for curriculum_id, ids in self.curriculum_task_ids.items()
+        }
+        self._all_ids = frozenset(self.ids)
+
+        # Bitset form of the closure for checks against Trainee.completion_bits
+        self.unslotted_ids = frozenset(task.id for task in self.tasks if task.slot is None)
+        self.required_mask = {
+            task_id: sum(1 << self.by_id[required_id].slot
+                         for required_id in required if required_id not in self.unslotted_ids)
+            for task_id, required in self.required_ids.items()
+        }
+
+    @staticmethod
+    def _transitive_closure(ids, direct):
+        """task id -> every task that must be completed first (direct or indirect)"""
+        closure = {}
+        for task_id in ids:
+            seen = set()
+            stack = list(direct[task_id])
+            while stack:
+                prerequisite_id = stack.pop()
+                if prerequisite_id not in seen:
+                    seen.add(prerequisite_id)
+                    stack.extend(direct[prerequisite_id])
+            seen.discard(task_id)
+            closure[task_id] = frozenset(seen)
+        return closure
+
+    @staticmethod
+    def _topological_order(ids, direct):
+        """Task ids with prerequisites first, ties kept in display order (Kahn's algorithm)"""
+        remaining = {task_id: set(direct[task_id]) for task_id in ids}
+        ordered = []
+        while remaining:
+            ready = [task_id for task_id in ids if task_id in remaining and not remaining[task_id]]
+            if not ready:
+                # A cycle slipped past validation; keep the rest in display order
+                ordered.extend(task_id for task_id in ids if task_id in remaining)
+                break
+            for task_id in ready:
+                del remaining[task_id]
+            for pending in remaining.values():
+                pending.difference_update(ready)
+            ordered.extend(ready)
+        return tuple(ordered)
+
+    def missing_prerequisites(self, task_id, completed_ids):
+        """Prerequisite ids (in display order) not in ``completed_ids``; empty means unlocked"""
+        missing = self.required_ids.get(task_id, frozenset()).difference(completed_ids)
+        return sorted(missing, key=self.column_by_id.__getitem__)
+
+    def task_ids_for(self, curriculum_id):
+        """Active task ids of a curriculum in display order (every active task when None)"""
+        if curriculum_id is None:
+            return self.ids
+        return self.curriculum_task_ids.get(curriculum_id, ())
+
+    def task_id_set_for(self, curriculum_id):
+        """Same as task_ids_for, as a frozenset for membership tests"""
+        if curriculum_id is None:
+            return self._all_ids
+        return self._curriculum_id_sets.get(curriculum_id, frozenset())
+
+    def tasks_for(self, curriculum_id):
+        """Active Task instances of a curriculum in display order"""
+        return tuple(self.by_id[task_id] for task_id in self.task_ids_for(curriculum_id))
+
+    def total_for(self, curriculum_id):
+        """Progress denominator for trainees whose cohort uses ``curriculum_id``"""
+        return len(self.task_ids_for(curriculum_id))
+
+    def completed_ids(self, completion_bits):
+        """Active slotted task ids whose bit is set (unslotted tasks need a SignOff query)"""
+        return {
+            task.id for task in self.tasks
+            if task.slot is not None and completion_bits >> task.slot & 1
+        }
+
+
+class TaskRegistry(CommitInvalidatedCache):
+    """Lazily rebuilt, versioned cache of the active task catalog."""
+
+    def __init__(self):
+        super().__init__()
+        self._snapshot = None
+
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if it was invalidated."""
+        if self._pending():
+            # This transaction changed tasks: use a snapshot of its own rows, never the shared one
+            version = self._version
+            return self._uncommitted(None, lambda: self._build(version))
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            snapshot = self._build(self._version)
+            self._snapshot = snapshot
+            return snapshot
+
+    def get_active_tasks(self, curriculum_id=None):
+        """Shallow copies of the active tasks (of a curriculum) in order; callers may set attributes on them."""
+        return [copy.copy(task) for task in self.snapshot().tasks_for(curriculum_id)]
+
+    def _clear(self):
+        self._snapshot = None
+
+    @staticmethod
+    def _build(version):
+        """Five queries: active tasks, their signers and prerequisites, curricula and their tasks."""
+        from .models import Curriculum, Task
+
+        tasks = list(Task.objects.filter(is_active=True).order_by('order'))
+        task_ids = [task.id for task in tasks]
+        signer_rows = Task.authorized_signers.through.objects.filter(
+            task_id__in=task_ids
+        ).values_list('task_id', 'user_id')
+        prerequisite_rows = Task.prerequisites.through.objects.filter(
+            from_task_id__in=task_ids
+        ).values_list('from_task_id', 'to_task_id')
+        curriculum_ids = Curriculum.objects.values_list('id', flat=True)
+        curriculum_rows = Curriculum.tasks.through.objects.values_list('curriculum_id', 'task_id')
+        return TaskSnapshot(version, tasks, signer_rows, prerequisite_rows, curriculum_rows, curriculum_ids)
+
+
+task_registry = TaskRegistry()
+
+
+class CurrentCohortCache(CommitInvalidatedCache):
+    """Memoized current cohort, valid until the date changes or a Cohort is saved."""
+
+    def __init__(self):
+        super().__init__()
+        self._entry = None  # (day, version, cohort)
+
+    def get(self):
+        """Return a copy of today's current cohort (None if there are no cohorts)."""
+        today = date.today()
+        entry = self._entry
+        if self._pending():
+            entry = self._uncommitted(today, lambda: self._resolve(today))
+        elif entry is None or entry[0] != today or entry[1] != self._version:
+            entry = self._build(today)
+        cohort = entry[2]
+        return copy.copy(cohort) if cohort is not None else None
+
+    def _resolve(self, today):
+        from .models import Cohort
+        return (today, self._version, Cohort.resolve_current_cohort(today))
+
+    def _build(self, today):
+        with self._lock:
+            entry = self._entry = self._resolve(today)
+            return entry
+
+    def _clear(self):
+        self._entry = None
+
+
+current_cohort_cache = CurrentCohortCache()
@@ -0,0 +1,93 @@
+"""
+Printable gate roster: active staff with issued badges, flagged when their
+Escort Training is current.
+
+The roster is one annotated query (an EXISTS over current escort trainings)
+and the rendered page is cached for the day, because it is printed at the
+gate several times a day while the underlying rows rarely change:
+
+    html = roster_cache.get()      # rendered advanced_staff_printable.html
+    rows = escort_roster()         # dicts: badge_number, full_name, has_escort
+
+signals.py invalidates the cache on AdvancedStaff, AdvancedTraining and
+AdvancedTrainingType save/delete. Invalidation inside a transaction is
+repeated on commit (invalidation.CommitInvalidatedCache). Expiry depends on the
+date, so a new day also rebuilds the page.
+"""
+
+from datetime import date
+
+from django.db.models import Exists, OuterRef, Q
+from django.template.loader import render_to_string
+
+from .invalidation import CommitInvalidatedCache
+
+ESCORT_TRAINING_NAME = 'Escort Training'
+
+
+def escort_roster(today=None):
+    """
+    Roster rows ordered by name, in a single query.
+
+    Escort Training counts when it has a completion date and no termination
+    date, or a termination date of today or later (AdvancedTraining.is_expired).
+    """
+    from .models import AdvancedStaff, AdvancedTraining
+
+    today = today or date.today()
+    current_escort = AdvancedTraining.objects.filter(
+        staff=OuterRef('pk'),
+        training_type__name=ESCORT_TRAINING_NAME,
+        completion_date__isnull=False,
+    ).filter(Q(termination_date__isnull=True) | Q(termination_date__gte=today))
+
+    rows = AdvancedStaff.objects.filter(
+        is_active=True,
+        badge_status='issued_active',
+    ).annotate(
+        has_escort=Exists(current_escort)
+    ).order_by('last_name', 'first_name').values_list('badge_number', 'first_name', 'last_name', 'has_escort')
+
+    return [
+        {'badge_number': badge_number, 'full_name': f"{last_name}, {first_name}", 'has_escort': has_escort}
+        for badge_number, first_name, last_name, has_escort in rows
+    ]
+
+
+def render_roster(today=None):
+    today = today or date.today()
+    staff_list = escort_roster(today)
+    return render_to_string('tracker/advanced_staff_printable.html', {
+        'staff_list': staff_list,
+        'generated_date': today.strftime('%B %d, %Y'),
+        'total_count': len(staff_list),
+        'escort_count': sum(1 for s in staff_list if s['has_escort']),
+    })
+
+
+class RosterCache(CommitInvalidatedCache):
+    """Rendered roster, valid until the date changes or advanced staff/training data changes."""
+
+    def __init__(self):
+        super().__init__()
+        self._entry = None  # (day, version, html)
+
+    def get(self):
+        today = date.today()
+        entry = self._entry
+        if self._pending():
+            return self._uncommitted(today, lambda: render_roster(today))
+        if entry is None or entry[0] != today or entry[1] != self._version:
+            entry = self._build(today)
+        return entry[2]
+
+    def _build(self, today):
+        with self._lock:
+            entry = self._entry = (today, self._version, render_roster(today))
+            return entry
+
+    def _clear(self):
+        self._entry = None
+
+
+roster_cache = RosterCache()
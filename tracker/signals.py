@@ -6,12 +6,32 @@ This module implements automatic synchronization when records are created or upd
 - Creating/updating an AdvancedStaff automatically creates/updates corresponding Trainee
 
 Uses thread-local context managers to prevent infinite signal loops.
+
+It also keeps the materialized TraineeProgress rows and Trainee.completion_bits
+in step with SignOff and Task changes (see ProgressBatch for batching inside
+bulk operations), and invalidates the active task registry, the current
+cohort cache and the per-user permission index when the underlying rows
+change. Sign-off and advanced-training changes are also published to the
+live event bus (events.py) once their transaction commits, and advanced
+staff/training changes invalidate the cached printable roster (roster.py).
+Prerequisite and curriculum m2m changes are validated here: no prerequisite
+loops, and every curriculum contains the prerequisites of its tasks.
 """
 
 import threading
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Trainee, AdvancedStaff, Cohort
+from .events import publish_advanced_change, publish_signoff_change
+from .models import (
+    Trainee, AdvancedStaff, AdvancedTraining, AdvancedTrainingType, Cohort, Curriculum, SignOff, StaffProfile,
+    Task, TraineeProgress
+)
+from .permissions import permission_index
+from .registry import current_cohort_cache, task_registry
+from .roster import roster_cache
 
 
 # Thread-local storage for sync context
@@ -162,3 +182,341 @@ def sync_advanced_to_trainee(sender, instance, created, **kwargs):
                     cohort=current_cohort,
                     is_active=instance.is_active
                 )
+
+
+# ============================================================================
+# Task registry and current cohort invalidation
+# ============================================================================
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_registry(sender, **kwargs):
+    """Any task change may alter the active catalog."""
+    task_registry.invalidate()
+
+
+@receiver(m2m_changed, sender=Task.authorized_signers.through)
+def invalidate_task_registry_signers(sender, action, **kwargs):
+    """The registry also caches each task's authorized signers."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        task_registry.invalidate()
+
+
+@receiver(m2m_changed, sender=Task.prerequisites.through)
+def invalidate_task_registry_prerequisites(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reject prerequisite loops, and rebuild the cached closure after changes."""
+    if action == 'pre_add' and pk_set:
+        if reverse:
+            # instance.dependent_tasks.add(...): instance becomes a prerequisite of each
+            links = [(task_id, instance.pk) for task_id in pk_set]
+        else:
+            links = [(instance.pk, prerequisite_id) for prerequisite_id in pk_set]
+        if Task.creates_prerequisite_loop(links):
+            raise ValidationError('Prerequisites cannot form a loop.')
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        task_registry.invalidate()
+
+
+@receiver(m2m_changed, sender=Task.prerequisites.through)
+def validate_curricula_on_prerequisites(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reject a new prerequisite that a curriculum containing the dependent task lacks."""
+    if action != 'pre_add' or not pk_set:
+        return
+    if reverse:
+        # instance.dependent_tasks.add(...): instance becomes a prerequisite of each
+        links = [(task_id, instance.pk) for task_id in pk_set]
+    else:
+        links = [(instance.pk, prerequisite_id) for prerequisite_id in pk_set]
+    dependent_ids = {task_id for task_id, _ in links}
+    for curriculum, member_ids in _curriculum_members(tasks__in=dependent_ids):
+        missing = Curriculum.unmet_prerequisites(member_ids & dependent_ids, member_ids, links)
+        if missing:
+            raise ValidationError(Curriculum.unmet_prerequisites_message(curriculum.name, missing))
+
+
+@receiver(post_save, sender=Cohort)
+@receiver(post_delete, sender=Cohort)
+def invalidate_current_cohort(sender, **kwargs):
+    """New dates or a changed is_current_override may change the current cohort."""
+    current_cohort_cache.invalidate()
+
+
+# ============================================================================
+# Permission index invalidation
+# ============================================================================
+
+@receiver(m2m_changed, sender=Task.authorized_signers.through)
+@receiver(m2m_changed, sender=AdvancedTrainingType.authorized_signers.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions_m2m(sender, action, **kwargs):
+    """Signer lists, group membership and granted perms all feed the index."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        permission_index.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_permissions_user(sender, update_fields=None, **kwargs):
+    """is_superuser/is_staff may have changed (logins only touch last_login)."""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    permission_index.invalidate()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=StaffProfile)
+@receiver(post_delete, sender=StaffProfile)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=AdvancedTrainingType)
+def invalidate_permissions(sender, **kwargs):
+    """can_sign_off and signer rows removed by cascade."""
+    permission_index.invalidate()
+
+
+# ============================================================================
+# Trainee progress maintenance
+# ============================================================================
+
+class ProgressBatch:
+    """
+    Context manager that defers TraineeProgress and completion_bits updates until exit.
+
+    Inside the block, SignOff signals only record which trainees were touched;
+    on a clean exit each touched trainee is recalculated once, in the caller's
+    transaction. Used by bulk operations that write many sign-offs at a time.
+    """
+
+    def __enter__(self):
+        if not hasattr(_sync_context, 'progress_batches'):
+            _sync_context.progress_batches = []
+        self.trainee_ids = set()
+        _sync_context.progress_batches.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _sync_context.progress_batches.remove(self)
+        if exc_type is None and self.trainee_ids:
+            outer = ProgressBatch.current()
+            if outer is not None:
+                outer.trainee_ids.update(self.trainee_ids)
+            else:
+                TraineeProgress.recalculate(self.trainee_ids)
+                Trainee.recalculate_completion_bits(self.trainee_ids)
+
+    @staticmethod
+    def current():
+        """Return the innermost active batch, or None."""
+        batches = getattr(_sync_context, 'progress_batches', None)
+        return batches[-1] if batches else None
+
+
+def _signoff_changed(signoff, added):
+    """Update progress and the completion bit now, or defer to the enclosing ProgressBatch."""
+    batch = ProgressBatch.current()
+    if batch is not None:
+        batch.trainee_ids.add(signoff.trainee_id)
+        return
+
+    # Rows are only created on add: deletes also fire while a Trainee is cascade-deleted
+    TraineeProgress.recalculate([signoff.trainee_id], create_missing=added)
+
+    bit = Task.objects.filter(pk=signoff.task_id).values_list('slot', flat=True).first()
+    if bit is None:
+        return
+    bit = 1 << bit
+    bits = F('completion_bits').bitor(bit) if added else F('completion_bits').bitand(~bit)
+    Trainee.objects.filter(pk=signoff.trainee_id).update(completion_bits=bits)
+
+
+@receiver(post_save, sender=Trainee)
+def create_trainee_progress(sender, instance, created, **kwargs):
+    """Give every new trainee a progress row so reads never have to write."""
+    if created and not kwargs.get('raw', False):
+        TraineeProgress.objects.get_or_create(trainee_id=instance.pk)
+
+
+@receiver(post_save, sender=SignOff)
+def update_progress_on_signoff_save(sender, instance, created, **kwargs):
+    """Refresh the trainee's progress when a sign-off is created."""
+    if kwargs.get('raw', False):
+        return
+    publish_signoff_change('signoff', [instance.trainee_id], [instance.task_id])
+    if not created:
+        # Updates to an existing sign-off (score, notes) don't change progress,
+        # but open pages still need to pick them up
+        TraineeProgress.touch([instance.trainee_id])
+        return
+    _signoff_changed(instance, added=True)
+
+
+@receiver(post_delete, sender=SignOff)
+def update_progress_on_signoff_delete(sender, instance, origin=None, **kwargs):
+    """Refresh the trainee's progress when a sign-off is removed."""
+    publish_signoff_change('unsign', [instance.trainee_id], [instance.task_id])
+    if _deleting_model(origin) in (Task, Trainee):
+        # Cascade from a Task or Trainee delete: update_progress_on_task_delete refreshes
+        # everyone once, and a deleted trainee's progress row goes with it
+        return
+    _signoff_changed(instance, added=False)
+
+
+def _deleting_model(origin):
+    """Model class of the instance or queryset whose delete() started the cascade."""
+    if origin is None:
+        return None
+    return origin.model if hasattr(origin, 'model') else type(origin)
+
+
+def _recalculate_cohort_progress(cohort_filter):
+    """Recompute progress for trainees in the matching cohorts (curriculum changes)."""
+    trainee_ids = list(Trainee.objects.filter(**cohort_filter).values_list('id', flat=True))
+    batch = ProgressBatch.current()
+    if batch is not None:
+        batch.trainee_ids.update(trainee_ids)
+    else:
+        TraineeProgress.recalculate(trainee_ids)
+
+
+@receiver(post_save, sender=Trainee)
+def update_progress_on_trainee_save(sender, instance, created, update_fields=None, **kwargs):
+    """Moving a trainee to another cohort may change their curriculum."""
+    if created or kwargs.get('raw', False):
+        return
+    if update_fields is None or 'cohort' in update_fields:
+        TraineeProgress.recalculate([instance.pk])
+
+
+@receiver(post_save, sender=Cohort)
+def update_progress_on_cohort_save(sender, instance, created, update_fields=None, **kwargs):
+    """The cohort's curriculum may have changed."""
+    if created or kwargs.get('raw', False):
+        return
+    if update_fields is None or 'curriculum' in update_fields:
+        _recalculate_cohort_progress({'cohort': instance})
+
+
+@receiver(post_save, sender=Curriculum)
+def invalidate_task_registry_curriculum(sender, **kwargs):
+    """The registry caches every curriculum's task set."""
+    task_registry.invalidate()
+
+
+@receiver(pre_delete, sender=Curriculum)
+def remember_curriculum_cohorts(sender, instance, **kwargs):
+    """Cohorts fall back to every active task once their curriculum is gone."""
+    instance._cohort_ids = list(instance.cohorts.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Curriculum)
+def update_progress_on_curriculum_delete(sender, instance, **kwargs):
+    task_registry.invalidate()
+    _recalculate_cohort_progress({'cohort_id__in': getattr(instance, '_cohort_ids', [])})
+
+
+def _curriculum_members(**curriculum_filter):
+    """(curriculum, set of task ids) for the matching curricula, in two queries."""
+    curricula = list(Curriculum.objects.filter(**curriculum_filter).distinct())
+    members = {curriculum.pk: set() for curriculum in curricula}
+    for curriculum_id, task_id in Curriculum.tasks.through.objects.filter(
+        curriculum_id__in=members
+    ).values_list('curriculum_id', 'task_id'):
+        members[curriculum_id].add(task_id)
+    return [(curriculum, members[curriculum.pk]) for curriculum in curricula]
+
+
+@receiver(m2m_changed, sender=Curriculum.tasks.through)
+def validate_curriculum_prerequisites(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep every curriculum closed under prerequisites.
+
+    Adding a task requires its prerequisites to be (or become) members too, and
+    removing a task is refused while a remaining member still requires it.
+    """
+    if action not in ('pre_add', 'pre_remove', 'pre_clear'):
+        return
+    if not reverse:
+        if action == 'pre_clear':
+            return
+        affected = _curriculum_members(pk=instance.pk)
+        changed_task_ids = set(pk_set)
+    elif action == 'pre_clear':
+        affected = _curriculum_members(tasks=instance)
+        changed_task_ids = {instance.pk}
+    else:
+        affected = _curriculum_members(pk__in=pk_set)
+        changed_task_ids = {instance.pk}
+
+    for curriculum, member_ids in affected:
+        if action == 'pre_add':
+            member_ids |= changed_task_ids
+            missing = Curriculum.unmet_prerequisites(changed_task_ids, member_ids)
+            if missing:
+                raise ValidationError(Curriculum.unmet_prerequisites_message(curriculum.name, missing))
+        else:
+            member_ids -= changed_task_ids
+            still_required = Curriculum.unmet_prerequisites(member_ids, member_ids) & changed_task_ids
+            if still_required:
+                names = ', '.join(
+                    Task.objects.filter(id__in=still_required).order_by('order').values_list('name', flat=True)
+                )
+                raise ValidationError(
+                    f'Curriculum "{curriculum.name}" still has tasks that require: {names}.'
+                )
+
+
+@receiver(m2m_changed, sender=Curriculum.tasks.through)
+def update_progress_on_curriculum_tasks(sender, instance, action, reverse, pk_set, **kwargs):
+    """Adding or removing tasks changes the denominator of every cohort using the curriculum."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    task_registry.invalidate()
+    if not reverse:
+        _recalculate_cohort_progress({'cohort__curriculum': instance})
+    elif pk_set is not None:
+        _recalculate_cohort_progress({'cohort__curriculum_id__in': pk_set})
+    else:
+        # task.curricula.clear(): the affected curricula are no longer known
+        _recalculate_cohort_progress({'cohort__curriculum__isnull': False})
+
+
+@receiver(post_delete, sender=Task)
+def update_progress_on_task_delete(sender, instance, **kwargs):
+    """Deleting an active task changes the denominator for everyone."""
+    if instance.slot is not None:
+        # Free the slot for reuse by clearing its bit everywhere
+        Trainee.objects.exclude(completion_bits=0).update(
+            completion_bits=F('completion_bits').bitand(~instance.bit)
+        )
+    if instance.is_active:
+        TraineeProgress.recalculate_all()
+
+
+# ============================================================================
+# Live events for advanced training
+# ============================================================================
+
+@receiver(post_save, sender=AdvancedTraining)
+def publish_advanced_training_save(sender, instance, created, **kwargs):
+    if not kwargs.get('raw', False):
+        publish_advanced_change(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=AdvancedTraining)
+def publish_advanced_training_delete(sender, instance, **kwargs):
+    publish_advanced_change(instance, 'deleted')
+
+
+# ============================================================================
+# Printable roster cache invalidation
+# ============================================================================
+
+@receiver(post_save, sender=AdvancedStaff)
+@receiver(post_delete, sender=AdvancedStaff)
+@receiver(post_save, sender=AdvancedTraining)
+@receiver(post_delete, sender=AdvancedTraining)
+@receiver(post_save, sender=AdvancedTrainingType)
+@receiver(post_delete, sender=AdvancedTrainingType)
+def invalidate_roster(sender, **kwargs):
+    """Badge status, names, escort trainings and the type name all feed the roster."""
+    roster_cache.invalidate()
@@ -0,0 +1,194 @@
+"""
+Set-based bulk sign-off engine.
+
+Replaces the per-pair ``update_or_create`` loop in ``bulk_sign_off``:
+
+    engine = BulkSignOff(request.user, perms, trainees, tasks, scores, notes)
+    results = engine.run()      # same dict the JSON endpoint returns
+
+Authorization and score rules only depend on the task, so they are checked
+once per task in memory and expanded over the selected trainees.
+Prerequisites are checked per trainee with set operations against the
+completion bitset and the registry's precomputed transitive closure; a
+prerequisite signed in the same request counts as completed only if it is
+actually written for that trainee (authorized, valid and in the trainee's
+cohort curriculum). Tasks outside the curriculum are skipped. Existing
+sign-offs for the whole selection are loaded with one query, and writes are
+one ``bulk_create`` plus one ``bulk_update``, in batches of WRITE_BATCH_SIZE
+rows so no single statement grows with the selection. Because bulk writes
+do not send SignOff signals, touched trainees are handed to the enclosing
+ProgressBatch (or recalculated directly) so TraineeProgress and
+completion_bits stay correct.
+"""
+
+from .events import publish_signoff_change
+from .models import SignOff, Trainee, TraineeProgress
+from .registry import task_registry
+
+
+class BulkSignOff:
+    """One bulk sign-off request: trainees x tasks signed by a single user."""
+
+    UPDATE_FIELDS = ['signed_by', 'score', 'notes']
+    WRITE_BATCH_SIZE = 500
+
+    def __init__(self, user, perms, trainees, tasks, scores=None, notes=''):
+        self.user = user
+        self.perms = perms
+        self.trainees = list(trainees)
+        self.tasks = list(tasks)
+        self.scores = scores or {}
+        self.notes = notes
+        self.results = {
+            'success': True,
+            'created': 0,
+            'updated': 0,
+            'skipped': [],
+            'errors': []
+        }
+
+    def _task_outcome(self, task):
+        """(skip reason, error message, score) for a task; reason/error are None when it can be signed."""
+        if not self.perms.can_sign_task(task.id):
+            return 'Not authorized to sign off this task', None, ''
+
+        score = self.scores.get(str(task.id), '')
+        if task.requires_score and task.minimum_score is not None:
+            if not score:
+                return None, f'Score required (minimum: {task.minimum_score})', score
+            try:
+                if float(score) < float(task.minimum_score):
+                    return None, f'Score {score} below minimum {task.minimum_score}', score
+            except ValueError:
+                return None, 'Invalid score format', score
+        return None, None, score
+
+    def run(self):
+        """
+        Validate the whole selection, then write it unless any pair has an error.
+
+        Must be called inside a transaction. Returns the results dict; on
+        validation errors nothing is written and 'created'/'updated' report
+        what would have been written, matching the previous loop.
+        """
+        snapshot = task_registry.snapshot()
+        outcomes = {task.id: self._task_outcome(task) for task in self.tasks}
+        signable_task_ids = [
+            task.id for task in self.tasks
+            if outcomes[task.id][0] is None and outcomes[task.id][1] is None
+        ]
+
+        # Prerequisites that the completion bitset cannot answer come from the same query
+        required = set()
+        for task_id in signable_task_ids:
+            required |= snapshot.required_ids.get(task_id, frozenset())
+        lookup_task_ids = set(signable_task_ids) | (required & snapshot.unslotted_ids)
+
+        existing = {}
+        if signable_task_ids and self.trainees:
+            existing = {
+                (signoff.trainee_id, signoff.task_id): signoff
+                for signoff in SignOff.objects.filter(
+                    trainee_id__in=[trainee.id for trainee in self.trainees],
+                    task_id__in=lookup_task_ids,
+                ).only('id', 'trainee_id', 'task_id').order_by()
+            }
+
+        to_create = []
+        to_update = []
+        for trainee in self.trainees:
+            curriculum_tasks = snapshot.task_id_set_for(trainee.cohort.curriculum_id)
+            # Only tasks that will be written for this trainee can unlock others
+            writable_task_ids = [task_id for task_id in signable_task_ids if task_id in curriculum_tasks]
+            locked = self._locked_tasks(snapshot, trainee, writable_task_ids, required, existing) if required else {}
+            for task in self.tasks:
+                reason, error, score = outcomes[task.id]
+                if not reason and task.id not in curriculum_tasks:
+                    reason, error = "Not part of this trainee's curriculum", None
+                elif not reason and not error and task.id in locked:
+                    names = ', '.join(snapshot.by_id[task_id].name for task_id in locked[task.id])
+                    reason = f'Prerequisites not completed: {names}'
+                if reason:
+                    self.results['skipped'].append({
+                        'trainee': trainee.badge_number,
+                        'task': task.name,
+                        'reason': reason
+                    })
+                    continue
+                if error:
+                    self.results['errors'].append({
+                        'trainee': trainee.badge_number,
+                        'task': task.name,
+                        'error': error
+                    })
+                    continue
+
+                signoff = existing.get((trainee.id, task.id))
+                if signoff is None:
+                    to_create.append(SignOff(
+                        trainee_id=trainee.id,
+                        task_id=task.id,
+                        signed_by=self.user,
+                        score=score,
+                        notes=self.notes
+                    ))
+                else:
+                    signoff.signed_by = self.user
+                    signoff.score = score
+                    signoff.notes = self.notes
+                    to_update.append(signoff)
+
+        self.results['created'] = len(to_create)
+        self.results['updated'] = len(to_update)
+        if self.results['errors']:
+            return self.results
+
+        if to_create:
+            SignOff.objects.bulk_create(to_create, batch_size=self.WRITE_BATCH_SIZE)
+        if to_update:
+            SignOff.objects.bulk_update(to_update, self.UPDATE_FIELDS, batch_size=self.WRITE_BATCH_SIZE)
+
+        if to_create:
+            self._refresh_progress({signoff.trainee_id for signoff in to_create})
+        if to_update:
+            TraineeProgress.touch(signoff.trainee_id for signoff in to_update)
+        # bulk writes send no SignOff signals, so announce them here
+        written = to_create + to_update
+        if written:
+            publish_signoff_change(
+                'signoff', (signoff.trainee_id for signoff in written), (signoff.task_id for signoff in written)
+            )
+        return self.results
+
+    @staticmethod
+    def _locked_tasks(snapshot, trainee, writable_task_ids, required, existing):
+        """task id -> missing prerequisite ids, for the tasks written for this trainee that it cannot take yet"""
+        completed = snapshot.completed_ids(trainee.completion_bits)
+        completed.update(
+            task_id for task_id in required & snapshot.unslotted_ids
+            if (trainee.id, task_id) in existing
+        )
+        locked = {}
+        selected = set(writable_task_ids)
+        # Walk in topological order so a prerequisite signed in this request unlocks its dependents
+        for task_id in snapshot.topological_order:
+            if task_id not in selected:
+                continue
+            missing = snapshot.missing_prerequisites(task_id, completed)
+            if missing:
+                locked[task_id] = missing
+            else:
+                completed.add(task_id)
+        return locked
+
+    @staticmethod
+    def _refresh_progress(trainee_ids):
+        """Stand in for the SignOff post_save signals that bulk_create skips."""
+        from .signals import ProgressBatch
+
+        batch = ProgressBatch.current()
+        if batch is not None:
+            batch.trainee_ids.update(trainee_ids)
+        else:
+            TraineeProgress.recalculate(trainee_ids)
+            Trainee.recalculate_completion_bits(trainee_ids)
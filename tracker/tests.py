@@ -6,10 +6,36 @@ from datetime import date, timedelta
 from decimal import Decimal
 import json
 
-from .models import Trainee, Task, SignOff, StaffProfile, UnsignLog, Cohort
+from .models import Trainee, Task, SignOff, StaffProfile, UnsignLog, Cohort, TraineeProgress
+from .invalidation import reset_process_caches
+from .permissions import permission_index
+from .registry import task_registry
 
 
-class CohortModelTest(TestCase):
+def use_temp_export_cache(test_case):
+    """Point the export file cache at a temporary directory for one test."""
+    import tempfile
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    override = test_case.settings(EXPORT_CACHE_DIR=directory.name)
+    override.enable()
+    test_case.addCleanup(override.disable)
+    return directory.name
+
+
+class ProcessCacheResetMixin:
+    """Start and end each test with empty process-wide caches (their rows are rolled back between tests)."""
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        reset_process_caches()
+
+    def _post_teardown(self):
+        reset_process_caches()
+        super()._post_teardown()
+
+
+class CohortModelTest(ProcessCacheResetMixin, TestCase):
     """Test Cohort model functionality"""
 
     def setUp(self):
@@ -52,6 +78,37 @@ class CohortModelTest(TestCase):
         current = Cohort.get_current_cohort()
         self.assertEqual(current, self.spring_2025)
 
+    def test_get_current_cohort_by_date_range(self):
+        """Without an override, the cohort whose stored range contains today wins"""
+        today = date.today()
+        semester = 'Spring' if today.month <= 6 else 'Fall'
+        current = Cohort.objects.create(name="Current", year=today.year, semester=semester)
+        self.assertEqual(Cohort.get_current_cohort(), current)
+
+    def test_get_current_cohort_memoized(self):
+        """Once committed, the current cohort is served without queries until a Cohort changes"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fall_2025.is_current_override = True
+            self.fall_2025.save()
+        Cohort.get_current_cohort()
+        with self.assertNumQueries(0):
+            self.assertEqual(Cohort.get_current_cohort(), self.fall_2025)
+
+        self.fall_2025.is_current_override = False
+        self.fall_2025.save()
+        self.spring_2025.is_current_override = True
+        self.spring_2025.save()
+        self.assertEqual(Cohort.get_current_cohort(), self.spring_2025)
+
+    def test_dates_follow_semester_change(self):
+        """Stored dates are recomputed when year/semester are saved"""
+        cohort = Cohort.objects.create(name="Spring 2030", year=2030, semester="Spring")
+        cohort.semester = "Fall"
+        cohort.save(update_fields=['semester'])
+        cohort.refresh_from_db()
+        self.assertEqual((cohort.start_date, cohort.end_date), (date(2030, 7, 1), date(2030, 12, 31)))
+        self.assertEqual(cohort.semester_order, 2)
+
 
 class TraineeModelTest(TestCase):
     """Test Trainee model functionality"""
@@ -166,6 +223,68 @@ class TaskModelTest(TestCase):
         self.assertEqual(task2_new.order, 2)
         self.assertEqual(task2.order, 3)
 
+    def test_task_order_shift_constant_queries(self):
+        """Inserting at the front shifts the whole catalog without per-task writes"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(2, 30):
+            Task.objects.create(order=i, name=f"Task {i}")
+
+        with CaptureQueriesContext(connection) as ctx:
+            Task.objects.create(order=1, name="Front", is_active=False)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "tracker_task"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            list(Task.objects.values_list('order', flat=True)),
+            list(range(1, 31))
+        )
+
+    def test_task_move_to_earlier_order(self):
+        """Moving an existing task onto an occupied order shifts the rest, not itself"""
+        tasks = [self.task] + [Task.objects.create(order=i, name=f"Task {i}") for i in range(2, 6)]
+        last = tasks[-1]
+        last.order = 2
+        last.save()
+        self.assertEqual(
+            list(Task.objects.values_list('name', 'order')),
+            [("Test Task", 1), ("Task 5", 2), ("Task 2", 3), ("Task 3", 4), ("Task 4", 5)]
+        )
+
+    def test_apply_order(self):
+        """apply_order renumbers the full catalog 1..n in the given order"""
+        task2 = Task.objects.create(order=5, name="Task 2")
+        task3 = Task.objects.create(order=9, name="Task 3")
+        # savepoint, id check, bounds, two UPDATEs, release
+        with self.assertNumQueries(6):
+            Task.apply_order([task3.id, self.task.id, task2.id])
+        self.assertEqual(
+            list(Task.objects.values_list('id', 'order')),
+            [(task3.id, 1), (self.task.id, 2), (task2.id, 3)]
+        )
+        self.assertEqual(task_registry.snapshot().ids, (task3.id, self.task.id, task2.id))
+        with self.assertRaises(ValueError):
+            Task.apply_order([task3.id, self.task.id])
+
+    def test_reorder_endpoint(self):
+        """POST /tasks/reorder/ requires change_task and applies the order"""
+        task2 = Task.objects.create(order=2, name="Task 2")
+        url = reverse('reorder_tasks')
+        payload = json.dumps({'task_ids': [task2.id, self.task.id]})
+
+        self.client.login(username='staff', password='password')
+        response = self.client.post(url, data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        User.objects.create_superuser('admin', 'admin@test.com', 'password')
+        self.client.login(username='admin', password='password')
+        response = self.client.post(url, data=payload, content_type='application/json')
+        self.assertEqual(response.json(), {'success': True, 'reordered': 2})
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [task2.id, self.task.id])
+
+        response = self.client.post(url, data=json.dumps({'task_ids': [task2.id]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
 
 class SignOffModelTest(TestCase):
     """Test SignOff model functionality"""
@@ -468,6 +587,10 @@ class BulkSignOffTestCase(TestCase):
             is_staff=True
         )
 
+        # bulk_sign_off requires a staff profile with sign-off permission
+        StaffProfile.objects.create(user=self.staff_user, initials='SU', can_sign_off=True)
+        StaffProfile.objects.create(user=self.other_staff, initials='OS', can_sign_off=True)
+
         # Create trainees
         self.trainee1 = Trainee.objects.create(
             badge_number='#2501',
@@ -778,3 +901,1930 @@ class BulkSignOffTestCase(TestCase):
         self.assertEqual(response.status_code, 400)
         result = response.json()
         self.assertFalse(result['success'])
+
+    def test_bulk_signoff_pair_limit(self):
+        """A selection whose trainees x tasks exceeds the pair cap is rejected before any work"""
+        from . import views
+
+        self.client.login(username='staff', password='password')
+        trainee_ids = list(range(1, 501))
+        task_ids = list(range(1, 101)) + [999999]
+        self.assertGreater(len(trainee_ids) * len(task_ids), views.BULK_SIGN_OFF_MAX_PAIRS)
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': trainee_ids, 'task_ids': task_ids}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pairs', response.json()['error'])
+        self.assertFalse(SignOff.objects.exists())
+
+    def test_bulk_signoff_queries_do_not_scale_with_selection(self):
+        """The set-based engine writes any selection with a constant number of queries"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        extra = [
+            Trainee.objects.create(badge_number=f'#26{i:02d}', first_name='T', last_name=str(i), cohort=self.cohort)
+            for i in range(21)
+        ]
+        SignOff.objects.create(trainee=extra[0], task=self.task1, signed_by=self.other_staff)
+        SignOff.objects.create(trainee=extra[10], task=self.task1, signed_by=self.other_staff)
+        self.client.login(username='staff', password='password')
+
+        def run(trainees):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(
+                    reverse('bulk_sign_off'),
+                    data=json.dumps({
+                        'trainee_ids': [t.id for t in trainees],
+                        'task_ids': [self.task1.id, self.task3.id],
+                        'scores': {},
+                        'notes': 'Batch'
+                    }),
+                    content_type='application/json'
+                )
+            return response.json(), len(ctx.captured_queries)
+
+        run(extra[20:])  # warm the task and permission caches
+        small, small_queries = run(extra[:10])
+        large, large_queries = run(extra[10:20])
+        self.assertEqual((small['created'], small['updated']), (19, 1))
+        self.assertEqual((large['created'], large['updated']), (19, 1))
+        self.assertEqual(small_queries, large_queries)
+
+        signoff = SignOff.objects.get(trainee=extra[0], task=self.task1)
+        self.assertEqual((signoff.signed_by, signoff.notes), (self.staff_user, 'Batch'))
+        self.assertEqual(extra[5].get_completed_task_count(), 2)
+
+    def test_bulk_signoff_limit_above_100(self):
+        """Selections in the hundreds are accepted; the cap is in the thousands"""
+        from .views import BULK_SIGN_OFF_MAX_TRAINEES
+
+        trainees = Trainee.objects.bulk_create([
+            Trainee(badge_number=f'#3{i:03d}', first_name='T', last_name=str(i), cohort=self.cohort)
+            for i in range(150)
+        ])
+        self.client.login(username='staff', password='password')
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': [t.id for t in trainees], 'task_ids': [self.task1.id]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['created'], 150)
+        self.assertEqual(Trainee.objects.completed_task(self.task1).count(), 150)
+
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': list(range(BULK_SIGN_OFF_MAX_TRAINEES + 1)), 'task_ids': [self.task1.id]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TraineeProgressTest(TestCase):
+    """Test the materialized TraineeProgress table"""
+
+    def setUp(self):
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.trainee = Trainee.objects.create(
+            badge_number="#2501", first_name="John", last_name="Doe", cohort=self.cohort
+        )
+        self.tasks = [Task.objects.create(order=i, name=f"Task {i}") for i in range(1, 5)]
+
+    def progress(self):
+        return TraineeProgress.objects.get(trainee=self.trainee)
+
+    def test_progress_row_created_with_trainee(self):
+        """New trainees get a progress row at 0%"""
+        self.assertEqual(self.progress().completed_count, 0)
+        self.assertEqual(self.progress().percentage, 0)
+
+    def test_signoff_create_and_delete_update_progress(self):
+        """Creating and deleting sign-offs keeps the row in step"""
+        signoff = SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user)
+        self.assertEqual(self.progress().completed_count, 1)
+        self.assertEqual(self.progress().percentage, 25.0)
+
+        signoff.delete()
+        self.assertEqual(self.progress().completed_count, 0)
+        self.assertEqual(self.progress().percentage, 0)
+
+    def test_task_activation_changes_denominator(self):
+        """Deactivating a task recalculates every trainee"""
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user)
+        self.tasks[3].is_active = False
+        self.tasks[3].save()
+        self.assertEqual(self.progress().percentage, 33.3)
+
+        # Sign-offs on inactive tasks don't count towards progress
+        self.tasks[0].is_active = False
+        self.tasks[0].save()
+        self.assertEqual(self.progress().completed_count, 0)
+
+    def test_unsign_view_updates_progress(self):
+        """Unsigning through the view refreshes progress in the same transaction"""
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user)
+        self.client.login(username='staff', password='password')
+        self.client.post(
+            reverse('unsign_task', args=[self.trainee.badge_number, self.tasks[0].id]),
+            {'reason': 'Mistake'}
+        )
+        self.assertEqual(self.progress().completed_count, 0)
+
+    def test_bulk_sign_off_updates_progress(self):
+        """Bulk sign-off recalculates each trainee once at the end"""
+        self.client.login(username='staff', password='password')
+        self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({
+                'trainee_ids': [self.trainee.id],
+                'task_ids': [t.id for t in self.tasks],
+                'scores': {},
+                'notes': '',
+            }),
+            content_type='application/json'
+        )
+        self.assertEqual(self.progress().percentage, 100.0)
+
+    def test_rebuild_progress_command(self):
+        """rebuild_progress restores missing or stale rows"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user)
+        TraineeProgress.objects.all().delete()
+
+        call_command('rebuild_progress', stdout=StringIO())
+        self.assertEqual(self.progress().completed_count, 1)
+
+    def test_cascading_deletes_recalculate_once(self):
+        """Deleting a task or trainee does not recalculate progress per cascaded sign-off"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        trainees = [self.trainee] + [
+            Trainee.objects.create(badge_number=f"#26{i:02d}", first_name="T", last_name=str(i), cohort=self.cohort)
+            for i in range(6)
+        ]
+        for trainee in trainees:
+            SignOff.objects.create(trainee=trainee, task=self.tasks[0], signed_by=self.user)
+            SignOff.objects.create(trainee=trainee, task=self.tasks[1], signed_by=self.user)
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[2], signed_by=self.user)
+
+        with CaptureQueriesContext(connection) as few:
+            self.tasks[2].delete()
+        with CaptureQueriesContext(connection) as more:
+            self.tasks[1].delete()
+        self.assertEqual(len(few), len(more))
+        self.assertEqual(self.progress().completed_count, 1)
+        self.assertEqual(self.progress().percentage, 50.0)
+        self.trainee.refresh_from_db()
+        self.assertEqual(self.trainee.completion_bits, self.tasks[0].bit)
+
+        with CaptureQueriesContext(connection) as few:
+            trainees[1].delete()
+        SignOff.objects.create(trainee=trainees[2], task=self.tasks[3], signed_by=self.user)
+        with CaptureQueriesContext(connection) as more:
+            trainees[2].delete()
+        self.assertEqual(len(few), len(more))
+
+    def test_trainee_list_query_count_independent_of_trainees(self):
+        """Progress bars on the list don't add queries per trainee"""
+        self.client.login(username='staff', password='password')
+        self.client.get(reverse('trainee_list'))
+
+        for i in range(2, 12):
+            Trainee.objects.create(
+                badge_number=f"#25{i:02d}", first_name="T", last_name=str(i), cohort=self.cohort
+            )
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('trainee_list'))
+        Trainee.objects.create(badge_number="#2599", first_name="T", last_name="Last", cohort=self.cohort)
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(reverse('trainee_list'))
+        self.assertEqual(len(few), len(more))
+
+
+class CompletionMatrixTest(TestCase):
+    """Test the vectorized cohort completion matrix"""
+
+    def setUp(self):
+        use_temp_export_cache(self)
+        from .completion import CompletionMatrix
+        self.CompletionMatrix = CompletionMatrix
+
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.trainees = [
+            Trainee.objects.create(badge_number=f"#250{i}", first_name="T", last_name=str(i), cohort=self.cohort)
+            for i in range(1, 4)
+        ]
+        self.tasks = [Task.objects.create(order=i, name=f"Task {i}") for i in range(1, 5)]
+
+        # Trainee 1 has everything, trainee 2 has tasks 1-2, trainee 3 has nothing
+        for task in self.tasks:
+            SignOff.objects.create(trainee=self.trainees[0], task=task, signed_by=self.user)
+        for task in self.tasks[:2]:
+            SignOff.objects.create(trainee=self.trainees[1], task=task, signed_by=self.user)
+
+    def test_single_query_for_cohort(self):
+        """Passing evaluated trainees and tasks costs one query"""
+        with self.assertNumQueries(1):
+            self.CompletionMatrix.for_trainees(self.trainees, self.tasks)
+
+    def test_progress_and_rates(self):
+        """Per-trainee progress and per-task completion rates"""
+        matrix = self.CompletionMatrix.for_cohort(self.cohort)
+        self.assertEqual(matrix.progress_percentages().tolist(), [100.0, 50.0, 0.0])
+        self.assertEqual(matrix.task_completion_counts()[self.tasks[0].id], 2)
+        self.assertEqual(matrix.task_completion_rates()[self.tasks[3].id], 33.3)
+
+    def test_missing_lookups(self):
+        """Missing tasks for a trainee and trainees missing a task"""
+        matrix = self.CompletionMatrix.for_cohort(self.cohort)
+        self.assertEqual(matrix.missing_tasks(self.trainees[1].id), [self.tasks[2].id, self.tasks[3].id])
+        self.assertEqual(matrix.trainees_missing(self.tasks[2].id), [self.trainees[1].id, self.trainees[2].id])
+        self.assertEqual(matrix.missing_tasks(999999), [])
+
+    def test_value_field(self):
+        """Cell values (e.g. signer initials) are kept alongside the matrix"""
+        matrix = self.CompletionMatrix.for_trainees(
+            self.trainees, self.tasks, value_field='signed_by__staff_profile__initials'
+        )
+        self.assertEqual(matrix.value(self.trainees[0].id, self.tasks[0].id), "ST")
+        self.assertEqual(matrix.value(self.trainees[2].id, self.tasks[0].id, default='-'), "-")
+
+    def test_export_query_count_independent_of_trainees(self):
+        """The cohort export no longer queries sign-offs per trainee"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.login(username='staff', password='password')
+        url = reverse('export_cohort', args=[self.cohort.id])
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        Trainee.objects.create(badge_number="#2509", first_name="T", last_name="9", cohort=self.cohort)
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url)
+        self.assertEqual(len(few), len(more))
+
+    def test_admin_changelist_missing_tasks_column(self):
+        """Trainee changelist shows missing task orders from the matrix"""
+        User.objects.create_superuser('admin', 'admin@test.com', 'password')
+        self.client.login(username='admin', password='password')
+        response = self.client.get(reverse('admin:tracker_trainee_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Missing Tasks")
+        self.assertContains(response, "3, 4")
+
+
+class OrientationLayoutTest(TestCase):
+    """Test the compiled orientation template layout and the export that uses it"""
+
+    def setUp(self):
+        use_temp_export_cache(self)
+        from .excel import layout
+        self.layout_module = layout
+        layout._layout_cache.clear()
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.tasks = [Task.objects.create(order=i, name=f"Task {i}") for i in range(1, 4)]
+        self.trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[2], signed_by=self.user)
+
+    def test_layout_sections(self):
+        """Header rows and trainee rows come from the template scan"""
+        from .excel.config import ORIENTATION_TEMPLATE_PATH
+
+        layout = self.layout_module.get_orientation_layout(ORIENTATION_TEMPLATE_PATH)
+        self.assertEqual(layout.header_rows, (2, 31, 65))
+        self.assertEqual(layout.data_rows[0], 5)
+        self.assertEqual(layout.capacity, len(layout.data_rows))
+
+    def test_layout_cached_until_mtime_changes(self):
+        """The template is compiled once per modification time"""
+        from unittest import mock
+        from .excel.assets import template_cache
+        from .excel.config import ORIENTATION_TEMPLATE_PATH
+
+        first = self.layout_module.get_orientation_layout(ORIENTATION_TEMPLATE_PATH)
+        with mock.patch.object(self.layout_module.OrientationLayout, 'compile') as compile_layout:
+            self.assertIs(self.layout_module.get_orientation_layout(ORIENTATION_TEMPLATE_PATH), first)
+            compile_layout.assert_not_called()
+
+        template_cache.clear()
+        self.addCleanup(template_cache.clear)
+        with mock.patch('tracker.excel.assets.os.path.getmtime', return_value=0):
+            self.assertIsNot(self.layout_module.get_orientation_layout(ORIENTATION_TEMPLATE_PATH), first)
+
+    def test_export_writes_trainee_and_initials(self):
+        """Badge, name and signer initials land in the first data row"""
+        import io
+        from openpyxl import load_workbook
+        from .excel.config import ORIENTATION_COHORT_NAME_COLUMN, ORIENTATION_TASK_COLUMNS
+
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('export_cohort', args=[self.cohort.id]))
+        self.assertEqual(response.status_code, 200)
+
+        ws = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(ws.cell(row=2, column=ORIENTATION_COHORT_NAME_COLUMN).value, "Fall 2025")
+        self.assertEqual(ws.cell(row=5, column=1).value, "#2501")
+        self.assertEqual(ws.cell(row=5, column=2).value, "One, A")
+        self.assertEqual(ws.cell(row=5, column=ORIENTATION_TASK_COLUMNS[3]).value, "ST")
+        self.assertIsNone(ws.cell(row=5, column=ORIENTATION_TASK_COLUMNS[1]).value)
+
+
+    def test_export_warns_about_tasks_without_column(self):
+        """Curriculum tasks outside the template's columns are reported, not dropped silently"""
+        import io
+        from .excel.orientation import write_cohort_workbook
+
+        extra = Task.objects.create(order=16, name="Site Badge")
+        SignOff.objects.create(trainee=self.trainee, task=extra, signed_by=self.user)
+        warnings = write_cohort_workbook(self.cohort, io.BytesIO())
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('Site Badge', warnings[0])
+
+        extra.delete()
+        self.assertEqual(write_cohort_workbook(self.cohort, io.BytesIO()), [])
+
+class CompletionBitsTest(TestCase):
+    """Test the Trainee.completion_bits bitset"""
+
+    def setUp(self):
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.trainee1 = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+        self.trainee2 = Trainee.objects.create(badge_number="#2502", first_name="B", last_name="Two", cohort=self.cohort)
+        self.tasks = [Task.objects.create(order=i, name=f"Task {i}") for i in range(1, 4)]
+
+    def bits(self, trainee):
+        return Trainee.objects.values_list('completion_bits', flat=True).get(pk=trainee.pk)
+
+    def test_slots_assigned_on_create(self):
+        """Each new task gets the lowest free slot"""
+        self.assertEqual([t.slot for t in self.tasks], [0, 1, 2])
+
+    def test_bits_follow_signoff_create_and_delete(self):
+        """Sign-off save/delete set and clear the task's bit"""
+        signoff = SignOff.objects.create(trainee=self.trainee1, task=self.tasks[1], signed_by=self.user)
+        self.assertEqual(self.bits(self.trainee1), 0b010)
+        signoff.delete()
+        self.assertEqual(self.bits(self.trainee1), 0)
+
+    def test_missing_task_filter(self):
+        """missing_task()/completed_task() filter on the bitset"""
+        SignOff.objects.create(trainee=self.trainee1, task=self.tasks[0], signed_by=self.user)
+        self.assertEqual(list(Trainee.objects.missing_task(self.tasks[0])), [self.trainee2])
+        self.assertEqual(list(Trainee.objects.completed_task(self.tasks[0])), [self.trainee1])
+
+        trainee = Trainee.objects.get(pk=self.trainee1.pk)
+        self.assertTrue(trainee.has_completed(self.tasks[0]))
+        self.assertEqual(trainee.count_completed(Task.active_slot_mask()), 1)
+
+    def test_bulk_sign_off_sets_bits(self):
+        """Bulk sign-off recalculates the bitset once per trainee"""
+        self.client.login(username='staff', password='password')
+        self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({
+                'trainee_ids': [self.trainee1.id, self.trainee2.id],
+                'task_ids': [self.tasks[0].id, self.tasks[2].id],
+                'scores': {},
+                'notes': '',
+            }),
+            content_type='application/json'
+        )
+        self.assertEqual(self.bits(self.trainee1), 0b101)
+        self.assertEqual(self.bits(self.trainee2), 0b101)
+
+    def test_task_delete_frees_slot(self):
+        """Deleting a task clears its bit so the slot can be reused"""
+        SignOff.objects.create(trainee=self.trainee1, task=self.tasks[0], signed_by=self.user)
+        self.tasks[0].delete()
+        self.assertEqual(self.bits(self.trainee1), 0)
+
+        new_task = Task.objects.create(order=10, name="Replacement")
+        self.assertEqual(new_task.slot, 0)
+        self.assertEqual(list(Trainee.objects.completed_task(new_task)), [])
+
+    def test_trainee_list_missing_task_param(self):
+        """?missing_task= narrows the trainee list"""
+        SignOff.objects.create(trainee=self.trainee1, task=self.tasks[0], signed_by=self.user)
+        self.cohort.is_current_override = True
+        self.cohort.save()
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('trainee_list') + f'?missing_task={self.tasks[0].id}')
+        self.assertEqual([t.pk for t in response.context['trainees']], [self.trainee2.pk])
+
+
+class TaskRegistryTest(ProcessCacheResetMixin, TestCase):
+    """Test the process-wide active task registry"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.task1 = Task.objects.create(order=1, name="Task 1")
+        self.task2 = Task.objects.create(order=2, name="Task 2", requires_score=True, minimum_score=Decimal("80"))
+        Task.objects.create(order=3, name="Retired", is_active=False)
+
+    def test_snapshot_contents(self):
+        """Snapshot exposes active tasks, columns and signer sets"""
+        self.task2.authorized_signers.add(self.user)
+        snapshot = task_registry.snapshot()
+        self.assertEqual(snapshot.total, 2)
+        self.assertEqual(snapshot.ids, (self.task1.id, self.task2.id))
+        self.assertEqual(snapshot.column_by_order, {1: 0, 2: 1})
+        self.assertEqual(snapshot.score_rules[self.task2.id], (True, Decimal("80")))
+        self.assertEqual(snapshot.signer_ids[self.task1.id], frozenset())
+        self.assertEqual(snapshot.signer_ids[self.task2.id], frozenset({self.user.id}))
+
+    def test_invalidated_on_task_changes(self):
+        """Saving, deleting and changing signers bumps the version"""
+        version = task_registry.snapshot().version
+
+        Task.objects.create(order=4, name="Task 4")
+        self.assertEqual(task_registry.snapshot().total, 3)
+        self.assertGreater(task_registry.snapshot().version, version)
+
+        self.task1.delete()
+        self.assertEqual(task_registry.snapshot().total, 2)
+
+        self.task2.authorized_signers.add(self.user)
+        self.assertEqual(task_registry.snapshot().signer_ids[self.task2.id], frozenset({self.user.id}))
+
+    def test_snapshot_cached_after_commit(self):
+        """Once pending changes are committed the snapshot costs no queries"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(order=4, name="Task 4")
+        task_registry.snapshot()
+        with self.assertNumQueries(0):
+            self.assertEqual(task_registry.snapshot().total, 3)
+
+    def test_rollback_clears_pending_invalidation(self):
+        """A rolled-back change does not stop snapshots from being cached afterwards"""
+        from django.db import transaction
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Task.objects.create(order=4, name="Task 4")
+                raise RuntimeError
+        self.assertEqual(task_registry.snapshot().total, 2)
+        with self.assertNumQueries(0):
+            task_registry.snapshot()
+
+    def test_pending_invalidation_per_transaction(self):
+        """Uncommitted task changes are visible here but the snapshot is not cached"""
+        from django.db import transaction
+
+        with transaction.atomic():
+            Task.objects.create(order=4, name="Task 4")
+            self.assertEqual(task_registry.snapshot().total, 3)
+            self.assertIsNone(task_registry._snapshot)
+
+    def test_pending_invalidation_ignores_shared_snapshot(self):
+        """A snapshot another thread cached from committed rows is not used by the writing transaction"""
+        from django.db import transaction
+
+        cohort = Cohort.objects.create(name="Pending", year=2025, semester="Fall")
+        trainee = Trainee.objects.create(badge_number='#0300', first_name='Pend', last_name='Ing', cohort=cohort)
+        SignOff.objects.create(trainee=trainee, task=self.task1, signed_by=self.user)
+        SignOff.objects.create(trainee=trainee, task=self.task2, signed_by=self.user, score=Decimal("90"))
+        committed = task_registry.snapshot()
+        with transaction.atomic():
+            Task.objects.create(order=4, name="Task 4")
+            Task.objects.create(order=5, name="Task 5")
+            # Another request thread caches the committed catalog mid-transaction
+            task_registry._snapshot = committed
+
+            self.assertEqual(task_registry.snapshot().total, 4)
+            TraineeProgress.recalculate_all()
+            self.assertEqual(TraineeProgress.objects.get(trainee=trainee).percentage, 50.0)
+
+    def test_active_task_copies(self):
+        """get_active_tasks returns copies that can be annotated freely"""
+        tasks = task_registry.get_active_tasks()
+        tasks[0].completed_count = 5
+        self.assertFalse(hasattr(task_registry.snapshot().tasks[0], 'completed_count'))
+
+
+class PermissionIndexTest(ProcessCacheResetMixin, TestCase):
+    """Test the per-user sign-off permission index"""
+
+    def setUp(self):
+        from django.contrib.auth.models import Permission
+        from .models import AdvancedTrainingType
+
+        self.user = User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.other = User.objects.create_user(username='other', password='password', is_staff=True)
+        self.profile = StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.open_task = Task.objects.create(order=1, name="Open")
+        self.restricted_task = Task.objects.create(order=2, name="Restricted")
+        self.restricted_task.authorized_signers.add(self.other)
+        self.training_type = AdvancedTrainingType.objects.create(name="SRO", order=1)
+        self.training_type.authorized_signers.add(self.other)
+        self.manage_perm = Permission.objects.get(codename='manage_advanced_training')
+
+    def test_snapshot_rules(self):
+        """Empty signer lists allow any staff, otherwise only listed users"""
+        perms = permission_index.for_user(self.user)
+        self.assertTrue(perms.has_staff_profile)
+        self.assertTrue(perms.can_sign_off)
+        self.assertTrue(perms.can_sign_task(self.open_task.id))
+        self.assertFalse(perms.can_sign_task(self.restricted_task.id))
+        self.assertFalse(perms.can_sign_advanced(self.training_type.id))
+        self.assertFalse(perms.can_manage_advanced)
+
+        other = permission_index.for_user(self.other)
+        self.assertFalse(other.has_staff_profile)
+        self.assertTrue(other.can_sign_task(self.restricted_task.id))
+        self.assertTrue(other.can_sign_advanced(self.training_type.id))
+
+    def test_invalidated_by_m2m_and_profile_changes(self):
+        """Signer lists, granted perms and can_sign_off refresh the snapshot"""
+        self.restricted_task.authorized_signers.add(self.user)
+        self.assertTrue(permission_index.for_user(self.user).can_sign_task(self.restricted_task.id))
+
+        self.training_type.authorized_signers.remove(self.other)
+        self.assertTrue(permission_index.for_user(self.user).can_sign_advanced(self.training_type.id))
+
+        self.user.user_permissions.add(self.manage_perm)
+        user = User.objects.get(pk=self.user.pk)  # fresh instance, no perm cache
+        self.assertTrue(permission_index.for_user(user).can_manage_advanced)
+
+        self.profile.can_sign_off = False
+        self.profile.save()
+        self.assertFalse(permission_index.for_user(self.user).can_sign_off)
+
+    def test_model_checks_use_cached_index(self):
+        """can_user_sign_off costs no queries once the snapshot is cached"""
+        with self.captureOnCommitCallbacks(execute=True):
+            permission_index.invalidate()
+        permission_index.for_user(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.open_task.can_user_sign_off(self.user))
+            self.assertFalse(self.restricted_task.can_user_sign_off(self.user))
+            self.assertFalse(self.training_type.can_user_sign_off(self.user))
+
+    def test_bulk_sign_off_permission_queries_constant(self):
+        """Authorization in bulk_sign_off does not scale with the task count"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=cohort)
+        tasks = [Task.objects.create(order=10 + i, name=f"Locked {i}") for i in range(5)]
+        for task in tasks:
+            task.authorized_signers.add(self.other)
+        self.client.login(username='staff', password='password')
+
+        def run(task_list):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(
+                    reverse('bulk_sign_off'),
+                    data=json.dumps({'trainee_ids': [trainee.id], 'task_ids': [t.id for t in task_list]}),
+                    content_type='application/json'
+                )
+            self.assertEqual(len(response.json()['skipped']), len(task_list))
+            return len(ctx.captured_queries)
+
+        run(tasks[:1])  # warm the task and permission caches
+        self.assertEqual(run(tasks[:1]), run(tasks))
+
+    def test_admin_module_permission(self):
+        """Admin advanced sections follow the manage_advanced_training perm"""
+        self.user.user_permissions.add(self.manage_perm)
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('admin:tracker_advancedstaff_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+        self.client.login(username='other', password='password')
+        response = self.client.get(reverse('admin:tracker_advancedstaff_changelist'))
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskPrerequisiteTest(TestCase):
+    """Test task prerequisites and the registry's precomputed closure"""
+
+    def setUp(self):
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+        self.video = Task.objects.create(order=1, name="Video")
+        self.quiz = Task.objects.create(order=2, name="Quiz")
+        self.practical = Task.objects.create(order=3, name="Practical")
+        self.quiz.prerequisites.add(self.video)
+        self.practical.prerequisites.add(self.quiz)
+        self.client.login(username='staff', password='password')
+
+    def test_closure_and_topological_order(self):
+        """Indirect prerequisites are included and ordered before their dependents"""
+        self.video.order = 4
+        self.video.save()
+        snapshot = task_registry.snapshot()
+        self.assertEqual(snapshot.required_ids[self.practical.id], {self.video.id, self.quiz.id})
+        self.assertEqual(snapshot.topological_order, (self.video.id, self.quiz.id, self.practical.id))
+        self.assertEqual(snapshot.missing_prerequisites(self.practical.id, {self.quiz.id}), [self.video.id])
+
+    def test_loops_rejected(self):
+        """A task cannot (indirectly) require itself"""
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.video.prerequisites.add(self.practical)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.practical.dependent_tasks.add(self.video)
+        self.assertEqual(task_registry.snapshot().required_ids[self.video.id], frozenset())
+
+    def test_loop_through_inactive_task_rejected(self):
+        """Loops are checked over every prerequisite link, active or not"""
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+        self.quiz.is_active = False
+        self.quiz.save()
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.quiz.prerequisites.add(self.practical)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.video.prerequisites.add(self.practical)
+        self.assertFalse(self.quiz.prerequisites.filter(pk=self.practical.pk).exists())
+
+        from .admin import TaskAdminForm
+        form = TaskAdminForm(instance=self.video, data={
+            'order': 1, 'name': 'Video', 'is_active': True, 'prerequisites': [self.practical.id],
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('loop', form.errors['prerequisites'][0])
+
+    def test_sign_off_task_blocked_until_unlocked(self):
+        """Single sign-off refuses a locked task"""
+        url = reverse('sign_off_task', args=[self.trainee.badge_number, self.quiz.id])
+        self.client.post(url)
+        self.assertFalse(SignOff.objects.filter(task=self.quiz).exists())
+
+        SignOff.objects.create(trainee=self.trainee, task=self.video, signed_by=self.user)
+        self.client.post(url)
+        self.assertTrue(SignOff.objects.filter(task=self.quiz).exists())
+
+    def test_bulk_sign_off_chain_in_one_request(self):
+        """Prerequisites signed in the same request unlock their dependents"""
+        other = Trainee.objects.create(badge_number="#2502", first_name="B", last_name="Two", cohort=self.cohort)
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({
+                'trainee_ids': [self.trainee.id, other.id],
+                'task_ids': [self.quiz.id, self.practical.id],
+            }),
+            content_type='application/json'
+        )
+        result = response.json()
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(len(result['skipped']), 4)
+        self.assertIn('Video', result['skipped'][0]['reason'])
+
+        SignOff.objects.create(trainee=self.trainee, task=self.video, signed_by=self.user)
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({
+                'trainee_ids': [self.trainee.id, other.id],
+                'task_ids': [self.quiz.id, self.practical.id],
+            }),
+            content_type='application/json'
+        )
+        result = response.json()
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([s['trainee'] for s in result['skipped']], ["#2502", "#2502"])
+
+    def test_trainee_views_show_locked_tasks(self):
+        """The detail page marks locked tasks and the grid counts locked trainees"""
+        response = self.client.get(reverse('trainee_detail', args=[self.trainee.badge_number]))
+        locked = {item['task'].name: item['locked'] for item in response.context['task_progress']}
+        self.assertEqual(locked, {"Video": False, "Quiz": True, "Practical": True})
+
+        self.cohort.is_current_override = True
+        self.cohort.save()
+        response = self.client.get(reverse('trainee_list'))
+        locked_counts = {task.name: task.locked_count for task in response.context['tasks']}
+        self.assertEqual(locked_counts, {"Video": 0, "Quiz": 1, "Practical": 1})
+
+
+class CurriculumTest(TestCase):
+    """Test per-cohort curricula and their cached denominators"""
+
+    def setUp(self):
+        from .models import Curriculum
+
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.tasks = [Task.objects.create(order=i, name=f"Task {i}") for i in range(1, 5)]
+        self.short = Curriculum.objects.create(name="Short")
+        self.short.tasks.add(self.tasks[0], self.tasks[1])
+        self.full_cohort = Cohort.objects.create(name="Spring 2025", year=2025, semester="Spring")
+        self.short_cohort = Cohort.objects.create(
+            name="Fall 2025", year=2025, semester="Fall", curriculum=self.short
+        )
+        self.full_trainee = Trainee.objects.create(
+            badge_number="#2501", first_name="A", last_name="One", cohort=self.full_cohort
+        )
+        self.short_trainee = Trainee.objects.create(
+            badge_number="#2502", first_name="B", last_name="Two", cohort=self.short_cohort
+        )
+        for trainee in (self.full_trainee, self.short_trainee):
+            SignOff.objects.create(trainee=trainee, task=self.tasks[0], signed_by=self.user)
+            SignOff.objects.create(trainee=trainee, task=self.tasks[3], signed_by=self.user)
+
+    def progress(self, trainee):
+        return Trainee.objects.select_related('progress').get(pk=trainee.pk).get_progress_percentage()
+
+    def test_progress_uses_cohort_curriculum(self):
+        """Each trainee is measured against their own cohort's task set"""
+        self.assertEqual(self.progress(self.full_trainee), 50.0)   # 2 of 4
+        self.assertEqual(self.progress(self.short_trainee), 50.0)  # 1 of 2 (task 4 not in curriculum)
+        snapshot = task_registry.snapshot()
+        self.assertEqual(snapshot.total_for(self.short.id), 2)
+        self.assertEqual(snapshot.total_for(None), 4)
+
+    def test_curriculum_changes_refresh_progress(self):
+        """Editing the curriculum or the cohort's assignment recomputes progress"""
+        self.short.tasks.add(self.tasks[3])
+        self.assertEqual(self.progress(self.short_trainee), 66.7)
+
+        self.short.tasks.remove(self.tasks[1])
+        self.assertEqual(self.progress(self.short_trainee), 100.0)
+
+        self.short_cohort.curriculum = None
+        self.short_cohort.save()
+        self.assertEqual(self.progress(self.short_trainee), 50.0)
+
+    def test_moving_trainee_refreshes_progress(self):
+        """A trainee moved into a curriculum cohort is re-measured"""
+        self.full_trainee.cohort = self.short_cohort
+        self.full_trainee.save()
+        self.assertEqual(self.progress(self.full_trainee), 50.0)
+        self.short.delete()
+        self.assertEqual(self.progress(self.full_trainee), 50.0)
+        self.assertEqual(self.progress(self.short_trainee), 50.0)
+
+    def test_views_use_curriculum_tasks(self):
+        """Grid, detail page and bulk sign-off only offer the curriculum's tasks"""
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('archive_detail', args=[self.short_cohort.id]))
+        self.assertEqual([t.name for t in response.context['tasks']], ["Task 1", "Task 2"])
+
+        response = self.client.get(reverse('trainee_detail', args=[self.short_trainee.badge_number]))
+        self.assertEqual([item['task'].name for item in response.context['task_progress']], ["Task 1", "Task 2"])
+
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': [self.short_trainee.id], 'task_ids': [self.tasks[1].id, self.tasks[2].id]}),
+            content_type='application/json'
+        )
+        result = response.json()
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['skipped'][0]['task'], "Task 3")
+
+    def test_curriculum_must_include_prerequisites(self):
+        """Curricula stay closed under prerequisites, from either side of each relation"""
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+
+        self.tasks[2].prerequisites.add(self.tasks[3])
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.short.tasks.add(self.tasks[2])
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.tasks[2].curricula.add(self.short)
+        self.short.tasks.add(self.tasks[2], self.tasks[3])
+
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.short.tasks.remove(self.tasks[3])
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.tasks[3].curricula.clear()
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.tasks[1].prerequisites.add(Task.objects.create(order=5, name="Task 5"))
+        self.short.tasks.remove(self.tasks[2], self.tasks[3])
+        self.assertEqual(task_registry.snapshot().task_ids_for(self.short.id), (self.tasks[0].id, self.tasks[1].id))
+
+    def test_curriculum_admin_form_rejects_missing_prerequisites(self):
+        """The admin form reports the missing prerequisite instead of failing on save"""
+        from .admin import CurriculumAdminForm, TaskAdminForm
+
+        self.tasks[2].prerequisites.add(self.tasks[3])
+        form = CurriculumAdminForm(data={'name': 'Short', 'tasks': [self.tasks[2].id]}, instance=self.short)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Task 4', form.errors['tasks'][0])
+
+        task_form = TaskAdminForm(instance=self.tasks[0], data={
+            'order': 1, 'name': 'Task 1', 'is_active': True, 'prerequisites': [self.tasks[3].id],
+        })
+        self.assertFalse(task_form.is_valid())
+        self.assertIn('Task 4', task_form.errors['prerequisites'][0])
+
+    def test_single_sign_off_requires_curriculum_task(self):
+        """sign_off_task refuses tasks outside the trainee's curriculum, like bulk sign-off"""
+        self.client.login(username='staff', password='password')
+        self.client.post(reverse('sign_off_task', args=[self.short_trainee.badge_number, self.tasks[2].id]))
+        self.assertFalse(SignOff.objects.filter(trainee=self.short_trainee, task=self.tasks[2]).exists())
+        self.client.post(reverse('sign_off_task', args=[self.short_trainee.badge_number, self.tasks[1].id]))
+        self.assertTrue(SignOff.objects.filter(trainee=self.short_trainee, task=self.tasks[1]).exists())
+
+    def test_bulk_skipped_prerequisite_does_not_unlock(self):
+        """A prerequisite skipped for a trainee (outside its curriculum) does not unlock its dependents"""
+        # Written directly, like rows that predate curriculum validation
+        Task.prerequisites.through.objects.create(from_task=self.tasks[1], to_task=self.tasks[2])
+        task_registry.invalidate()
+        self.client.login(username='staff', password='password')
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': [self.short_trainee.id], 'task_ids': [self.tasks[2].id, self.tasks[1].id]}),
+            content_type='application/json'
+        )
+        result = response.json()
+        self.assertEqual(result['created'], 0)
+        reasons = {skip['task']: skip['reason'] for skip in result['skipped']}
+        self.assertEqual(reasons["Task 3"], "Not part of this trainee's curriculum")
+        self.assertEqual(reasons["Task 2"], "Prerequisites not completed: Task 3")
+
+
+class AdvancedExportTest(TestCase):
+    """Test the indexed advanced training Excel export"""
+
+    def setUp(self):
+        use_temp_export_cache(self)
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+        self.AdvancedStaff = AdvancedStaff
+        self.AdvancedTraining = AdvancedTraining
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.types = dict(AdvancedTrainingType.objects.values_list('name', 'id'))
+        self.staff = AdvancedStaff.objects.create(
+            badge_number="100", first_name="Ada", last_name="Byron", role="Staff", is_active=False
+        )
+        AdvancedTraining.objects.create(
+            staff=self.staff, training_type_id=self.types['KP Training'],
+            completion_date=date(2024, 1, 2), approver_initials="ET"
+        )
+        AdvancedTraining.objects.create(
+            staff=self.staff, training_type_id=self.types['Other Training'],
+            custom_type="Waste", completion_date=date(2024, 3, 1)
+        )
+        AdvancedTraining.objects.create(
+            staff=self.staff, training_type_id=self.types['Other Training'],
+            custom_type="Package", completion_date=date(2024, 2, 1)
+        )
+
+    def test_rows_fill_column_groups(self):
+        """Second Other Training lands in the Other Training 2 columns"""
+        from .excel.advanced import AdvancedExport
+
+        (row,) = AdvancedExport(is_active=False).rows()
+        self.assertEqual(row[:4], ["100", "Byron", "Ada", "Staff"])
+        self.assertEqual(row[4:6], ["01/02/2024", "ET"])
+        self.assertEqual(row[13:15], ["Waste", "03/01/2024"])
+        self.assertEqual(row[17:19], ["Package", "02/01/2024"])
+
+    def test_query_count_independent_of_staff(self):
+        """Types, trainings and staff are each loaded once"""
+        from .excel.advanced import AdvancedExport
+
+        for n in range(5):
+            staff = self.AdvancedStaff.objects.create(
+                badge_number=f"2{n}", first_name="B", last_name=f"{n}", role="Staff", is_active=False
+            )
+            self.AdvancedTraining.objects.create(staff=staff, training_type_id=self.types['Escort Training'])
+        with self.assertNumQueries(3):
+            rows = list(AdvancedExport(is_active=False).rows())
+        self.assertEqual(len(rows), 6)
+
+    def test_streamed_export_matches_template_export(self):
+        """Both export paths write the same values below the headers"""
+        import io
+        from openpyxl import load_workbook
+        from .excel.advanced import AdvancedExport
+
+        def data_rows(export):
+            output = io.BytesIO()
+            export.write(output)
+            ws = load_workbook(output)['ADV_Removed']
+            return [row for row in ws.iter_rows(min_row=3, max_col=21, values_only=True) if any(row)]
+
+        filled = data_rows(AdvancedExport(is_active=False))
+        streamed = data_rows(AdvancedExport(is_active=False, stream_threshold=0))
+
+        self.assertEqual(filled, streamed)
+        self.assertEqual(filled[0][:4], ("100", "Byron", "Ada", "Staff"))
+
+    def test_export_view_downloads_file(self):
+        """The removed-staff export URL returns the workbook"""
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('export_advanced_excel_removed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ADV_TrainingStatus_Removed_', response['Content-Disposition'])
+
+
+class ExportJobTest(TestCase):
+    """Test background export jobs and the versioned file cache"""
+
+    def setUp(self):
+        from .exports import ExportJobQueue
+        self.cache_dir = use_temp_export_cache(self)
+        self.queue = ExportJobQueue()
+        self.cohort = Cohort.objects.create(name="Fall 2025", year=2025, semester="Fall")
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials="ST", can_sign_off=True)
+        self.task = Task.objects.create(order=1, name="Task 1")
+        self.trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+
+    def test_unchanged_data_served_from_cache(self):
+        """A second export of the same data reuses the cached file"""
+        import os
+        from unittest import mock
+        from .exports import CohortExport
+
+        first = self.queue.submit(CohortExport(self.cohort))
+        self.assertTrue(first.done)
+        self.assertTrue(first.path.exists())
+
+        fresh_queue = type(self.queue)()
+        with mock.patch.object(CohortExport, 'write') as write:
+            again = fresh_queue.submit(CohortExport(self.cohort))
+            write.assert_not_called()
+        self.assertTrue(again.done)
+        self.assertEqual(again.path, first.path)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), sorted([first.path.name, first.path.stem + '.json']))
+
+    def test_sign_off_changes_stamp_and_replaces_file(self):
+        """New sign-offs produce a new cached file and drop the stale one"""
+        from .exports import CohortExport
+
+        first = self.queue.submit(CohortExport(self.cohort))
+        SignOff.objects.create(trainee=self.trainee, task=self.task, signed_by=self.user)
+        second = self.queue.submit(CohortExport(self.cohort))
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertTrue(second.path.exists())
+        self.assertFalse(first.path.exists())
+
+    def test_swapped_signers_change_stamp(self):
+        """Editing who signed changes the stamp even when counts and ids stay the same"""
+        from .exports import CohortExport
+
+        other_user = User.objects.create_user('other', 'other@test.com', 'password', is_staff=True)
+        other_task = Task.objects.create(order=2, name="Task 2")
+        first = SignOff.objects.create(trainee=self.trainee, task=self.task, signed_by=self.user)
+        second = SignOff.objects.create(trainee=self.trainee, task=other_task, signed_by=other_user)
+        stamp = CohortExport(self.cohort).data_stamp()
+
+        first.signed_by, second.signed_by = other_user, self.user
+        first.save()
+        second.save()
+        self.assertNotEqual(CohortExport(self.cohort).data_stamp(), stamp)
+
+    def test_worker_thread_and_status_polling(self):
+        """Outside a transaction the job is built by a worker and polled until done"""
+        import time
+        from unittest import mock
+        from . import exports
+
+        class SlowSpec:
+            name = 'slow'
+            filename = 'slow.xlsx'
+
+            def data_stamp(self):
+                return 'v1'
+
+            def write(self, fileobj):
+                time.sleep(0.05)
+                fileobj.write(b'data')
+                return ['note']
+
+        with mock.patch.object(exports, 'export_jobs', self.queue), \
+                mock.patch.object(exports, 'connection') as fake_connection:
+            fake_connection.in_atomic_block = False
+            job = self.queue.submit(SlowSpec())
+            self.assertIn(job.status, ('queued', 'running'))
+
+            self.client.login(username='staff', password='password')
+            status_url = reverse('export_job_status', args=[job.id])
+            for _ in range(100):
+                data = self.client.get(status_url).json()
+                if data['status'] == 'done':
+                    break
+                time.sleep(0.05)
+
+            self.assertEqual(data['status'], 'done')
+            self.assertEqual(data['warnings'], ['note'])
+            response = self.client.get(data['download_url'])
+            self.assertEqual(b''.join(response.streaming_content), b'data')
+
+    def test_export_view_json_status(self):
+        """JSON clients get the job status of a finished export"""
+        self.client.login(username='staff', password='password')
+        response = self.client.get(reverse('export_cohort', args=[self.cohort.id]), HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'done')
+        self.assertEqual(self.client.get(response.json()['download_url']).status_code, 200)
+
+
+class TemplateCacheTest(TestCase):
+    """Test the shared in-memory cache of Excel templates"""
+
+    def setUp(self):
+        import os
+        import shutil
+        import tempfile
+        from .excel.assets import TemplateCache
+        from .excel.config import ADVANCED_TEMPLATE_PATH
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'template.xlsx')
+        shutil.copy(ADVANCED_TEMPLATE_PATH, self.path)
+        self.cache = TemplateCache()
+        self.cache.RECHECK_SECONDS = 0
+
+    def test_file_read_once_per_mtime(self):
+        """Repeat lookups reuse the bytes until the file changes"""
+        import os
+
+        asset = self.cache.get(self.path)
+        self.assertIs(self.cache.get(self.path), asset)
+        with open(self.path, 'rb') as template_file:
+            self.assertEqual(asset.data, template_file.read())
+
+        os.utime(self.path, (asset.mtime + 10, asset.mtime + 10))
+        self.assertIsNot(self.cache.get(self.path), asset)
+
+    def test_workbooks_are_independent_copies(self):
+        """Each caller gets its own workbook, parsed only once"""
+        from unittest import mock
+
+        first = self.cache.load_workbook(self.path)
+        first['ADV']['A3'] = 'changed'
+        with mock.patch('tracker.excel.assets.openpyxl.load_workbook') as parse:
+            second = self.cache.load_workbook(self.path)
+            parse.assert_not_called()
+        self.assertNotEqual(second['ADV']['A3'].value, 'changed')
+        self.assertEqual(second.sheetnames, first.sheetnames)
+
+    def test_missing_file(self):
+        """Missing templates raise FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(self.path + '.missing')
+
+
+class ArchiveExportTest(TestCase):
+    """Test the multi-cohort zip export"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.fall = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.spring = Cohort.objects.create(name="Spring 2025", year=2025, semester="Spring")
+        Trainee.objects.create(badge_number="#2401", first_name="A", last_name="One", cohort=self.fall)
+        self.client.login(username='staff', password='password')
+
+    def zip_names(self, response):
+        import io
+        import zipfile
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_all_cohorts(self):
+        """Without a selection every cohort gets a workbook"""
+        archive = self.zip_names(self.client.get(reverse('export_archive_zip')))
+        self.assertEqual(sorted(archive.namelist()), [
+            'Check_list_Orientation_fall-2024.xlsx',
+            'Check_list_Orientation_spring-2025.xlsx',
+        ])
+
+    def test_selected_cohorts(self):
+        """Only the selected cohorts are exported"""
+        import io
+        from openpyxl import load_workbook
+
+        archive = self.zip_names(self.client.get(reverse('export_archive_zip'), {'cohort': [self.fall.id]}))
+        self.assertEqual(archive.namelist(), ['Check_list_Orientation_fall-2024.xlsx'])
+        ws = load_workbook(io.BytesIO(archive.read('Check_list_Orientation_fall-2024.xlsx'))).active
+        self.assertEqual(ws.cell(row=5, column=1).value, "#2401")
+
+    def test_failed_cohort_reported(self):
+        """A cohort that cannot be built is listed in the report instead of aborting the zip"""
+        from unittest import mock
+        from .excel.archive import REPORT_NAME
+        from .excel.orientation import write_cohort_workbook as original
+
+        def flaky(cohort, fileobj):
+            if cohort.pk == self.spring.pk:
+                raise ValueError("boom")
+            return original(cohort, fileobj)
+
+        with mock.patch('tracker.excel.orientation.write_cohort_workbook', side_effect=flaky):
+            archive = self.zip_names(self.client.get(reverse('export_archive_zip')))
+        self.assertIn('Check_list_Orientation_fall-2024.xlsx', archive.namelist())
+        self.assertIn('spring-2025.xlsx: FAILED - boom', archive.read(REPORT_NAME).decode())
+
+    def test_invalid_selection(self):
+        """Non-numeric cohort ids redirect back with an error"""
+        response = self.client.get(reverse('export_archive_zip'), {'cohort': ['x']})
+        self.assertRedirects(response, reverse('archive_list'))
+
+
+class DataExportTest(TestCase):
+    """Test the streaming CSV/NDJSON data exports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.other = User.objects.create_user('other', 'other@test.com', 'password', is_staff=True)
+        self.fall = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.spring = Cohort.objects.create(name="Spring 2025", year=2025, semester="Spring")
+        self.task = Task.objects.create(name="Task 1", order=1)
+        self.t1 = Trainee.objects.create(badge_number="#2401", first_name="A", last_name="One", cohort=self.fall)
+        self.t2 = Trainee.objects.create(badge_number="#2501", first_name="B", last_name="Two", cohort=self.spring)
+        SignOff.objects.create(trainee=self.t1, task=self.task, signed_by=self.user, notes='a, "quoted" note')
+        SignOff.objects.create(trainee=self.t2, task=self.task, signed_by=self.other)
+        self.client.login(username='staff', password='password')
+
+    def export(self, dataset, **params):
+        response = self.client.get(reverse('export_data', args=[dataset]), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        """CSV has a header row and correctly quoted values"""
+        import csv
+        import io
+        rows = list(csv.DictReader(io.StringIO(self.export('signoffs'))))
+        self.assertEqual(len(rows), 2)
+        by_badge = {row['badge_number']: row for row in rows}
+        self.assertEqual(by_badge['#2401']['notes'], 'a, "quoted" note')
+        self.assertEqual(by_badge['#2401']['signed_by_username'], 'staff')
+
+    def test_ndjson_cohort_filter(self):
+        """NDJSON emits one object per line, filtered by cohort"""
+        lines = self.export('signoffs', format='ndjson', cohort=self.spring.id).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['badge_number'], '#2501')
+
+    def test_user_and_date_filters(self):
+        """Signer and date-range filters narrow the rows"""
+        lines = self.export('signoffs', format='ndjson', user=self.other.id).splitlines()
+        self.assertEqual([json.loads(line)['signed_by_id'] for line in lines], [self.other.id])
+
+        today = timezone.localdate()
+        self.assertEqual(len(self.export('signoffs', format='ndjson', since=today, until=today).splitlines()), 2)
+        tomorrow = today + timedelta(days=1)
+        self.assertEqual(self.export('signoffs', format='ndjson', since=tomorrow), '')
+
+    def test_trainees_dataset(self):
+        """Trainee rows include cohort and materialized progress"""
+        rows = [json.loads(line) for line in self.export('trainees', format='ndjson').splitlines()]
+        self.assertEqual([row['badge_number'] for row in rows], ['#2401', '#2501'])
+        self.assertEqual(rows[0]['cohort_name'], 'Fall 2024')
+        self.assertEqual(rows[0]['percentage'], 100.0)
+
+    def test_bad_requests(self):
+        """Unknown datasets 404; bad formats and filters are rejected with 400"""
+        url = reverse('export_data', args=['signoffs'])
+        self.assertEqual(self.client.get(reverse('export_data', args=['nope'])).status_code, 404)
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_data', args=['advanced']), {'cohort': 1}).status_code, 400)
+
+
+class ConcurrencyLimitTest(TestCase):
+    """Test the heavy-endpoint gates"""
+
+    def setUp(self):
+        from .throttle import request_gates
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.client.login(username='staff', password='password')
+        override = self.settings(HEAVY_REQUEST_LIMITS={'export': 1, 'search': 1},
+                                 HEAVY_REQUEST_MAX_WAITING=1, HEAVY_REQUEST_WAIT_SECONDS=0.05)
+        override.enable()
+        self.addCleanup(override.disable)
+        request_gates.reset()
+        self.addCleanup(request_gates.reset)
+        self.gates = request_gates
+
+    def test_gate_waits_then_rejects(self):
+        """A full gate admits a waiter once a slot frees up, and rejects after the wait runs out"""
+        import threading
+        from .throttle import RequestGate
+
+        gate = RequestGate('test', limit=1, max_waiting=1, wait_seconds=5)
+        self.assertTrue(gate.acquire())
+        threading.Timer(0.05, gate.release).start()
+        self.assertTrue(gate.acquire())
+        self.assertGreater(gate.stats()['max_wait_seconds'], 0)
+
+        gate.wait_seconds = 0.01
+        self.assertFalse(gate.acquire())
+        self.assertEqual(gate.stats()['rejected'], 1)
+
+        gate.max_waiting = 0
+        self.assertFalse(gate.acquire())
+        self.assertEqual(gate.stats()['rejected'], 2)
+
+    def test_busy_endpoint_returns_429(self):
+        """A request that cannot get a slot gets 429 with Retry-After"""
+        gate = self.gates.get('export')
+        self.assertTrue(gate.acquire())
+        try:
+            response = self.client.get(reverse('export_data', args=['trainees']))
+        finally:
+            gate.release()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.client.get(reverse('export_data', args=['trainees'])).status_code, 200)
+
+    def test_streaming_response_holds_slot(self):
+        """A streamed export keeps its slot until the stream is consumed"""
+        response = self.client.get(reverse('export_data', args=['trainees']))
+        gate = self.gates.get('export')
+        self.assertEqual(gate.stats()['active'], 1)
+        b''.join(response.streaming_content)
+        self.assertEqual(gate.stats()['active'], 0)
+
+    def test_only_search_is_limited(self):
+        """archive_list is limited only when searching"""
+        gate = self.gates.get('search')
+        self.assertTrue(gate.acquire())
+        try:
+            self.assertEqual(self.client.get(reverse('archive_list')).status_code, 200)
+            self.assertEqual(self.client.get(reverse('archive_list'), {'search': 'x'}).status_code, 429)
+        finally:
+            gate.release()
+
+    def test_stats_endpoint(self):
+        """Queue depth and wait times are reported per gate"""
+        self.client.get(reverse('archive_list'), {'search': 'x'})
+        data = self.client.get(reverse('heavy_request_stats')).json()
+        self.assertEqual(data['gates']['search']['admitted'], 1)
+        self.assertEqual(data['gates']['search']['waiting'], 0)
+
+
+class KeysetPaginationTest(TestCase):
+    """Test cursor pagination of the trainee lists and archive search"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        today = date.today()
+        self.current = Cohort.objects.create(
+            name="Current", year=2025, semester="Fall",
+            start_date=today - timedelta(days=30), end_date=today + timedelta(days=30),
+        )
+        self.old = Cohort.objects.create(name="Spring 2024", year=2024, semester="Spring")
+        for number in range(5):
+            Trainee.objects.create(badge_number=f"#25{number:02d}", first_name="Pat", last_name=f"C{number}", cohort=self.current)
+            Trainee.objects.create(badge_number=f"#24{number:02d}", first_name="Pat", last_name=f"O{number}", cohort=self.old)
+        self.client.login(username='staff', password='password')
+        override = self.settings(TRAINEE_PAGE_SIZE=2)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def walk(self, url, params=None, items='trainees'):
+        """Follow next links to the end, returning every page's badge numbers"""
+        from django.http import QueryDict
+        pages = []
+        response = self.client.get(url, params or {})
+        while True:
+            rows = response.context[items]
+            pages.append([getattr(row, 'badge_number', None) or row['trainee'].badge_number for row in rows])
+            page = response.context['page' if items == 'trainees' else 'search_page']
+            if not page.has_next:
+                return pages, page
+            response = self.client.get(url, QueryDict(page.next_query))
+
+    def test_trainee_list_pages(self):
+        """Pages follow badge order and never repeat or skip a trainee"""
+        pages, last = self.walk(reverse('trainee_list'))
+        self.assertEqual(pages, [['#2500', '#2501'], ['#2502', '#2503'], ['#2504']])
+        self.assertTrue(last.has_prev)
+
+    def test_previous_page(self):
+        """The before cursor returns the preceding page in ascending order"""
+        from django.http import QueryDict
+        first = self.client.get(reverse('trainee_list')).context['page']
+        second = self.client.get(reverse('trainee_list'), QueryDict(first.next_query)).context['page']
+        back = self.client.get(reverse('trainee_list'), QueryDict(second.prev_query)).context['page']
+        self.assertEqual([t.badge_number for t in back], ['#2500', '#2501'])
+        self.assertFalse(back.has_prev)
+
+    def test_archive_detail_keeps_filters(self):
+        """Page links keep the missing-task filter"""
+        task = Task.objects.create(name="Task 1", order=1)
+        SignOff.objects.create(trainee=Trainee.objects.get(badge_number="#2401"), task=task, signed_by=self.user)
+        pages, _ = self.walk(reverse('archive_detail', args=[self.old.id]), {'missing_task': task.id})
+        self.assertEqual(pages, [['#2400', '#2402'], ['#2403', '#2404']])
+
+    def test_search_pages_across_cohorts(self):
+        """Search pages by (year, semester, badge)"""
+        pages, _ = self.walk(reverse('archive_list'), {'search': 'Pat'}, items='search_results')
+        flat = [badge for page in pages for badge in page]
+        self.assertEqual(flat, [f"#24{n:02d}" for n in range(5)] + [f"#25{n:02d}" for n in range(5)])
+        self.assertEqual(len(pages), 5)
+
+    def test_invalid_cursor_shows_first_page(self):
+        """An unreadable cursor falls back to the first page"""
+        response = self.client.get(reverse('trainee_list'), {'after': 'not-a-cursor'})
+        self.assertEqual([t.badge_number for t in response.context['trainees']], ['#2500', '#2501'])
+
+
+class DeltaSyncTest(TestCase):
+    """Test the delta-sync endpoint used instead of reloading after bulk actions"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials='ST')
+        self.cohort = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.task = Task.objects.create(name="Task 1", order=1)
+        self.task2 = Task.objects.create(name="Task 2", order=2)
+        self.t1 = Trainee.objects.create(badge_number="#2401", first_name="A", last_name="One", cohort=self.cohort)
+        self.t2 = Trainee.objects.create(badge_number="#2402", first_name="B", last_name="Two", cohort=self.cohort)
+        self.client.login(username='staff', password='password')
+
+    def sync(self, since, **params):
+        response = self.client.get(reverse('sync_changes'), {'since': since.isoformat(), **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def later(self):
+        """A watermark far enough after the setup writes to be past the overlap window"""
+        from .changes import SYNC_OVERLAP
+        return timezone.now() + SYNC_OVERLAP + timedelta(seconds=1)
+
+    def test_only_changed_trainees(self):
+        """A sign-off moves its trainee's progress row past the watermark"""
+        from unittest import mock
+        since = self.later()
+        with mock.patch('django.utils.timezone.now', return_value=since + timedelta(seconds=1)):
+            SignOff.objects.create(trainee=self.t1, task=self.task, signed_by=self.user)
+            data = self.sync(since, cohort=self.cohort.id)
+        self.assertEqual([row['id'] for row in data['trainees']], [self.t1.id])
+        self.assertEqual(data['trainees'][0]['percentage'], 50.0)
+        self.assertIn('data-trainee-id="%d"' % self.t1.id, data['trainees'][0]['row_html'])
+        self.assertEqual(self.sync(since + timedelta(seconds=10), cohort=self.cohort.id)['trainees'], [])
+
+    def test_bulk_update_and_unsign_are_reported(self):
+        """Bulk updates of existing sign-offs and unsigns show up"""
+        from unittest import mock
+        signoff = SignOff.objects.create(trainee=self.t2, task=self.task, signed_by=self.user)
+        since = self.later()
+        with mock.patch('django.utils.timezone.now', return_value=since + timedelta(seconds=1)):
+            response = self.client.post(
+                reverse('bulk_sign_off'),
+                json.dumps({'trainee_ids': [self.t2.id], 'task_ids': [self.task.id], 'notes': 'again'}),
+                content_type='application/json',
+            )
+            self.assertEqual(response.json()['updated'], 1)
+            data = self.sync(since, ids=f'{self.t1.id},{self.t2.id}')
+        self.assertEqual([row['id'] for row in data['trainees']], [self.t2.id])
+
+        with mock.patch('django.utils.timezone.now', return_value=since + timedelta(seconds=20)):
+            self.client.post(reverse('unsign_task', args=[self.t2.badge_number, self.task.id]))
+            data = self.sync(since + timedelta(seconds=19), cohort=self.cohort.id)
+        self.assertEqual(data['unsigned'][0]['task_id'], self.task.id)
+        self.assertEqual(data['trainees'][0]['percentage'], 0.0)
+        self.assertFalse(SignOff.objects.filter(pk=signoff.pk).exists())
+
+    def test_deactivated_trainee_removed(self):
+        """Deactivated trainees are reported as removed"""
+        since = timezone.now() - timedelta(seconds=1)
+        self.t1.is_active = False
+        self.t1.save()
+        data = self.sync(since, cohort=self.cohort.id)
+        removed = {row['id']: row['removed'] for row in data['trainees']}
+        self.assertTrue(removed[self.t1.id])
+
+    def test_trainee_scope_renders_task_rows(self):
+        """The detail scope returns every task row of a changed trainee"""
+        since = timezone.now() - timedelta(seconds=1)
+        SignOff.objects.create(trainee=self.t1, task=self.task, signed_by=self.user)
+        data = self.sync(since, trainee=self.t1.id)
+        self.assertEqual([row['task_id'] for row in data['tasks']], [self.task.id, self.task2.id])
+        self.assertIn('Completed', data['tasks'][0]['row_html'])
+
+    def test_pages_carry_watermark(self):
+        """List and detail pages render a watermark for the first sync"""
+        self.assertTrue(self.client.get(reverse('trainee_list')).context['sync_watermark'])
+        self.assertTrue(self.client.get(reverse('trainee_detail', args=[self.t1.badge_number])).context['sync_watermark'])
+
+    def test_invalid_watermark(self):
+        """An unreadable watermark is rejected"""
+        response = self.client.get(reverse('sync_changes'), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class LiveEventsTest(TestCase):
+    """Test the in-process event bus and the Server-Sent Events stream"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.cohort = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.task = Task.objects.create(name="Task 1", order=1)
+        self.trainee = Trainee.objects.create(badge_number="#2401", first_name="A", last_name="One", cohort=self.cohort)
+
+    def test_bus_delivers_across_threads(self):
+        """Events published from a worker thread reach an asyncio subscriber"""
+        import asyncio
+        import threading
+        from .events import EventBus
+
+        bus = EventBus()
+
+        async def listen():
+            with bus.subscribe('cohort:1') as subscription:
+                self.assertTrue(bus.has_subscribers('cohort:1'))
+                threading.Thread(target=bus.publish, args=('cohort:1', {'type': 'signoff'})).start()
+                return await subscription.get(timeout=5), await subscription.get(timeout=0.01)
+
+        event, timed_out = asyncio.run(listen())
+        self.assertEqual(event['type'], 'signoff')
+        self.assertIsNone(timed_out)
+        self.assertFalse(bus.has_subscribers())
+
+    def test_overflow_becomes_resync(self):
+        """A subscriber that falls behind gets one resync event"""
+        import asyncio
+        from unittest import mock
+        from .events import EventBus
+
+        bus = EventBus()
+
+        async def listen():
+            with mock.patch('tracker.events.SUBSCRIBER_QUEUE_SIZE', 1):
+                with bus.subscribe('advanced') as subscription:
+                    bus.publish('advanced', {'type': 'advanced'})
+                    bus.publish('advanced', {'type': 'advanced'})
+                    await asyncio.sleep(0)
+                    return [(await subscription.get(timeout=0.01) or {}).get('type') for _ in range(3)]
+
+        self.assertEqual(asyncio.run(listen()), ['advanced', 'resync', None])
+
+    def test_signals_publish_after_commit(self):
+        """Sign-offs, unsigns and advanced training are published to the cohort channel on commit"""
+        from unittest import mock
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+
+        staff = AdvancedStaff.objects.create(badge_number="2401", first_name="A", last_name="One", role='Trainee')
+        training_type = AdvancedTrainingType.objects.create(name="Escort")
+        with mock.patch('tracker.events.event_bus') as bus:
+            bus.has_subscribers.return_value = True
+            with self.captureOnCommitCallbacks(execute=True):
+                signoff = SignOff.objects.create(trainee=self.trainee, task=self.task, signed_by=self.user)
+            bus.publish.assert_called_once_with(
+                f'cohort:{self.cohort.id}', {'type': 'signoff', 'trainee_ids': [self.trainee.id], 'task_ids': [self.task.id]}
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                signoff.delete()
+            self.assertEqual(bus.publish.call_args.args[1]['type'], 'unsign')
+            with self.captureOnCommitCallbacks(execute=True):
+                AdvancedTraining.objects.create(staff=staff, training_type=training_type)
+            channels = [call.args[0] for call in bus.publish.call_args_list[-2:]]
+            self.assertEqual(channels, ['advanced', f'cohort:{self.cohort.id}'])
+
+    def test_no_lookups_without_subscribers(self):
+        """Nothing is queried for events while nobody listens"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .events import publish_signoff_change
+
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            publish_signoff_change('signoff', [self.trainee.id], [self.task.id])
+        self.assertEqual(len(queries), 0)
+
+    def test_wsgi_stream_polls(self):
+        """Under WSGI one database check answers immediately and tells the browser when to poll again"""
+        self.client.login(username='staff', password='password')
+        since = timezone.now() - timedelta(seconds=1)
+        SignOff.objects.create(trainee=self.trainee, task=self.task, signed_by=self.user)
+        with self.settings(EVENT_STREAM_POLL_SECONDS=20):
+            response = self.client.get(reverse('event_stream'), {'cohort': self.cohort.id, 'since': since.isoformat()})
+        body = response.content.decode()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(body.startswith('retry: 20000\n\n'))
+        self.assertIn('event: signoff', body)
+        self.assertIn(f'"trainee_ids": [{self.trainee.id}]', body)
+        self.assertIn('id: ', body)
+
+    def test_wsgi_advanced_poll_resumes_from_event_id(self):
+        """The advanced poll's event id changes with AdvancedTraining, so reconnects only report real changes"""
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+
+        self.client.login(username='staff', password='password')
+        url = reverse('event_stream')
+        body = self.client.get(url, {'channel': 'advanced'}).content.decode()
+        self.assertNotIn('event: advanced', body)
+        event_id = body.split('id: ')[1].split('\n')[0]
+
+        body = self.client.get(url, {'channel': 'advanced'}, HTTP_LAST_EVENT_ID=event_id).content.decode()
+        self.assertNotIn('event: advanced', body)
+
+        staff = AdvancedStaff.objects.create(badge_number="900", first_name="A", last_name="B", role="Staff")
+        AdvancedTraining.objects.create(staff=staff, training_type=AdvancedTrainingType.objects.first())
+        body = self.client.get(url, {'channel': 'advanced'}, HTTP_LAST_EVENT_ID=event_id).content.decode()
+        self.assertIn('event: advanced', body)
+
+    def test_stream_requires_channel(self):
+        """A cohort or the advanced channel must be chosen"""
+        self.client.login(username='staff', password='password')
+        self.assertEqual(self.client.get(reverse('event_stream')).status_code, 400)
+
+    async def test_asgi_stream_forwards_bus_events(self):
+        """Under ASGI the stream forwards published events and sends heartbeats"""
+        from .events import event_bus
+
+        await self.async_client.aforce_login(self.user)
+        with self.settings(EVENT_STREAM_HEARTBEAT_SECONDS=0.01):
+            response = await self.async_client.get(reverse('event_stream'), {'channel': 'advanced'})
+            chunks = response.streaming_content.__aiter__()
+            self.assertEqual(await chunks.__anext__(), b'retry: 3000\n\n')
+            self.assertEqual(await chunks.__anext__(), b': keepalive\n\n')
+            event_bus.publish('advanced', {'type': 'advanced', 'staff_id': 1})
+            chunk = await chunks.__anext__()
+            while chunk == b': keepalive\n\n':
+                chunk = await chunks.__anext__()
+            await chunks.aclose()
+        self.assertTrue(chunk.startswith(b'event: advanced\nid: '))
+        self.assertIn(b'"staff_id": 1', chunk)
+
+
+class BadgeStatusPromotionTest(TestCase):
+    """Test that completing orientation promotes advanced staff without any page view writing"""
+
+    def setUp(self):
+        from .models import AdvancedStaff
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials='ST')
+        self.cohort = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.task = Task.objects.create(name="Task 1", order=1)
+        self.task2 = Task.objects.create(name="Task 2", order=2)
+        self.trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+        self.staff, _ = AdvancedStaff.objects.get_or_create(
+            badge_number="2501", defaults={'first_name': "A", 'last_name': "One", 'role': 'Trainee'}
+        )
+
+    def status(self):
+        self.staff.refresh_from_db()
+        return self.staff.badge_status
+
+    def test_last_signoff_promotes(self):
+        """Signing off the final task moves the staff record to ready_to_issue"""
+        SignOff.objects.create(trainee=self.trainee, task=self.task, signed_by=self.user)
+        self.assertEqual(self.status(), 'badging_in_progress')
+        SignOff.objects.create(trainee=self.trainee, task=self.task2, signed_by=self.user)
+        self.assertEqual(self.status(), 'ready_to_issue')
+
+    def test_bulk_signoff_promotes(self):
+        """The bulk sign-off path promotes too"""
+        self.client.login(username='staff', password='password')
+        response = self.client.post(
+            reverse('bulk_sign_off'),
+            data=json.dumps({'trainee_ids': [self.trainee.id], 'task_ids': [self.task.id, self.task2.id]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(self.status(), 'ready_to_issue')
+
+    def test_other_statuses_untouched(self):
+        """Only badging_in_progress is promoted"""
+        self.staff.badge_status = 'onboarding_halted'
+        self.staff.save()
+        for task in (self.task, self.task2):
+            SignOff.objects.create(trainee=self.trainee, task=task, signed_by=self.user)
+        self.assertEqual(self.status(), 'onboarding_halted')
+
+    def test_main_page_is_read_only(self):
+        """Viewing the main page neither writes nor scans trainee progress"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import AdvancedStaff
+        for task in (self.task, self.task2):
+            SignOff.objects.create(trainee=self.trainee, task=task, signed_by=self.user)
+        AdvancedStaff.objects.filter(pk=self.staff.pk).update(badge_status='badging_in_progress')
+        self.client.login(username='staff', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('advanced_staff_main')).status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith(('UPDATE', 'INSERT'))
+                          and 'tracker_advancedstaff' in q['sql']])
+        self.assertEqual(self.status(), 'badging_in_progress')
+
+    def test_reconcile_command_backfills(self):
+        """reconcile_badge_status promotes completed trainees' staff; --dry-run changes nothing"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import AdvancedStaff
+        for task in (self.task, self.task2):
+            SignOff.objects.create(trainee=self.trainee, task=task, signed_by=self.user)
+        AdvancedStaff.objects.filter(pk=self.staff.pk).update(badge_status='badging_in_progress')
+
+        out = StringIO()
+        call_command('reconcile_badge_status', '--dry-run', stdout=out)
+        self.assertIn('Would promote 2501', out.getvalue())
+        self.assertEqual(self.status(), 'badging_in_progress')
+
+        call_command('reconcile_badge_status', stdout=StringIO())
+        self.assertEqual(self.status(), 'ready_to_issue')
+
+
+    def test_import_uses_exact_completion(self):
+        """Importing trainees sets ready_to_issue from the exact count, like the promotion hook"""
+        from .models import AdvancedStaff
+        User.objects.create_superuser('admin', 'admin@test.com', 'password')
+        complete = Trainee.objects.create(badge_number="#2502", first_name="B", last_name="Two", cohort=self.cohort)
+        partial = Trainee.objects.create(badge_number="#2503", first_name="C", last_name="Three", cohort=self.cohort)
+        for task in (self.task, self.task2):
+            SignOff.objects.create(trainee=complete, task=task, signed_by=self.user)
+        SignOff.objects.create(trainee=partial, task=self.task, signed_by=self.user)
+        # A rounded percentage of 100 (e.g. 1999 of 2000 tasks) is not completion
+        TraineeProgress.objects.filter(trainee=partial).update(percentage=100.0)
+
+        self.client.login(username='admin', password='password')
+        response = self.client.post(
+            reverse('import_trainees_to_advanced'),
+            data=json.dumps({'trainee_ids': [complete.id, partial.id]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['imported'], 2)
+        self.assertEqual([entry['badge'] for entry in response.json()['incomplete']], ['#2503'])
+        statuses = dict(AdvancedStaff.objects.filter(badge_number__in=['2502', '2503'])
+                        .values_list('badge_number', 'badge_status'))
+        self.assertEqual(statuses, {'2502': 'ready_to_issue', '2503': 'badging_in_progress'})
+
+class EscortRosterTest(TestCase):
+    """Test the single-query, cached printable escort roster"""
+
+    def setUp(self):
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.escort, _ = AdvancedTrainingType.objects.get_or_create(name='Escort Training')
+            self.current = AdvancedStaff.objects.create(
+                badge_number='9001', first_name='Cur', last_name='Rent', role='Staff', badge_status='issued_active')
+            self.expired = AdvancedStaff.objects.create(
+                badge_number='9002', first_name='Ex', last_name='Pired', role='Staff', badge_status='issued_active')
+            AdvancedStaff.objects.create(
+                badge_number='9003', first_name='Not', last_name='Issued', role='Staff')
+            today = date.today()
+            AdvancedTraining.objects.create(staff=self.current, training_type=self.escort,
+                                            completion_date=today - timedelta(days=30),
+                                            termination_date=today)
+            self.expired_training = AdvancedTraining.objects.create(
+                staff=self.expired, training_type=self.escort,
+                completion_date=today - timedelta(days=400), termination_date=today - timedelta(days=1))
+
+    def test_roster_in_one_query(self):
+        """Badge, name and escort flag come back in a single round trip"""
+        from .roster import escort_roster
+        with self.assertNumQueries(1):
+            rows = escort_roster()
+        self.assertEqual(rows, [
+            {'badge_number': '9002', 'full_name': 'Pired, Ex', 'has_escort': False},
+            {'badge_number': '9001', 'full_name': 'Rent, Cur', 'has_escort': True},
+        ])
+
+    def test_page_cached_until_training_changes(self):
+        """Repeat views render nothing; an AdvancedTraining change rebuilds the page"""
+        url = reverse('advanced_staff_printable_list')
+        self.assertContains(self.client.get(url), 'Escort Authorized: 1')
+        with self.assertNumQueries(2):  # session + user only
+            self.assertContains(self.client.get(url), 'Escort Authorized: 1')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.expired_training.termination_date = date.today() + timedelta(days=365)
+            self.expired_training.save()
+        self.assertContains(self.client.get(url), 'Escort Authorized: 2')
+
+    def test_staff_change_invalidates(self):
+        """Revoking a badge drops the staff member from the cached roster"""
+        url = reverse('advanced_staff_printable_list')
+        self.assertContains(self.client.get(url), 'data-badge="9001"')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.current.badge_status = 'terminated'
+            self.current.save()
+        self.assertNotContains(self.client.get(url), 'data-badge="9001"')
+
+
+class TrainingPivotTest(TestCase):
+    """Test the staff x training-type pivot behind the advanced grids"""
+
+    def setUp(self):
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+        self.AdvancedStaff = AdvancedStaff
+        self.AdvancedTraining = AdvancedTraining
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.types = list(AdvancedTrainingType.objects.filter(is_active=True).order_by('order'))
+        self.by_name = {t.name: t for t in self.types}
+        self.staff = AdvancedStaff.objects.create(badge_number="100", first_name="Ada", last_name="Byron", role="Staff")
+        AdvancedStaff.objects.create(badge_number="101", first_name="No", last_name="Training", role="Staff")
+        today = date.today()
+        AdvancedTraining.objects.create(
+            staff=self.staff, training_type=self.by_name['KP Training'],
+            completion_date=today - timedelta(days=10), approver_initials="ET", termination_date=today + timedelta(days=5)
+        )
+        AdvancedTraining.objects.create(
+            staff=self.staff, training_type=self.by_name['Escort Training'],
+            completion_date=today - timedelta(days=400), termination_date=today - timedelta(days=1)
+        )
+        for custom_type, days in (("Waste", 30), ("Package", 60), ("Spill", None)):
+            AdvancedTraining.objects.create(
+                staff=self.staff, training_type=self.by_name['Other Training'], custom_type=custom_type,
+                completion_date=today - timedelta(days=days) if days else None
+            )
+
+    def pivot_rows(self, **kwargs):
+        from .pivot import TrainingPivot
+        staff = self.AdvancedStaff.objects.order_by('badge_number')
+        return list(TrainingPivot(staff, self.types, **kwargs).rows())
+
+    def cell(self, row, name):
+        (cell,) = [c for c in row.cells if c.training_type.name == name]
+        return cell
+
+    def test_one_row_per_staff_with_statuses(self):
+        """Every staff member gets a row; status follows is_expired/is_expiring_soon"""
+        rows = self.pivot_rows()
+        self.assertEqual([row.badge_number for row in rows], ["100", "101"])
+        self.assertEqual(len(rows[0].cells), len(self.types))
+        kp, = self.cell(rows[0], 'KP Training').trainings
+        self.assertEqual((kp.approver_initials, kp.status), ("ET", 'expiring'))
+        self.assertEqual(self.cell(rows[0], 'Escort Training').trainings[0].status, 'expired')
+        self.assertTrue(all(not cell.trainings for cell in rows[1].cells))
+
+    def test_multiple_trainings_of_a_type_ranked_newest_first(self):
+        """Several trainings of one type fill slots in completion order, undated last"""
+        other = self.cell(self.pivot_rows()[0], 'Other Training').trainings
+        self.assertEqual([t.custom_type for t in other], ["Waste", "Package", "Spill"])
+        self.assertEqual([t.status for t in other], ['current', 'current', 'none'])
+        capped = self.cell(self.pivot_rows(max_slots={self.by_name['Other Training'].id: 2})[0], 'Other Training')
+        self.assertEqual([t.custom_type for t in capped.trainings], ["Waste", "Package"])
+
+    def test_grid_pages_query_count_independent_of_staff(self):
+        """List and main pages render from the pivot without per-staff queries"""
+        def count(url):
+            from django.db import connection
+            from django.test.utils import CaptureQueriesContext
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(queries)
+
+        urls = [reverse('advanced_staff_list'), reverse('advanced_staff_rows')]
+        before = [count(url) for url in urls]
+        for n in range(5):
+            staff = self.AdvancedStaff.objects.create(badge_number=f"2{n}", first_name="B", last_name=f"{n}", role="Staff")
+            self.AdvancedTraining.objects.create(staff=staff, training_type=self.by_name['KP Training'])
+        self.assertEqual([count(url) for url in urls], before)
+
+
+class AdvancedGridRowsTest(TestCase):
+    """Test the row endpoint behind the virtual-scrolling advanced grid"""
+
+    def setUp(self):
+        from .models import AdvancedStaff, AdvancedTraining, AdvancedTrainingType
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        cohort = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.kp = AdvancedTrainingType.objects.get(name='KP Training')
+        for badge, last, role, status in (
+            ("300", "Cole", "Staff", 'issued_active'),
+            ("301", "Adams", "Faculty", 'badging_in_progress'),
+            ("302", "Baker", "Staff", 'badging_in_progress'),
+        ):
+            staff = AdvancedStaff.objects.create(
+                badge_number=badge, first_name="X", last_name=last, role=role, badge_status=status)
+        AdvancedTraining.objects.create(staff=staff, training_type=self.kp, completion_date=date.today(),
+                                        approver_initials="ET")
+        AdvancedStaff.objects.create(badge_number="303", first_name="Gone", last_name="Away", role="Staff",
+                                     is_active=False)
+        Trainee.objects.create(badge_number="#301", first_name="X", last_name="Adams", cohort=cohort)
+
+    def rows(self, **params):
+        response = self.client.get(reverse('advanced_staff_rows'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def badges(self, **params):
+        return [row['badge'] for row in self.rows(**params)['rows']]
+
+    def test_rows_and_cells(self):
+        """Active staff by badge; cells follow the type order with trainings in field order"""
+        data = self.rows()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual([row['badge'] for row in data['rows']], ["300", "301", "302"])
+        baker = data['rows'][2]
+        self.assertEqual((baker['name'], baker['role'], baker['badge_status']), ("Baker, X", "Staff", 'badging_in_progress'))
+        (training,) = baker['cells'][data['types'].index(self.kp.id)]
+        training = dict(zip(data['fields'], training))
+        self.assertEqual((training['approver_initials'], training['status']), ("ET", 'current'))
+
+    def test_filters(self):
+        """role, badge_status, has_trainee, status and search are applied by the server"""
+        self.assertEqual(self.badges(role='Staff'), ["300", "302"])
+        self.assertEqual(self.badges(badge_status='badging_in_progress'), ["301", "302"])
+        self.assertEqual(self.badges(has_trainee='yes'), ["301"])
+        self.assertEqual(self.badges(has_trainee='no'), ["300", "302"])
+        self.assertEqual(self.badges(status='removed'), ["303"])
+        self.assertEqual(self.badges(q='bak'), ["302"])
+
+    def test_sort_and_window(self):
+        """Sorting is server-side and offset/limit select a window of the sorted rows"""
+        self.assertEqual(self.badges(sort='name'), ["301", "302", "300"])
+        self.assertEqual(self.badges(sort='-badge'), ["302", "301", "300"])
+        self.assertEqual(self.badges(sort='role'), ["301", "300", "302"])
+        data = self.rows(sort='name', offset=1, limit=1)
+        self.assertEqual(([row['badge'] for row in data['rows']], data['total']), (["302"], 3))
+        with self.settings(ADVANCED_GRID_PAGE_SIZE=2):
+            self.assertEqual(len(self.rows(limit=50)['rows']), 2)
+        self.assertEqual(self.client.get(reverse('advanced_staff_rows'), {'offset': 'x'}).status_code, 400)
+
+    def test_main_page_is_a_shell(self):
+        """The main page renders no staff rows itself"""
+        response = self.client.get(reverse('advanced_staff_main'), {'role': 'Staff'})
+        self.assertContains(response, 'id="gridBody"')
+        self.assertContains(response, 'id="gridTypes"')
+        self.assertNotContains(response, 'data-badge="300"')
+
+
+class TraineeDetailQueryTest(TestCase):
+    """Test that the detail page is a fixed number of queries and loads notes on demand"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', 'staff@test.com', 'password', is_staff=True)
+        StaffProfile.objects.create(user=self.user, initials='ST')
+        self.cohort = Cohort.objects.create(name="Fall 2024", year=2024, semester="Fall")
+        self.tasks = [
+            Task.objects.create(name=f"Task {i}", order=i, description="d" * (200 if i == 1 else 10))
+            for i in range(1, 7)
+        ]
+        self.trainee = Trainee.objects.create(badge_number="#2501", first_name="A", last_name="One", cohort=self.cohort)
+        self.client.login(username='staff', password='password')
+
+    def get_detail(self):
+        return self.client.get(reverse('trainee_detail', args=[self.trainee.badge_number]))
+
+    def test_query_count_independent_of_signoffs(self):
+        """More sign-offs do not add queries, and the notes column is never selected"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user, notes="x" * 5000)
+        self.get_detail()  # warm the registry and permission caches
+        with CaptureQueriesContext(connection) as few:
+            self.get_detail()
+        for task in self.tasks[1:]:
+            SignOff.objects.create(trainee=self.trainee, task=task, signed_by=self.user, notes="note")
+        self.get_detail()
+        with CaptureQueriesContext(connection) as more:
+            response = self.get_detail()
+        self.assertEqual(len(few), len(more))
+        signoff_sql = [q['sql'] for q in more if 'tracker_signoff' in q['sql']]
+        self.assertEqual(len(signoff_sql), 1)
+        self.assertNotIn('"tracker_signoff"."notes",', signoff_sql[0])
+        self.assertEqual(response.context['progress_percentage'], 100.0)
+
+    def test_progress_matches_materialized_row(self):
+        """In-memory progress agrees with TraineeProgress"""
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user)
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[1], signed_by=self.user)
+        response = self.get_detail()
+        self.assertEqual(response.context['progress_percentage'], self.trainee.get_progress_percentage())
+
+    def test_details_flag(self):
+        """Rows link to details for long descriptions or sign-offs with notes"""
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[1], signed_by=self.user, notes="see me")
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[2], signed_by=self.user)
+        flags = {item['task'].id: item['has_details'] for item in self.get_detail().context['task_progress']}
+        self.assertTrue(flags[self.tasks[0].id])
+        self.assertTrue(flags[self.tasks[1].id])
+        self.assertFalse(flags[self.tasks[2].id])
+        self.assertFalse(flags[self.tasks[3].id])
+
+    def test_task_details_endpoint(self):
+        """Full description and notes come from the details endpoint"""
+        SignOff.objects.create(trainee=self.trainee, task=self.tasks[0], signed_by=self.user, notes="long note")
+        data = self.client.get(
+            reverse('task_details', args=[self.trainee.badge_number, self.tasks[0].id])
+        ).json()
+        self.assertEqual(data['description'], "d" * 200)
+        self.assertEqual(data['signoff']['notes'], "long note")
+        self.assertEqual(data['signoff']['signed_by'], 'staff')
+
+        data = self.client.get(
+            reverse('task_details', args=[self.trainee.badge_number, self.tasks[1].id])
+        ).json()
+        self.assertIsNone(data['signoff'])
+
+        response = self.client.get(reverse('task_details', args=['#9999', self.tasks[0].id]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,197 @@
+"""
+Concurrency limits for heavy endpoints.
+
+Exports, bulk sign-off, the advanced import and archive search each hold the
+SQLite file for a while. Several at once queue up on the busy timeout and
+stall every other request. Instead, each group of heavy views passes through
+a gate that admits a fixed number of requests at a time:
+
+    @login_required
+    @limit_concurrency('export')
+    def export_something(request): ...
+
+    @limit_concurrency('search', when=lambda request: request.GET.get('search'))
+    def archive_list(request): ...     # only searches are limited
+
+A request that finds its gate full waits up to HEAVY_REQUEST_WAIT_SECONDS
+for a slot. If the wait runs out, or HEAVY_REQUEST_MAX_WAITING requests are
+already waiting, it gets a 429 with a Retry-After header instead. Streaming
+responses that generate their content (not FileResponse) keep their slot
+until the stream is finished or closed.
+
+Gate sizes come from settings.HEAVY_REQUEST_LIMITS (gate name -> concurrent
+requests). ``request_gates.stats()`` reports active/waiting counts and wait
+times per gate; the ``heavy_request_stats`` view serves it as JSON for
+monitoring.
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+
+logger = logging.getLogger('tracker')
+
+DEFAULT_LIMIT = 2
+
+
+class RequestGate:
+    """Counting semaphore with a bounded wait queue and wait-time statistics."""
+
+    def __init__(self, name, limit, max_waiting, wait_seconds):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_waiting = max(0, max_waiting)
+        self.wait_seconds = wait_seconds
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self):
+        """Take a slot, waiting up to wait_seconds; False if the request should be turned away."""
+        started = time.monotonic()
+        with self._condition:
+            if self.active >= self.limit:
+                if self.waiting >= self.max_waiting:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.limit, timeout=self.wait_seconds)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.rejected += 1
+                    return False
+            waited = time.monotonic() - started
+            self.active += 1
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            return True
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying."""
+        return max(1, math.ceil(self.wait_seconds))
+
+    def stats(self):
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_wait_seconds': round(self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+                'max_wait_seconds': round(self.max_wait, 3),
+            }
+
+
+class GateRegistry:
+    """Process-wide gates, created from settings on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gates = {}
+
+    def get(self, name):
+        with self._lock:
+            gate = self._gates.get(name)
+            if gate is None:
+                gate = self._gates[name] = RequestGate(
+                    name,
+                    limit=settings.HEAVY_REQUEST_LIMITS.get(name, DEFAULT_LIMIT),
+                    max_waiting=settings.HEAVY_REQUEST_MAX_WAITING,
+                    wait_seconds=settings.HEAVY_REQUEST_WAIT_SECONDS,
+                )
+            return gate
+
+    def stats(self):
+        with self._lock:
+            gates = list(self._gates.values())
+        return {gate.name: gate.stats() for gate in gates}
+
+    def reset(self):
+        """Forget all gates so the next request rebuilds them from settings."""
+        with self._lock:
+            self._gates = {}
+
+
+request_gates = GateRegistry()
+
+
+class _ReleasingStream:
+    """Wraps streaming content so the gate slot is released when the stream ends or is closed."""
+
+    def __init__(self, content, release):
+        self._content = content
+        self._release = release
+
+    def __iter__(self):
+        try:
+            yield from self._content
+        finally:
+            self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            close = getattr(self._content, 'close', None)
+            if close is not None:
+                close()
+            release()
+
+
+def _busy_response(request, gate):
+    message = 'The server is busy with other exports or bulk operations. Please try again shortly.'
+    if request.method == 'POST' or 'application/json' in request.headers.get('Accept', ''):
+        response = JsonResponse({'success': False, 'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(gate.retry_after())
+    return response
+
+
+def limit_concurrency(name, when=None):
+    """
+    View decorator that runs the view through the named gate.
+
+    ``when(request)`` may restrict the limit to some requests (e.g. searches only).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if when is not None and not when(request):
+                return view(request, *args, **kwargs)
+
+            gate = request_gates.get(name)
+            if not gate.acquire():
+                logger.warning('Heavy request rejected: gate=%s path=%s', name, request.path)
+                return _busy_response(request, gate)
+            try:
+                response = view(request, *args, **kwargs)
+            except BaseException:
+                gate.release()
+                raise
+            if isinstance(response, StreamingHttpResponse) and not isinstance(response, FileResponse):
+                # The work happens while the response is iterated (finished files are cheap to serve)
+                response.streaming_content = _ReleasingStream(response.streaming_content, gate.release)
+            else:
+                gate.release()
+            return response
+        return wrapper
+    return decorator
@@ -6,13 +6,22 @@ urlpatterns = [
     path('', views.trainee_list, name='trainee_list'),
     path('export/', views.export_cohort_excel, name='export_current_cohort'),
     path('export/<int:cohort_id>/', views.export_cohort_excel, name='export_cohort'),
+    path('export/jobs/<str:job_id>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/<str:job_id>/download/', views.export_job_download, name='export_job_download'),
+    path('export/data/<str:dataset>/', views.export_data, name='export_data'),
+    path('status/heavy-requests/', views.heavy_request_stats, name='heavy_request_stats'),
     path('archive/', views.archive_list, name='archive_list'),
+    path('archive/export/', views.export_archive_zip, name='export_archive_zip'),
     path('archive/<int:cohort_id>/', views.archive_detail, name='archive_detail'),
     path('bulk-signoff/', views.bulk_sign_off, name='bulk_sign_off'),
+    path('sync/', views.sync_changes, name='sync_changes'),
+    path('events/', views.event_stream, name='event_stream'),
+    path('tasks/reorder/', views.reorder_tasks, name='reorder_tasks'),
 
     # Advanced training (must come before <str:badge_number> catch-all)
     path('advanced/', views.advanced_staff_list, name='advanced_staff_list'),
     path('advanced/main/', views.advanced_staff_main, name='advanced_staff_main'),
+    path('advanced/main/rows/', views.advanced_staff_rows, name='advanced_staff_rows'),
     path('advanced/removed/', views.advanced_staff_removed, name='advanced_staff_removed'),
     path('advanced/export/', views.export_advanced_excel, name='export_advanced_excel'),
     path('advanced/export/removed/', views.export_advanced_excel_removed, name='export_advanced_excel_removed'),
@@ -29,4 +38,5 @@ urlpatterns = [
     path('<str:badge_number>/', views.trainee_detail, name='trainee_detail'),
     path('<str:badge_number>/signoff/<int:task_id>/', views.sign_off_task, name='sign_off_task'),
     path('<str:badge_number>/unsign/<int:task_id>/', views.unsign_task, name='unsign_task'),
+    path('<str:badge_number>/details/<int:task_id>/', views.task_details, name='task_details'),
 ]
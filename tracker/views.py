@@ -1,14 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
+from django.urls import reverse
 from django.utils.text import slugify
 import logging
 from .models import Trainee, Task, SignOff, UnsignLog, Cohort
+from .permissions import permissions_for
+from .changes import current_watermark
+from .registry import task_registry
+from .throttle import limit_concurrency
 
 # Security logger for audit trail
 security_logger = logging.getLogger('security')
 
+# Bulk sign-off limits (the set-based engine builds every pair in memory before writing)
+BULK_SIGN_OFF_MAX_TRAINEES = 5000
+BULK_SIGN_OFF_MAX_TASKS = 1000
+BULK_SIGN_OFF_MAX_PAIRS = 50000
+
+
 @login_required
 def trainee_list(request):
     """Display list of trainees in the current cohort"""
@@ -17,29 +29,81 @@ def trainee_list(request):
 
     # Filter trainees by current cohort
     if current_cohort:
-        trainees = Trainee.objects.filter(is_active=True, cohort=current_cohort).order_by('badge_number')
+        trainees = Trainee.objects.filter(is_active=True, cohort=current_cohort)
     else:
-        trainees = Trainee.objects.filter(is_active=True).order_by('badge_number')
+        trainees = Trainee.objects.filter(is_active=True)
+    trainees, missing_task = _filter_missing_task(request, trainees)
+    page = _trainee_page(request, trainees)
+    trainees = page.items
 
-    # Get all active tasks for bulk operations
-    tasks = Task.objects.filter(is_active=True).order_by('order')
+    # Get the cohort curriculum's tasks for bulk operations, with per-task completion counts
+    tasks = _tasks_with_completion(trainees, current_cohort.curriculum_id if current_cohort else None)
 
     context = {
         'trainees': trainees,
+        'page': page,
         'current_cohort': current_cohort,
         'tasks': tasks,
+        'missing_task': missing_task,
+        'sync_watermark': current_watermark(),
     }
     return render(request, 'tracker/trainee_list.html', context)
 
 
+def _trainee_page(request, trainees):
+    """One keyset page of ``trainees`` ordered by badge number (see pagination.py)."""
+    from django.conf import settings
+    from .pagination import paginate
+
+    return paginate(
+        trainees.select_related('cohort', 'progress'), ('badge_number',), request.GET, settings.TRAINEE_PAGE_SIZE
+    )
+
+
+def _filter_missing_task(request, trainees):
+    """
+    Apply the optional ?missing_task=<task_id> filter.
+
+    Uses Trainee.completion_bits, so the SignOff table is not touched.
+    Returns the filtered queryset and the selected task (or None).
+    """
+    task_id = request.GET.get('missing_task', '')
+    if not task_id.isdigit():
+        return trainees, None
+    missing_task = Task.objects.filter(id=task_id, is_active=True).first()
+    if missing_task is None:
+        return trainees, None
+    return trainees.missing_task(missing_task), missing_task
+
+
+def _tasks_with_completion(trainees, curriculum_id=None):
+    """
+    Return the curriculum's active tasks (every active task when None) annotated
+    with how many of ``trainees`` completed each and how many are still locked
+    out of it by missing prerequisites.
+
+    Uses one CompletionMatrix (a single sign-off query) for the whole page.
+    """
+    from .completion import CompletionMatrix
+
+    snapshot = task_registry.snapshot()
+    tasks = task_registry.get_active_tasks(curriculum_id)
+    # Prerequisites may sit outside the curriculum, so the matrix covers every active task
+    matrix = CompletionMatrix.for_trainees(trainees, snapshot.tasks)
+    completion_counts = matrix.task_completion_counts()
+    for task in tasks:
+        task.completed_count = completion_counts.get(task.id, 0)
+        required = snapshot.required_ids[task.id]
+        task.required_mask = snapshot.required_mask[task.id]
+        task.locked_count = int((~matrix.unlocked(required)).sum()) if required else 0
+    return tasks
+
+
 @login_required
+@limit_concurrency('export')
 def export_cohort_excel(request, cohort_id=None):
     """Export cohort data to Excel using the blank template"""
-    from django.http import HttpResponse
-    from openpyxl import load_workbook
-    from openpyxl.styles import Alignment
-    from openpyxl.cell.cell import MergedCell
-    import os
+    from .exports import CohortExport
 
     # Get cohort
     if cohort_id:
@@ -50,154 +114,95 @@ def export_cohort_excel(request, cohort_id=None):
             messages.error(request, 'No current cohort found')
             return redirect('trainee_list')
 
-    # Load blank template
-    template_path = 'Check list Orientation Blank.xlsx'
-    if not os.path.exists(template_path):
-        messages.error(request, 'Excel template not found')
-        return redirect('trainee_list')
-
-    wb = load_workbook(template_path)
-    ws = wb.active
-
-    # Update cohort name in header (T2 is top-left of merged range T2:U2)
-    ws.cell(row=2, column=20, value=cohort.name)
-
-    # Task order to Excel column mapping
-    # Based on template structure
-    task_column_map = {
-        1: 3,   # Onboarding Process Brief -> Column C (3)
-        2: 4,   # Police Clearance Form -> Column D (4)
-        3: 7,   # Document Release Form/NDA -> Column G (7)
-        4: 8,   # U.S. Citizen / ID Check -> Column H (8)
-        5: 9,   # Read SOP's 208, 210 -> Column I (9)
-        6: 10,  # Read SOP 501 A&B -> Column J (10)
-        7: 11,  # Read SOP's 505, 506, 508, 509, 510 -> Column K (11)
-        8: 12,  # Read SOP's 600, 601 -> Column L (12)
-        9: 13,  # Onboarding Tour -> Column M (13)
-        10: 14, # Onboarding Tour Quiz -> Column N (14)
-        11: 15, # Read R.G. 8.13, R.G. 8.29 -> Column O (15)
-        12: 16, # ALARA Statement -> Column P (16)
-        13: 17, # Radiation Safety PowerPoint & Video -> Column Q (17)
-        14: 18, # Reg Guides 8.13 / 8.29 Quiz -> Column R (18)
-        15: 19, # Review Deficiencies -> Column S (19)
-    }
+    return _export_job_response(request, CohortExport(cohort), fallback='trainee_list')
 
-    # Get all trainees for this cohort
-    trainees = Trainee.objects.filter(
-        cohort=cohort,
-        is_active=True
-    ).order_by('badge_number')
-
-    # Get all tasks
-    tasks = Task.objects.filter(is_active=True).order_by('order')
-
-    # Detect sections in the template dynamically
-    # Find all rows with "Badge Number" header (indicates section start)
-    sections = []
-    for row in range(1, 100):
-        cell = ws.cell(row=row, column=1)
-        if cell.value and 'Badge' in str(cell.value):
-            # Data starts 3 rows after header
-            data_start_row = row + 3
-
-            # Count consecutive rows with badge number pattern
-            data_row_count = 0
-            for check_row in range(data_start_row, data_start_row + 30):
-                check_cell = ws.cell(row=check_row, column=1)
-                if check_cell.value and '#' in str(check_cell.value):
-                    data_row_count += 1
-                else:
-                    break
-
-            sections.append({
-                'header_row': row,
-                'data_start': data_start_row,
-                'capacity': data_row_count
-            })
 
-            # Also update cohort name in this section's header
-            ws.cell(row=row, column=20, value=cohort.name)
-
-    # Build list of available row positions across all sections
-    available_rows = []
-    for section in sections:
-        for i in range(section['capacity']):
-            available_rows.append(section['data_start'] + i)
-
-    # Write trainee data to available rows
-    trainees_written = 0
-    for idx, trainee in enumerate(trainees):
-        if idx >= len(available_rows):
-            # More trainees than template capacity
-            messages.warning(
-                request,
-                f'Template capacity exceeded: {len(trainees)} trainees but only {len(available_rows)} rows available. '
-                f'Only first {len(available_rows)} trainees exported.'
-            )
-            break
-
-        current_row = available_rows[idx]
-
-        # Column A: Badge number
-        cell_a = ws.cell(row=current_row, column=1)
-        # Skip if this row is in a merged cell area
-        if isinstance(cell_a, MergedCell):
-            continue
-        cell_a.value = trainee.badge_number
-
-        # Column B: Name (Last, First)
-        cell_b = ws.cell(row=current_row, column=2)
-        if not isinstance(cell_b, MergedCell):
-            cell_b.value = trainee.full_name
-
-        # Get all sign-offs for this trainee with staff information
-        signoffs = SignOff.objects.filter(trainee=trainee).select_related('signed_by__staff_profile')
-        signoff_dict = {signoff.task_id: signoff for signoff in signoffs}
-
-        # Fill in sign-offs with staff initials
-        for task in tasks:
-            if task.id in signoff_dict:
-                signoff = signoff_dict[task.id]
-
-                # Get staff initials, fallback to 'X' if unavailable
-                try:
-                    initials = signoff.signed_by.staff_profile.initials
-                except (AttributeError, Exception):
-                    # Fallback to 'X' if staff profile is missing or other error
-                    initials = 'X'
-
-                # Write initials to corresponding column
-                excel_col = task_column_map.get(task.order)
-                if excel_col:
-                    cell = ws.cell(row=current_row, column=excel_col)
-                    # Only write if not a merged cell
-                    if not isinstance(cell, MergedCell):
-                        cell.value = initials
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        trainees_written += 1
-
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    # Sanitize filename to prevent path traversal attacks
-    safe_cohort_name = slugify(cohort.name)
-    filename = f'Check_list_Orientation_{safe_cohort_name}.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+def _export_job_response(request, spec, fallback):
+    """
+    Serve a cached export, or start building it and show a page that polls for it.
 
-    # Save workbook to response
-    wb.save(response)
+    JSON clients (Accept: application/json) get the job status instead.
+    """
+    from django.http import JsonResponse
+    from .exports import export_jobs
 
-    return response
+    job = export_jobs.submit(spec)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(_export_job_payload(job), status=200 if job.finished else 202)
+
+    if job.status == 'failed':
+        messages.error(request, job.error or 'Export failed')
+        return redirect(fallback)
+    if job.done:
+        return _export_file_response(request, job)
+
+    return render(request, 'tracker/export_job.html', {
+        'job': job,
+        'back_url': reverse(fallback),
+    })
+
+
+def _export_job_payload(job):
+    data = job.as_dict()
+    data['status_url'] = reverse('export_job_status', args=[job.id])
+    data['download_url'] = reverse('export_job_download', args=[job.id]) if job.done else None
+    return data
+
+
+def _export_file_response(request, job):
+    from django.http import FileResponse
+
+    for warning in job.warnings:
+        messages.warning(request, warning)
+    return FileResponse(open(job.path, 'rb'), as_attachment=True, filename=job.filename)
+
+
+@login_required
+def heavy_request_stats(request):
+    """JSON queue depth and wait times of the heavy-endpoint gates (for monitoring)"""
+    from django.http import JsonResponse
+    from .throttle import request_gates
+
+    return JsonResponse({'gates': request_gates.stats()})
+
+
+@login_required
+def export_job_status(request, job_id):
+    """JSON status of a background export job (polled by export_job.html)"""
+    from django.http import JsonResponse
+    from .exports import export_jobs
+
+    job = export_jobs.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Export job not found'}, status=404)
+    return JsonResponse(_export_job_payload(job))
+
+
+@login_required
+def export_job_download(request, job_id):
+    """Download the file of a finished export job"""
+    from django.http import Http404
+    from .exports import export_jobs
+
+    job = export_jobs.get(job_id)
+    if job is None or not job.done or not job.path.exists():
+        raise Http404('Export not available')
+    return _export_file_response(request, job)
 
 
 @login_required
 def trainee_detail(request, badge_number):
-    """Display detailed progress for a specific trainee"""
-    trainee = get_object_or_404(Trainee, badge_number=badge_number)
-    tasks = Task.objects.filter(is_active=True).prefetch_related('authorized_signers').order_by('order')
-    signoffs = SignOff.objects.filter(trainee=trainee).select_related('task', 'signed_by')
+    """
+    Display detailed progress for a specific trainee.
+
+    Progress and permissions are computed from the sign-offs loaded for the
+    task table (the curriculum comes from the cached registry), so the page is
+    a fixed handful of queries however many tasks it shows. Sign-off notes and
+    long task descriptions are fetched on demand from task_details.
+    """
+    from .models import TraineeProgress
+
+    trainee = get_object_or_404(Trainee.objects.select_related('cohort'), badge_number=badge_number)
 
     # Check if viewing from an archive (for navigation context)
     from_cohort_id = request.GET.get('from_cohort')
@@ -205,58 +210,326 @@ def trainee_detail(request, badge_number):
     if from_cohort_id:
         try:
             from_cohort = Cohort.objects.get(id=from_cohort_id)
-        except Cohort.DoesNotExist:
+        except (Cohort.DoesNotExist, ValueError):
             pass
 
-    # Create a dict of task_id -> signoff for easier template lookup
-    signoff_dict = {so.task.id: so for so in signoffs}
+    snapshot = task_registry.snapshot()
+    curriculum_id = trainee.cohort.curriculum_id
+    signoff_dict = _signoffs_by_task(trainee)
+    completed_count = len(snapshot.task_id_set_for(curriculum_id).intersection(signoff_dict))
+
+    context = {
+        'trainee': trainee,
+        'task_progress': _task_progress(request, trainee, signoff_dict),
+        'progress_percentage': TraineeProgress.calculate_percentage(
+            completed_count, snapshot.total_for(curriculum_id)
+        ),
+        'from_cohort': from_cohort,
+        'sync_watermark': current_watermark(),
+    }
+    return render(request, 'tracker/trainee_detail.html', context)
+
+
+# Task descriptions longer than this are truncated in the task table (full text via task_details)
+TASK_DESCRIPTION_PREVIEW = 160
+
+
+def _signoffs_by_task(trainee):
+    """{task_id: SignOff} without the notes column (``has_notes`` says whether there are any)."""
+    from django.db.models import BooleanField, ExpressionWrapper
+
+    signoffs = (
+        SignOff.objects.filter(trainee=trainee)
+        .select_related('signed_by')
+        .defer('notes')
+        .annotate(has_notes=ExpressionWrapper(~Q(notes=''), output_field=BooleanField()))
+    )
+    return {so.task_id: so for so in signoffs}
+
+
+def _task_progress(request, trainee, signoff_dict=None):
+    """One row per curriculum task: the task, its sign-off (or None), permissions and lock state."""
+    snapshot = task_registry.snapshot()
+    tasks = snapshot.tasks_for(trainee.cohort.curriculum_id)
+    perms = permissions_for(request)
+    if signoff_dict is None:
+        signoff_dict = _signoffs_by_task(trainee)
+    is_staff = request.user.is_staff or request.user.is_superuser
 
     # Combine tasks with their signoff status and permissions
     task_progress = []
     for task in tasks:
         signoff = signoff_dict.get(task.id)
+        can_sign_off = perms.can_sign_task(task.id)
         # Can unsign if: 1) has signoff, 2) is staff, AND 3) either is superuser OR authorized for this task
-        can_unsign = (
-            signoff is not None and
-            (request.user.is_staff or request.user.is_superuser) and
-            (request.user.is_superuser or task.can_user_sign_off(request.user))
-        )
+        can_unsign = signoff is not None and is_staff and (request.user.is_superuser or can_sign_off)
+        # Locked until every (transitive) prerequisite is signed off
+        missing = snapshot.missing_prerequisites(task.id, signoff_dict) if signoff is None else []
         task_progress.append({
             'task': task,
             'signoff': signoff,
-            'can_sign_off': task.can_user_sign_off(request.user),
+            'can_sign_off': can_sign_off,
             'can_unsign': can_unsign,
+            'locked': bool(missing),
+            'missing_prerequisites': [snapshot.by_id[task_id].name for task_id in missing],
+            'has_details': (
+                len(task.description) > TASK_DESCRIPTION_PREVIEW or (signoff is not None and signoff.has_notes)
+            ),
         })
+    return task_progress
 
-    context = {
-        'trainee': trainee,
-        'task_progress': task_progress,
-        'progress_percentage': trainee.get_progress_percentage(),
-        'from_cohort': from_cohort,
+
+@login_required
+def task_details(request, badge_number, task_id):
+    """
+    JSON with a task's full description and the trainee's sign-off notes, for the detail page.
+
+    Returns:
+    {
+        "success": true,
+        "task_id": 5,
+        "description": "...",
+        "signoff": {"notes": "...", "signed_by": "...", "signed_at": "..."}   # null when unsigned
     }
-    return render(request, 'tracker/trainee_detail.html', context)
+    """
+    from django.http import JsonResponse
+
+    trainee = get_object_or_404(Trainee.objects.only('id'), badge_number=badge_number)
+    task = get_object_or_404(Task.objects.only('id', 'description'), id=task_id)
+    signoff = (
+        SignOff.objects.filter(trainee=trainee, task=task)
+        .select_related('signed_by')
+        .only('notes', 'signed_at', 'signed_by__username', 'signed_by__first_name', 'signed_by__last_name')
+        .first()
+    )
+    payload = None
+    if signoff is not None:
+        signer = signoff.signed_by
+        payload = {
+            'notes': signoff.notes,
+            'signed_by': (signer.get_full_name() or signer.username) if signer else '',
+            'signed_at': signoff.signed_at.isoformat(),
+        }
+    return JsonResponse({
+        'success': True,
+        'task_id': task.id,
+        'description': task.description,
+        'signoff': payload,
+    })
+
+
+@login_required
+def sync_changes(request):
+    """
+    JSON rows changed since a watermark, so pages can patch themselves after bulk actions.
+
+    GET parameters:
+        since    watermark from the page (or a previous sync response), required
+        cohort   list scope: trainees of this cohort (default: all active trainees)
+        ids      optional comma-separated trainee ids: only these rows (the current page)
+        archive  1 when the rows link back to an archive page
+        trainee  detail scope: one trainee id; its task rows are re-rendered on change
+
+    Returns:
+    {
+        "watermark": "...",   # send back as ``since`` next time
+        "trainees": [{"id": 1, "badge_number": "#2501", "removed": false,
+                      "percentage": 50.0, "completed_count": 3, "completion_bits": "7",
+                      "row_html": "<tr ...>"}],
+        "unsigned": [{"trainee_id": 1, "task_id": 5, "unsigned_at": "..."}],
+        "tasks": [{"task_id": 5, "row_html": "<tr ...>"}]    # trainee scope only
+    }
+    """
+    from django.http import JsonResponse
+    from django.template.loader import render_to_string
+    from .changes import changes_since, parse_watermark
+
+    try:
+        since = parse_watermark(request.GET.get('since'))
+        trainee_id = int(request.GET['trainee']) if request.GET.get('trainee') else None
+        cohort_id = int(request.GET['cohort']) if request.GET.get('cohort') else None
+        ids = [int(value) for value in request.GET.get('ids', '').split(',') if value]
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if trainee_id is not None:
+        scope = Trainee.objects.filter(id=trainee_id)
+    elif ids:
+        scope = Trainee.objects.filter(id__in=ids)
+    elif cohort_id is not None:
+        scope = Trainee.objects.filter(cohort_id=cohort_id)
+    else:
+        scope = Trainee.objects.all()
+    changes = changes_since(scope, since)
+
+    row_context = {'is_archive': request.GET.get('archive') == '1', 'cohort': {'id': cohort_id}}
+    trainees = []
+    tasks = []
+    for trainee in changes.trainees:
+        progress = trainee.get_progress_record()
+        removed = not trainee.is_active or (cohort_id is not None and trainee.cohort_id != cohort_id)
+        trainees.append({
+            'id': trainee.id,
+            'badge_number': trainee.badge_number,
+            'removed': removed,
+            'percentage': progress.percentage,
+            'completed_count': progress.completed_count,
+            'completion_bits': str(trainee.completion_bits),
+            'row_html': '' if removed or trainee_id is not None else render_to_string(
+                'tracker/trainee_row.html', {**row_context, 'trainee': trainee}, request=request
+            ),
+        })
+        if trainee_id is not None:
+            tasks = [
+                {
+                    'task_id': item['task'].id,
+                    'row_html': render_to_string('tracker/task_row.html', {'item': item}, request=request),
+                }
+                for item in _task_progress(request, trainee)
+            ]
+
+    return JsonResponse({
+        'watermark': changes.watermark,
+        'trainees': trainees,
+        'unsigned': changes.unsigned,
+        'tasks': tasks,
+    })
+
+@login_required
+async def event_stream(request):
+    """
+    Server-Sent Events for one cohort (?cohort=<id>) or for advanced training (?channel=advanced).
+
+    Under ASGI the stream stays open and forwards events from the in-process
+    bus (events.py), with a comment line as heartbeat. Under WSGI (runserver)
+    an open stream would hold a worker thread, so each request checks the
+    database once and ends with a ``retry:`` hint; EventSource reconnects
+    after EVENT_STREAM_POLL_SECONDS and resumes from Last-Event-ID.
+    """
+    from asgiref.sync import sync_to_async
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+    from .events import ADVANCED_CHANNEL, cohort_channel, event_bus
+
+    cohort_id = request.GET.get('cohort', '')
+    if request.GET.get('channel') == ADVANCED_CHANNEL:
+        channel, cohort_id = ADVANCED_CHANNEL, None
+    elif cohort_id.isdigit():
+        channel, cohort_id = cohort_channel(cohort_id), int(cohort_id)
+    else:
+        return HttpResponseBadRequest('cohort or channel=advanced required')
+
+    if isinstance(request, ASGIRequest):
+        async def stream():
+            yield 'retry: 3000\n\n'
+            with event_bus.subscribe(channel) as subscription:
+                while True:
+                    event = await subscription.get(timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+                    if event is None:
+                        yield ': keepalive\n\n'
+                    else:
+                        yield _sse_message(event['type'], event, event.get('at'))
+        response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    else:
+        body = await sync_to_async(_polled_events)(
+            cohort_id, request.headers.get('Last-Event-ID') or request.GET.get('since')
+        )
+        response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _sse_message(event_type, data, event_id=None):
+    import json
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    lines = [f'event: {event_type}']
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _polled_events(cohort_id, last_event_id):
+    """
+    WSGI fallback for event_stream: SSE messages since ``last_event_id``, from one database check.
+
+    Every message carries an id that the browser sends back as Last-Event-ID
+    on its next poll. Cohort streams use the delta-sync watermark; the advanced
+    stream (cohort_id None) uses the count and latest updated_at of
+    AdvancedTraining, which also catches deletions.
+    """
+    from django.conf import settings
+    from django.db.models import Count, Max
+    from .changes import changes_since, current_watermark, parse_watermark
+    from .models import AdvancedTraining
+
+    events = [f'retry: {int(settings.EVENT_STREAM_POLL_SECONDS * 1000)}\n\n']
+    if cohort_id is None:
+        state = AdvancedTraining.objects.aggregate(count=Count('id'), changed=Max('updated_at'))
+        changed = state['changed'].isoformat() if state['changed'] else ''
+        event_id = f"advanced-{state['count']}-{changed}"
+        if last_event_id and last_event_id != event_id:
+            events.append(_sse_message('advanced', {'type': 'advanced', 'action': 'changed'}, event_id))
+        else:
+            events.append(f'id: {event_id}\n\n')
+    else:
+        try:
+            since = parse_watermark(last_event_id)
+        except ValueError:
+            since = parse_watermark(current_watermark())
+        changes = changes_since(Trainee.objects.filter(cohort_id=cohort_id), since)
+        # The sync query reaches back a few seconds, so a trainee may be reported twice (harmless)
+        trainee_ids = [trainee.id for trainee in changes.trainees]
+        if trainee_ids:
+            events.append(_sse_message('signoff', {'type': 'signoff', 'trainee_ids': trainee_ids}, changes.watermark))
+        else:
+            events.append(f'id: {changes.watermark}\n\n')
+    return ''.join(events)
+
 
 @login_required
 def sign_off_task(request, badge_number, task_id):
     """Sign off a task for a trainee"""
     if request.method == 'POST':
-        trainee = get_object_or_404(Trainee, badge_number=badge_number)
+        trainee = get_object_or_404(Trainee.objects.select_related('cohort'), badge_number=badge_number)
         task = get_object_or_404(Task, id=task_id)
 
+        perms = permissions_for(request)
+
         # Check if user has staff profile with sign-off permission
-        try:
-            if not request.user.staff_profile.can_sign_off:
-                messages.error(request, 'Your account does not have sign-off permissions. Contact an administrator.')
-                return redirect('trainee_detail', badge_number=badge_number)
-        except AttributeError:
+        if not perms.has_staff_profile:
             messages.error(request, 'Staff profile not found. Contact an administrator to set up your account.')
             return redirect('trainee_detail', badge_number=badge_number)
+        if not perms.can_sign_off:
+            messages.error(request, 'Your account does not have sign-off permissions. Contact an administrator.')
+            return redirect('trainee_detail', badge_number=badge_number)
 
         # Check if user is authorized to sign off this task
-        if not task.can_user_sign_off(request.user):
+        if not perms.can_sign_task(task.id):
             messages.error(request, f'You are not authorized to sign off "{task.name}".')
             return redirect('trainee_detail', badge_number=badge_number)
 
+        # Only the cohort curriculum's active tasks can be signed (same rule as bulk sign-off)
+        snapshot = task_registry.snapshot()
+        if task.id not in snapshot.task_id_set_for(trainee.cohort.curriculum_id):
+            messages.error(request, f'"{task.name}" is not part of this trainee\'s curriculum.')
+            return redirect('trainee_detail', badge_number=badge_number)
+
+        # Check prerequisites against the completion bitset (no query unless unslotted tasks are involved)
+        required = snapshot.required_ids.get(task.id)
+        if required:
+            completed = snapshot.completed_ids(trainee.completion_bits)
+            if required & snapshot.unslotted_ids:
+                completed.update(trainee.signoffs.filter(task_id__in=required).values_list('task_id', flat=True))
+            missing = snapshot.missing_prerequisites(task.id, completed)
+            if missing:
+                names = ', '.join(snapshot.by_id[task_id].name for task_id in missing)
+                messages.error(request, f'"{task.name}" is locked until these tasks are completed: {names}.')
+                return redirect('trainee_detail', badge_number=badge_number)
+
         score = request.POST.get('score', '').strip()
         notes = request.POST.get('notes', '')
 
@@ -280,22 +553,23 @@ def sign_off_task(request, badge_number, task_id):
                 messages.error(request, f'Invalid score format. Please enter a numeric value.')
                 return redirect('trainee_detail', badge_number=badge_number)
 
-        # Create or update signoff
-        signoff, created = SignOff.objects.get_or_create(
-            trainee=trainee,
-            task=task,
-            defaults={
-                'signed_by': request.user,
-                'score': score,
-                'notes': notes
-            }
-        )
+        # Create or update signoff (progress is refreshed by signals in the same transaction)
+        with transaction.atomic():
+            signoff, created = SignOff.objects.get_or_create(
+                trainee=trainee,
+                task=task,
+                defaults={
+                    'signed_by': request.user,
+                    'score': score,
+                    'notes': notes
+                }
+            )
 
-        if not created:
-            signoff.signed_by = request.user
-            signoff.score = score
-            signoff.notes = notes
-            signoff.save()
+            if not created:
+                signoff.signed_by = request.user
+                signoff.score = score
+                signoff.notes = notes
+                signoff.save()
 
         messages.success(request, f'Task "{task.name}" signed off successfully.')
         return redirect('trainee_detail', badge_number=badge_number)
@@ -316,7 +590,7 @@ def unsign_task(request, badge_number, task_id):
             return redirect('trainee_detail', badge_number=badge_number)
 
         # Check if user is authorized for this specific task (superuser can override)
-        if not request.user.is_superuser and not task.can_user_sign_off(request.user):
+        if not request.user.is_superuser and not permissions_for(request).can_sign_task(task.id):
             messages.error(request, f'You are not authorized to remove sign-offs for "{task.name}".')
             return redirect('trainee_detail', badge_number=badge_number)
 
@@ -329,20 +603,21 @@ def unsign_task(request, badge_number, task_id):
                 messages.error(request, 'Reason exceeds maximum length of 10,000 characters.')
                 return redirect('trainee_detail', badge_number=badge_number)
 
-            # Create audit log before deleting
-            UnsignLog.objects.create(
-                trainee=trainee,
-                task=task,
-                original_signed_by=signoff.signed_by,
-                original_signed_at=signoff.signed_at,
-                original_score=signoff.score,
-                original_notes=signoff.notes,
-                unsigned_by=request.user,
-                reason=reason
-            )
+            with transaction.atomic():
+                # Create audit log before deleting
+                UnsignLog.objects.create(
+                    trainee=trainee,
+                    task=task,
+                    original_signed_by=signoff.signed_by,
+                    original_signed_at=signoff.signed_at,
+                    original_score=signoff.score,
+                    original_notes=signoff.notes,
+                    unsigned_by=request.user,
+                    reason=reason
+                )
 
-            # Delete the sign-off
-            signoff.delete()
+                # Delete the sign-off (progress is refreshed by signals in this transaction)
+                signoff.delete()
 
             # Log security event
             security_logger.info(
@@ -362,6 +637,7 @@ def unsign_task(request, badge_number, task_id):
 
 
 @login_required
+@limit_concurrency('search', when=lambda request: request.GET.get('search', '').strip())
 def archive_list(request):
     """Display list of archived cohorts with global search capability"""
     from django.db.models import Count, Q as Q_agg
@@ -373,33 +649,29 @@ def archive_list(request):
     if len(search_query) > 100:
         search_query = search_query[:100]
 
-    # If search query provided, search across ALL trainees
+    # If search query provided, search across ALL trainees, one keyset page at a time
     search_results = []
+    search_page = None
     if search_query:
-        # Get total number of active tasks (only once, not per trainee)
-        total_tasks = Task.objects.filter(is_active=True).count()
+        from django.conf import settings
+        from .pagination import paginate
 
         # Search by badge number OR name (case-insensitive)
-        # Annotate with signoff count to avoid N+1 queries
+        # Progress comes from the materialized TraineeProgress row (no per-row queries)
         trainees = Trainee.objects.filter(
             Q(badge_number__icontains=search_query) |
             Q(first_name__icontains=search_query) |
             Q(last_name__icontains=search_query),
             is_active=True
-        ).select_related('cohort').annotate(
-            signoff_count=Count('signoffs', distinct=True)
-        ).order_by('cohort__year', 'cohort__semester', 'badge_number')
-
-        # Add progress percentage to each trainee using annotated count
-        for trainee in trainees:
-            if total_tasks == 0:
-                progress = 0
-            else:
-                progress = round((trainee.signoff_count / total_tasks) * 100, 1)
+        ).select_related('cohort', 'progress')
+        search_page = paginate(
+            trainees, ('cohort__year', 'cohort__semester', 'badge_number'), request.GET, settings.TRAINEE_PAGE_SIZE
+        )
 
+        for trainee in search_page:
             search_results.append({
                 'trainee': trainee,
-                'progress': progress,
+                'progress': trainee.get_progress_percentage(),
             })
 
     # Get all cohorts except the current one
@@ -426,10 +698,77 @@ def archive_list(request):
         'current_cohort': current_cohort,
         'search_query': search_query,
         'search_results': search_results,
+        'search_page': search_page,
     }
     return render(request, 'tracker/archive_list.html', context)
 
 
+@login_required
+@limit_concurrency('export')
+def export_archive_zip(request):
+    """
+    Export several cohorts (all by default, or ?cohort=<id>&cohort=<id>) as one zip.
+
+    Workbooks are built in a process pool and streamed into the response as they finish.
+    """
+    from django.conf import settings
+    from django.http import StreamingHttpResponse
+    from datetime import datetime
+    from .excel.archive import stream_cohort_archive
+
+    cohorts = Cohort.objects.all()
+    selected = request.GET.getlist('cohort')
+    if selected:
+        try:
+            cohorts = cohorts.filter(id__in=[int(cohort_id) for cohort_id in selected])
+        except ValueError:
+            messages.error(request, 'Invalid cohort selection')
+            return redirect('archive_list')
+    cohorts = list(cohorts)
+    if not cohorts:
+        messages.error(request, 'No cohorts to export')
+        return redirect('archive_list')
+
+    security_logger.info('Archive export: %d cohorts by %s', len(cohorts), request.user.username)
+    response = StreamingHttpResponse(
+        stream_cohort_archive(cohorts, workers=settings.ARCHIVE_EXPORT_WORKERS),
+        content_type='application/zip',
+    )
+    filename = f'Orientation_Checklists_{datetime.now().strftime("%Y%m%d")}.zip'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@limit_concurrency('export')
+def export_data(request, dataset):
+    """
+    Stream a raw table export as CSV (default) or NDJSON (?format=ndjson).
+
+    Accepts cohort/since/until/user filters; see data_export.py.
+    """
+    from django.http import Http404, JsonResponse, StreamingHttpResponse
+    from datetime import datetime
+    from .data_export import DATASETS, FORMATS
+
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise Http404('Unknown dataset')
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return JsonResponse({'error': f'Unsupported format: {fmt}'}, status=400)
+    try:
+        filters = spec.parse_filters(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    security_logger.info('Data export: %s (%s) %s by %s', dataset, fmt, filters, request.user.username)
+    response = StreamingHttpResponse(spec.encode(filters, fmt), content_type=f'{FORMATS[fmt]}; charset=utf-8')
+    filename = f'{dataset}_{datetime.now().strftime("%Y%m%d")}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @login_required
 def archive_detail(request, cohort_id):
     """Display trainees for a specific archived cohort"""
@@ -437,22 +776,30 @@ def archive_detail(request, cohort_id):
     current_cohort = Cohort.get_current_cohort()
 
     # Get trainees for this cohort
-    trainees = Trainee.objects.filter(is_active=True, cohort=cohort).order_by('badge_number')
+    trainees, missing_task = _filter_missing_task(
+        request, Trainee.objects.filter(is_active=True, cohort=cohort)
+    )
+    page = _trainee_page(request, trainees)
+    trainees = page.items
 
-    # Get all active tasks for bulk operations
-    tasks = Task.objects.filter(is_active=True).order_by('order')
+    # Get the cohort curriculum's tasks for bulk operations, with per-task completion counts
+    tasks = _tasks_with_completion(trainees, cohort.curriculum_id)
 
     context = {
         'trainees': trainees,
+        'page': page,
         'cohort': cohort,
         'current_cohort': current_cohort,
         'is_archive': True,
         'tasks': tasks,
+        'missing_task': missing_task,
+        'sync_watermark': current_watermark(),
     }
     return render(request, 'tracker/trainee_list.html', context)
 
 
 @login_required
+@limit_concurrency('bulk')
 def bulk_sign_off(request):
     """
     Bulk sign-off multiple trainees on one task, or one trainee on multiple tasks.
@@ -475,18 +822,20 @@ def bulk_sign_off(request):
     }
     """
     from django.http import JsonResponse
-    from django.db import transaction
+    from .signals import ProgressBatch
+    from .signoffs import BulkSignOff
     import json
 
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
+    perms = permissions_for(request)
+
     # Check if user has staff profile with sign-off permission
-    try:
-        if not request.user.staff_profile.can_sign_off:
-            return JsonResponse({'success': False, 'error': 'Your account does not have sign-off permissions'}, status=403)
-    except AttributeError:
+    if not perms.has_staff_profile:
         return JsonResponse({'success': False, 'error': 'Staff profile not found. Contact an administrator'}, status=403)
+    if not perms.can_sign_off:
+        return JsonResponse({'success': False, 'error': 'Your account does not have sign-off permissions'}, status=403)
 
     try:
         data = json.loads(request.body)
@@ -503,90 +852,31 @@ def bulk_sign_off(request):
         return JsonResponse({'success': False, 'error': 'Must select at least one trainee and one task'}, status=400)
 
     # Limit bulk operations to prevent DoS attacks
-    if len(trainee_ids) > 100:
-        return JsonResponse({'success': False, 'error': 'Maximum 100 trainees allowed per bulk operation'}, status=400)
-    if len(task_ids) > 100:
-        return JsonResponse({'success': False, 'error': 'Maximum 100 tasks allowed per bulk operation'}, status=400)
+    if len(trainee_ids) > BULK_SIGN_OFF_MAX_TRAINEES:
+        return JsonResponse({'success': False, 'error': f'Maximum {BULK_SIGN_OFF_MAX_TRAINEES:,} trainees allowed per bulk operation'}, status=400)
+    if len(task_ids) > BULK_SIGN_OFF_MAX_TASKS:
+        return JsonResponse({'success': False, 'error': f'Maximum {BULK_SIGN_OFF_MAX_TASKS:,} tasks allowed per bulk operation'}, status=400)
+    if len(trainee_ids) * len(task_ids) > BULK_SIGN_OFF_MAX_PAIRS:
+        return JsonResponse({'success': False, 'error': f'Maximum {BULK_SIGN_OFF_MAX_PAIRS:,} trainee-task pairs allowed per bulk operation'}, status=400)
 
     # Validate notes length
     if len(notes) > 10000:
         return JsonResponse({'success': False, 'error': 'Notes exceed maximum length of 10,000 characters'}, status=400)
 
-    results = {
-        'success': True,
-        'created': 0,
-        'updated': 0,
-        'skipped': [],
-        'errors': []
-    }
-
     try:
-        with transaction.atomic():
-            # Fetch trainees and tasks
-            trainees = Trainee.objects.filter(id__in=trainee_ids, is_active=True)
-            tasks = Task.objects.filter(id__in=task_ids, is_active=True).prefetch_related('authorized_signers')
+        with transaction.atomic(), ProgressBatch():
+            # Fetch trainees and tasks (reads do not take SQLite's write lock)
+            trainees = list(Trainee.objects.filter(id__in=trainee_ids, is_active=True).select_related('cohort'))
+            tasks = list(Task.objects.filter(id__in=task_ids, is_active=True))
 
-            if trainees.count() != len(trainee_ids):
+            if len(trainees) != len(trainee_ids):
                 return JsonResponse({'success': False, 'error': 'One or more trainees not found'}, status=404)
 
-            if tasks.count() != len(task_ids):
+            if len(tasks) != len(task_ids):
                 return JsonResponse({'success': False, 'error': 'One or more tasks not found'}, status=404)
 
-            # Process each combination
-            for trainee in trainees:
-                for task in tasks:
-                    # Check authorization
-                    if not task.can_user_sign_off(request.user):
-                        results['skipped'].append({
-                            'trainee': trainee.badge_number,
-                            'task': task.name,
-                            'reason': 'Not authorized to sign off this task'
-                        })
-                        continue
-
-                    # Validate score if required
-                    score = scores.get(str(task.id), '')
-                    if task.requires_score and task.minimum_score is not None:
-                        if not score:
-                            results['errors'].append({
-                                'trainee': trainee.badge_number,
-                                'task': task.name,
-                                'error': f'Score required (minimum: {task.minimum_score})'
-                            })
-                            continue
-
-                        try:
-                            score_value = float(score)
-                            if score_value < float(task.minimum_score):
-                                results['errors'].append({
-                                    'trainee': trainee.badge_number,
-                                    'task': task.name,
-                                    'error': f'Score {score} below minimum {task.minimum_score}'
-                                })
-                                continue
-                        except ValueError:
-                            results['errors'].append({
-                                'trainee': trainee.badge_number,
-                                'task': task.name,
-                                'error': 'Invalid score format'
-                            })
-                            continue
-
-                    # Create or update sign-off
-                    signoff, created = SignOff.objects.update_or_create(
-                        trainee=trainee,
-                        task=task,
-                        defaults={
-                            'signed_by': request.user,
-                            'score': score,
-                            'notes': notes
-                        }
-                    )
-
-                    if created:
-                        results['created'] += 1
-                    else:
-                        results['updated'] += 1
+            # Validate everything in memory, then one bulk_create + one bulk_update
+            results = BulkSignOff(request.user, perms, trainees, tasks, scores, notes).run()
 
             # If there were errors, rollback transaction
             if results['errors']:
@@ -607,6 +897,51 @@ def bulk_sign_off(request):
     return JsonResponse(results)
 
 
+@login_required
+def reorder_tasks(request):
+    """
+    Apply a complete new task ordering (e.g. from drag-and-drop in admin).
+
+    Expected POST data (JSON):
+    {
+        "task_ids": [7, 3, 5, ...]   # Every task id, in the new display order
+    }
+
+    Tasks are renumbered 1..n with a constant number of UPDATE statements.
+
+    Returns JSON:
+    {
+        "success": true,
+        "reordered": 42
+    }
+    """
+    from django.http import JsonResponse
+    import json
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
+
+    if not request.user.has_perm('tracker.change_task'):
+        return JsonResponse({'success': False, 'error': 'You do not have permission to reorder tasks'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+
+    task_ids = data.get('task_ids')
+    if not isinstance(task_ids, list) or not task_ids:
+        return JsonResponse({'success': False, 'error': 'task_ids must be a non-empty list'}, status=400)
+
+    try:
+        reordered = Task.apply_order(task_ids)
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    security_logger.info('Task reorder: %d tasks by %s', reordered, request.user.username)
+    return JsonResponse({'success': True, 'reordered': reordered})
+
+
 # ============================================================================
 # Advanced Training Views
 # ============================================================================
@@ -614,70 +949,33 @@ def bulk_sign_off(request):
 @login_required
 def advanced_staff_list(request):
     """List all active advanced training staff"""
-    from .models import AdvancedStaff, AdvancedTrainingType
-
-    # Get all active staff
-    staff_list = AdvancedStaff.objects.filter(is_active=True).prefetch_related('trainings', 'trainings__training_type')
-
-    # Get all training types for table headers
-    training_types = AdvancedTrainingType.objects.filter(is_active=True).order_by('order')
-
-    # Build progress data for each staff member
-    staff_progress = []
-    for staff in staff_list:
-        # Get all trainings for this staff member
-        trainings_dict = {}
-        for training in staff.trainings.all():
-            key = training.training_type.id
-            if key not in trainings_dict:
-                trainings_dict[key] = []
-            trainings_dict[key].append(training)
-
-        staff_progress.append({
-            'staff': staff,
-            'trainings_dict': trainings_dict
-        })
-
-    context = {
-        'staff_progress': staff_progress,
-        'training_types': training_types,
-        'page_title': 'Advanced Training - Active Staff',
-    }
-    return render(request, 'tracker/advanced_staff_list.html', context)
+    return _advanced_staff_grid(request, is_active=True)
 
 
 @login_required
 def advanced_staff_removed(request):
     """List all removed advanced training staff"""
-    from .models import AdvancedStaff, AdvancedTrainingType
+    return _advanced_staff_grid(request, is_active=False)
 
-    # Get all removed staff
-    staff_list = AdvancedStaff.objects.filter(is_active=False).prefetch_related('trainings', 'trainings__training_type')
+
+def _advanced_staff_grid(request, is_active):
+    """Read-only staff x training-type grid, rendered from pivoted rows (see pivot.py)"""
+    from .models import AdvancedStaff, AdvancedTrainingType
+    from .pivot import TrainingPivot
 
     # Get all training types for table headers
-    training_types = AdvancedTrainingType.objects.filter(is_active=True).order_by('order')
+    training_types = list(AdvancedTrainingType.objects.filter(is_active=True).order_by('order'))
 
-    # Build progress data for each staff member
-    staff_progress = []
-    for staff in staff_list:
-        # Get all trainings for this staff member
-        trainings_dict = {}
-        for training in staff.trainings.all():
-            key = training.training_type.id
-            if key not in trainings_dict:
-                trainings_dict[key] = []
-            trainings_dict[key].append(training)
-
-        staff_progress.append({
-            'staff': staff,
-            'trainings_dict': trainings_dict
-        })
+    staff_qs = AdvancedStaff.objects.filter(is_active=is_active).order_by('badge_number')
+    pivot = TrainingPivot(staff_qs, training_types, training_fields=(
+        'completion_date', 'approver_initials', 'termination_date',
+    ))
 
     context = {
-        'staff_progress': staff_progress,
+        'staff_rows': list(pivot.rows()),
         'training_types': training_types,
-        'page_title': 'Advanced Training - Removed Staff',
-        'is_removed': True,
+        'page_title': f'Advanced Training - {"Active" if is_active else "Removed"} Staff',
+        'is_removed': not is_active,
     }
     return render(request, 'tracker/advanced_staff_list.html', context)
 
@@ -729,12 +1027,14 @@ def advanced_staff_detail(request, badge_number):
 
 
 @login_required
+@limit_concurrency('export')
 def export_advanced_excel(request):
     """Export active advanced training staff to Excel"""
     return _export_advanced_excel_internal(request, is_active=True)
 
 
 @login_required
+@limit_concurrency('export')
 def export_advanced_excel_removed(request):
     """Export removed advanced training staff to Excel"""
     return _export_advanced_excel_internal(request, is_active=False)
@@ -742,248 +1042,98 @@ def export_advanced_excel_removed(request):
 
 def _export_advanced_excel_internal(request, is_active=True):
     """Internal function to export advanced training data to Excel"""
-    from django.http import HttpResponse
-    from openpyxl import load_workbook
-    from openpyxl.styles import Alignment
-    from datetime import datetime
-    from .models import AdvancedStaff, AdvancedTrainingType
-    import os
-
-    # Load template
-    template_path = 'ADV_TrainingStatus_WIP.xlsx'
-    if not os.path.exists(template_path):
-        messages.error(request, 'Excel template not found')
-        return redirect('advanced_staff_main')
-
-    wb = load_workbook(template_path)
-
-    # Select appropriate sheet
-    sheet_name = 'ADV' if is_active else 'ADV_Removed'
-    if sheet_name not in wb.sheetnames:
-        messages.error(request, f'Sheet "{sheet_name}" not found in template')
-        return redirect('advanced_staff_main')
-
-    ws = wb[sheet_name]
-
-    # Column mapping (1-indexed)
-    COL_BADGE = 1
-    COL_LAST = 2
-    COL_FIRST = 3
-    COL_ROLE = 4
-    # KP Training: Date(5), Apprvd(6), Term(7)
-    # Escort Training: Date(8), Apprvd(9), Term(10)
-    # ExpSamp Training: Date(11), Apprvd(12), Term(13)
-    # Other Training: Type(14), Date(15), Apprvd(16), Term(17)
-    # Other Training 2: Type(18), Date(19), Apprvd(20), Term(21)
-
-    # Get training types
-    kp_training = AdvancedTrainingType.objects.get(name='KP Training')
-    escort_training = AdvancedTrainingType.objects.get(name='Escort Training')
-    expsamp_training = AdvancedTrainingType.objects.get(name='ExpSamp Training')
-    other_training = AdvancedTrainingType.objects.get(name='Other Training')
-    other_training_2 = AdvancedTrainingType.objects.get(name='Other Training 2')
-
-    # Training type to column mapping
-    training_column_map = {
-        kp_training.id: (5, 6, 7, None),  # (date_col, apprvd_col, term_col, type_col)
-        escort_training.id: (8, 9, 10, None),
-        expsamp_training.id: (11, 12, 13, None),
-        other_training.id: (15, 16, 17, 14),  # Type is in col 14
-        other_training_2.id: (19, 20, 21, 18),  # Type is in col 18
+    from .exports import AdvancedStatusExport
+    return _export_job_response(request, AdvancedStatusExport(is_active=is_active), fallback='advanced_staff_main')
+
+
+# Sort keys accepted by the advanced grid (prefix with '-' for descending).
+# badge_number is unique and ends every ordering so rows have a stable position.
+ADVANCED_GRID_SORTS = {
+    'badge': ('badge_number',),
+    'name': ('last_name', 'first_name'),
+    'role': ('role',),
+    'badge_status': ('badge_status',),
+}
+
+
+def _advanced_grid_filters(params):
+    """Filter and sort settings of the advanced grid from a QueryDict, with defaults applied."""
+    sort = params.get('sort', 'badge')
+    if sort.lstrip('-') not in ADVANCED_GRID_SORTS:
+        sort = 'badge'
+    return {
+        'role': params.get('role', ''),
+        'status': params.get('status', 'active'),  # active, removed, all
+        'badge_status': params.get('badge_status', ''),
+        'has_trainee': params.get('has_trainee', 'all'),  # all, yes, no
+        'q': params.get('q', '').strip(),
+        'sort': sort,
     }
 
-    # Clear existing data (rows 3 onward, keep headers in rows 1-2)
-    # Delete rows from bottom to top to avoid index shifting
-    max_row = ws.max_row
-    if max_row > 2:
-        ws.delete_rows(3, max_row - 2)
-
-    # Get staff with prefetched training data
-    staff_list = AdvancedStaff.objects.filter(is_active=is_active).prefetch_related('trainings').order_by('badge_number')
-
-    # Write staff data
-    current_row = 3  # Start writing at row 3
-    for staff in staff_list:
-        # Write staff info
-        ws.cell(row=current_row, column=COL_BADGE, value=staff.badge_number)
-        ws.cell(row=current_row, column=COL_LAST, value=staff.last_name)
-        ws.cell(row=current_row, column=COL_FIRST, value=staff.first_name)
-        ws.cell(row=current_row, column=COL_ROLE, value=staff.role)
-
-        # Build training dictionary for quick lookup
-        training_dict = {}
-        for training in staff.trainings.all():
-            # Group by training_type_id and custom_type
-            key = (training.training_type_id, training.custom_type)
-            if key not in training_dict:
-                training_dict[key] = []
-            training_dict[key].append(training)
-
-        # Write training data
-        for training_type_id, (date_col, apprvd_col, term_col, type_col) in training_column_map.items():
-            # For "Other" types, we need to handle custom types
-            if training_type_id == other_training.id:
-                # Get first Other Training record
-                matching = [t for t in staff.trainings.all() if t.training_type_id == training_type_id]
-                if matching:
-                    training = matching[0]
-                    if training.completion_date:
-                        ws.cell(row=current_row, column=date_col, value=training.completion_date.strftime('%m/%d/%Y'))
-                    if training.approver_initials:
-                        ws.cell(row=current_row, column=apprvd_col, value=training.approver_initials)
-                    if training.termination_date:
-                        ws.cell(row=current_row, column=term_col, value=training.termination_date.strftime('%m/%d/%Y'))
-                    if training.custom_type and type_col:
-                        ws.cell(row=current_row, column=type_col, value=training.custom_type)
-
-            elif training_type_id == other_training_2.id:
-                # Get second Other Training record
-                matching = [t for t in staff.trainings.all() if t.training_type_id == other_training.id]
-                if len(matching) > 1:
-                    training = matching[1]
-                    if training.completion_date:
-                        ws.cell(row=current_row, column=date_col, value=training.completion_date.strftime('%m/%d/%Y'))
-                    if training.approver_initials:
-                        ws.cell(row=current_row, column=apprvd_col, value=training.approver_initials)
-                    if training.termination_date:
-                        ws.cell(row=current_row, column=term_col, value=training.termination_date.strftime('%m/%d/%Y'))
-                    if training.custom_type and type_col:
-                        ws.cell(row=current_row, column=type_col, value=training.custom_type)
-            else:
-                # Standard training types (KP, Escort, ExpSamp)
-                matching = [t for t in staff.trainings.all() if t.training_type_id == training_type_id]
-                if matching:
-                    training = matching[0]
-                    if training.completion_date:
-                        ws.cell(row=current_row, column=date_col, value=training.completion_date.strftime('%m/%d/%Y'))
-                    if training.approver_initials:
-                        ws.cell(row=current_row, column=apprvd_col, value=training.approver_initials)
-                    if training.termination_date:
-                        ws.cell(row=current_row, column=term_col, value=training.termination_date.strftime('%m/%d/%Y'))
-
-        current_row += 1
-
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    filename = f'ADV_TrainingStatus_{"Active" if is_active else "Removed"}_{datetime.now().strftime("%Y%m%d")}.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    # Save workbook to response
-    wb.save(response)
 
-    return response
-
-
-@login_required
-def advanced_staff_main(request):
-    """
-    Main full-featured advanced training page with inline editing, filtering, and search.
-    Similar to trainee_list but for advanced training staff.
-    """
-    from .models import AdvancedStaff, AdvancedTrainingType, AdvancedTraining
-    from django.db.models import Prefetch
-
-    # Get filter parameters
-    role_filter = request.GET.get('role', '')
-    status_filter = request.GET.get('status', 'active')  # active, removed, all
-    badge_status_filter = request.GET.get('badge_status', '')
-    has_trainee_filter = request.GET.get('has_trainee', 'all')  # all, yes, no
+def _advanced_grid_queryset(filters):
+    """Filtered, ordered AdvancedStaff queryset for the advanced grid."""
+    from django.db.models import Exists, OuterRef, Value
+    from django.db.models.functions import Concat
+    from .models import AdvancedStaff
 
     # Base queryset
-    if status_filter == 'removed':
+    if filters['status'] == 'removed':
         staff_qs = AdvancedStaff.objects.filter(is_active=False)
-    elif status_filter == 'all':
+    elif filters['status'] == 'all':
         staff_qs = AdvancedStaff.objects.all()
     else:  # active
         staff_qs = AdvancedStaff.objects.filter(is_active=True)
 
-    # Get all trainees for badge matching
-    from .models import Trainee
+    if filters['role']:
+        staff_qs = staff_qs.filter(role=filters['role'])
 
-    trainees = Trainee.objects.filter(is_active=True).select_related('cohort')
+    if filters['badge_status']:
+        staff_qs = staff_qs.filter(badge_status=filters['badge_status'])
 
-    # Build lookup dict: normalized_badge -> (trainee, progress_percentage)
-    from .utils import normalize_badge_for_advanced
-    trainee_lookup = {}
-    for trainee in trainees:
-        normalized_badge = normalize_badge_for_advanced(trainee.badge_number)
-        progress = trainee.get_progress_percentage()
-        trainee_lookup[normalized_badge] = (trainee, progress)
-
-    # Apply role filter if specified
-    if role_filter:
-        staff_qs = staff_qs.filter(role=role_filter)
-
-    # Apply badge status filter if specified
-    if badge_status_filter:
-        staff_qs = staff_qs.filter(badge_status=badge_status_filter)
-
-    # Apply has_trainee filter if specified
-    if has_trainee_filter != 'all':
-        from .utils import normalize_badge_for_trainee
-        staff_badges = list(staff_qs.values_list('badge_number', flat=True))
-        normalized_badges = [normalize_badge_for_trainee(b) for b in staff_badges]
-
-        existing_trainee_badges = Trainee.objects.filter(
-            badge_number__in=normalized_badges
-        ).values_list('badge_number', flat=True)
-
-        adv_format_badges = [b.lstrip('#') for b in existing_trainee_badges]
-
-        if has_trainee_filter == 'yes':
-            staff_qs = staff_qs.filter(badge_number__in=adv_format_badges)
-        else:  # 'no'
-            staff_qs = staff_qs.exclude(badge_number__in=adv_format_badges)
-
-    # Prefetch trainings for efficiency
-    staff_list = staff_qs.prefetch_related(
-        Prefetch('trainings', queryset=AdvancedTraining.objects.select_related('training_type'))
-    ).order_by('badge_number')
-
-    # Auto-update badge status for staff with badging_in_progress
-    staff_to_update = []
-    for staff in staff_list:
-        if staff.badge_status == 'badging_in_progress':
-            # Normalize badge number for comparison
-            normalized_badge = normalize_badge_for_advanced(staff.badge_number)
-
-            # Check if matching trainee exists with 100% completion
-            if normalized_badge in trainee_lookup:
-                trainee, progress = trainee_lookup[normalized_badge]
-                if progress == 100.0:
-                    staff.badge_status = 'ready_to_issue'
-                    staff_to_update.append(staff)
-
-    # Bulk update if any changes
-    if staff_to_update:
-        AdvancedStaff.objects.bulk_update(staff_to_update, ['badge_status'])
+    # Trainee badges carry a '#' prefix (see utils.normalize_badge_for_trainee)
+    if filters['has_trainee'] in ('yes', 'no'):
+        has_trainee = Exists(Trainee.objects.filter(
+            Q(badge_number=Concat(Value('#'), OuterRef('badge_number'))) | Q(badge_number=OuterRef('badge_number'))
+        ))
+        staff_qs = staff_qs.filter(has_trainee if filters['has_trainee'] == 'yes' else ~has_trainee)
 
-    # Get all training types for table headers
-    training_types = AdvancedTrainingType.objects.filter(is_active=True).order_by('order')
+    if filters['q']:
+        q = filters['q']
+        staff_qs = staff_qs.filter(
+            Q(badge_number__icontains=q) | Q(first_name__icontains=q) | Q(last_name__icontains=q)
+        )
 
-    # Build progress data for each staff member
-    staff_progress = []
-    for staff in staff_list:
-        # Organize trainings by type ID
-        trainings_by_type = {}
-        for training in staff.trainings.all():
-            type_id = training.training_type.id
-            if type_id not in trainings_by_type:
-                trainings_by_type[type_id] = []
-            trainings_by_type[type_id].append(training)
-
-        staff_progress.append({
-            'staff': staff,
-            'trainings_by_type': trainings_by_type
-        })
+    sort = filters['sort']
+    prefix = '-' if sort.startswith('-') else ''
+    ordering = [prefix + field for field in ADVANCED_GRID_SORTS[sort.lstrip('-')]]
+    if 'badge_number' not in ADVANCED_GRID_SORTS[sort.lstrip('-')]:
+        ordering.append('badge_number')
+    return staff_qs.order_by(*ordering)
 
-    # Get all roles for filter dropdown
-    role_choices = AdvancedStaff.ROLE_CHOICES
 
-    # Get badge status choices for filter and dropdown
-    badge_status_choices = AdvancedStaff.BADGE_STATUS_CHOICES
+@login_required
+def advanced_staff_main(request):
+    """
+    Main full-featured advanced training page with inline editing, filtering, and search.
+    Similar to trainee_list but for advanced training staff.
+
+    The page is only the grid shell: it scrolls a virtual window over the
+    filtered staff and fetches the visible rows from advanced_staff_rows.
+
+    Read-only: badge status promotion happens when the trainee's last task is
+    signed off (TraineeProgress.recalculate) or via `manage.py reconcile_badge_status`.
+    """
+    from django.conf import settings
+    from .models import AdvancedStaff, AdvancedTrainingType
+
+    filters = _advanced_grid_filters(request.GET)
+
+    # Get all training types for table headers (and the grid script's column list)
+    training_types = list(AdvancedTrainingType.objects.filter(is_active=True).order_by('order'))
+    grid_types = [
+        {'id': t.id, 'name': t.name, 'allows_custom': t.allows_custom_type} for t in training_types
+    ]
 
     # Get current user's initials for auto-populating approver field
     user_initials = ''
@@ -993,26 +1143,76 @@ def advanced_staff_main(request):
         user_initials = request.user.username[:10]
 
     context = {
-        'staff_progress': staff_progress,
         'training_types': training_types,
-        'role_choices': role_choices,
-        'badge_status_choices': badge_status_choices,
-        'role_filter': role_filter,
-        'status_filter': status_filter,
-        'badge_status_filter': badge_status_filter,
-        'has_trainee_filter': has_trainee_filter,
+        'grid_types': grid_types,
+        'role_choices': AdvancedStaff.ROLE_CHOICES,
+        'badge_status_choices': AdvancedStaff.BADGE_STATUS_CHOICES,
+        'role_filter': filters['role'],
+        'status_filter': filters['status'],
+        'badge_status_filter': filters['badge_status'],
+        'has_trainee_filter': filters['has_trainee'],
+        'search_filter': filters['q'],
+        'sort': filters['sort'],
+        'page_size': settings.ADVANCED_GRID_PAGE_SIZE,
         'page_title': 'Advanced Training Management',
         'user_initials': user_initials,
-        'filters': {
-            'role': role_filter,
-            'status': status_filter,
-            'badge_status': badge_status_filter,
-            'has_trainee': has_trainee_filter,
-        }
+        'filters': filters,
     }
     return render(request, 'tracker/advanced_staff_main.html', context)
 
 
+@login_required
+def advanced_staff_rows(request):
+    """
+    JSON window of advanced grid rows: ?offset=&limit= plus the grid filters
+    (role, status, badge_status, has_trainee, q) and sort.
+
+    Each row carries one cell per active training type (in the order of
+    ``types``); a cell is a list of trainings, each an array in ``fields`` order.
+    """
+    from django.conf import settings
+    from django.http import JsonResponse
+    from .models import AdvancedTrainingType
+    from .pivot import TRAINING_FIELDS, TrainingPivot
+
+    filters = _advanced_grid_filters(request.GET)
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+        limit = min(max(1, int(request.GET.get('limit', settings.ADVANCED_GRID_PAGE_SIZE))),
+                    settings.ADVANCED_GRID_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'offset and limit must be integers'}, status=400)
+
+    staff_qs = _advanced_grid_queryset(filters)
+    type_ids = list(AdvancedTrainingType.objects.filter(is_active=True).order_by('order').values_list('id', flat=True))
+    fields = TRAINING_FIELDS + ('status',)
+    pivot = TrainingPivot(staff_qs, type_ids)
+
+    rows = [
+        {
+            'id': row.id,
+            'badge': row.badge_number,
+            'name': row.get_full_name(),
+            'role': row.role,
+            'badge_status': row.badge_status,
+            'active': row.is_active,
+            'cells': [
+                [[getattr(training, field) for field in fields] for training in cell.trainings]
+                for cell in row.cells
+            ],
+        }
+        for row in pivot.rows(start=offset, stop=offset + limit)
+    ]
+    return JsonResponse({
+        'success': True,
+        'total': staff_qs.count(),
+        'offset': offset,
+        'types': type_ids,
+        'fields': fields,
+        'rows': rows,
+    })
+
+
 @login_required
 def update_advanced_training(request):
     """
@@ -1038,7 +1238,7 @@ def update_advanced_training(request):
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
     # Check if user has permission to manage advanced training
-    if not (request.user.is_superuser or request.user.has_perm('tracker.manage_advanced_training')):
+    if not permissions_for(request).can_manage_advanced:
         return JsonResponse({
             'success': False,
             'error': 'You do not have permission to manage advanced training records. Please contact an administrator.'
@@ -1063,7 +1263,7 @@ def update_advanced_training(request):
         return JsonResponse({'success': False, 'error': str(e)}, status=404)
 
     # Check if user is authorized to sign off this training type
-    if not training_type.can_user_sign_off(request.user):
+    if not permissions_for(request).can_sign_advanced(training_type.id):
         return JsonResponse({
             'success': False,
             'error': f'You are not authorized to sign off "{training_type.name}". Please contact an administrator.'
@@ -1142,7 +1342,7 @@ def delete_advanced_training(request, training_id):
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
     # Check if user has permission to manage advanced training
-    if not (request.user.is_superuser or request.user.has_perm('tracker.manage_advanced_training')):
+    if not permissions_for(request).can_manage_advanced:
         return JsonResponse({
             'success': False,
             'error': 'You do not have permission to delete advanced training records. Please contact an administrator.'
@@ -1177,7 +1377,7 @@ def update_advanced_staff_status(request):
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
     # Check if user has permission to manage advanced training
-    if not (request.user.is_superuser or request.user.has_perm('tracker.manage_advanced_training')):
+    if not permissions_for(request).can_manage_advanced:
         return JsonResponse({
             'success': False,
             'error': 'You do not have permission to update staff records. Please contact an administrator.'
@@ -1249,7 +1449,7 @@ def update_advanced_staff_role(request):
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
     # Check permission
-    if not (request.user.is_superuser or request.user.has_perm('tracker.manage_advanced_training')):
+    if not permissions_for(request).can_manage_advanced:
         return JsonResponse({
             'success': False,
             'error': 'You do not have permission to update staff records. Please contact an administrator.'
@@ -1292,49 +1492,14 @@ def advanced_staff_printable_list(request):
     """
     Generate a printable single-page list of all active staff.
     Staff with current (non-expired) Escort Training are highlighted.
-    """
-    from .models import AdvancedStaff, AdvancedTrainingType, AdvancedTraining
-    from datetime import datetime
 
-    # Get Escort Training type
-    try:
-        escort_type = AdvancedTrainingType.objects.get(name='Escort Training')
-    except AdvancedTrainingType.DoesNotExist:
-        escort_type = None
-
-    # Get all active staff with issued badges, prefetch trainings for efficiency
-    staff_members = AdvancedStaff.objects.filter(
-        is_active=True,
-        badge_status='issued_active'
-    ).prefetch_related(
-        'trainings__training_type'
-    ).order_by('last_name', 'first_name')
-
-    # Build staff list with escort status
-    staff_list = []
-    for staff in staff_members:
-        has_current_escort = False
-
-        if escort_type:
-            # Check if staff has current (non-expired) Escort Training
-            escort_training = staff.trainings.filter(training_type=escort_type).first()
-            if escort_training and escort_training.completion_date and not escort_training.is_expired:
-                has_current_escort = True
-
-        staff_list.append({
-            'badge_number': staff.badge_number,
-            'full_name': staff.get_full_name(),
-            'has_escort': has_current_escort,
-        })
-
-    context = {
-        'staff_list': staff_list,
-        'generated_date': datetime.now().strftime('%B %d, %Y'),
-        'total_count': len(staff_list),
-        'escort_count': sum(1 for s in staff_list if s['has_escort']),
-    }
+    The page is rendered from one query and cached until advanced staff or
+    training data changes (see roster.py).
+    """
+    from django.http import HttpResponse
+    from .roster import roster_cache
 
-    return render(request, 'tracker/advanced_staff_printable.html', context)
+    return HttpResponse(roster_cache.get())
 
 
 @login_required
@@ -1349,8 +1514,8 @@ def get_trainees_for_import(request):
     if request.method != 'GET':
         return JsonResponse({'success': False, 'error': 'GET request required'}, status=405)
 
-    # Get all active trainees
-    trainees = Trainee.objects.filter(is_active=True).order_by('badge_number')
+    # Get all active trainees (progress is read from the materialized row)
+    trainees = Trainee.objects.filter(is_active=True).select_related('cohort', 'progress').order_by('badge_number')
 
     trainee_list = []
     for trainee in trainees:
@@ -1368,13 +1533,14 @@ def get_trainees_for_import(request):
 
 
 @login_required
+@limit_concurrency('bulk')
 def import_trainees_to_advanced(request):
     """
     AJAX endpoint to import selected trainees to advanced training system.
     Checks for duplicates and completion status.
     """
     from django.http import JsonResponse
-    from .models import Trainee, AdvancedStaff
+    from .models import Trainee, AdvancedStaff, TraineeProgress
     from django.db import transaction
     import json
 
@@ -1382,7 +1548,7 @@ def import_trainees_to_advanced(request):
         return JsonResponse({'success': False, 'error': 'POST request required'}, status=405)
 
     # Check permission
-    if not (request.user.is_superuser or request.user.has_perm('tracker.manage_advanced_training')):
+    if not permissions_for(request).can_manage_advanced:
         return JsonResponse({
             'success': False,
             'error': 'You do not have permission to import trainees. Please contact an administrator.'
@@ -1398,15 +1564,18 @@ def import_trainees_to_advanced(request):
         return JsonResponse({'success': False, 'error': 'No trainees selected'}, status=400)
 
     # Fetch selected trainees
-    trainees = Trainee.objects.filter(id__in=trainee_ids, is_active=True)
+    trainees = Trainee.objects.filter(id__in=trainee_ids, is_active=True).select_related('progress', 'cohort')
 
     if not trainees.exists():
         return JsonResponse({'success': False, 'error': 'No valid trainees found'}, status=404)
 
+    snapshot = task_registry.snapshot()
+
     # Check for duplicates and incomplete trainees
     duplicates = []
     incomplete = []
     to_import = []
+    completed_ids = set()
 
     for trainee in trainees:
         # Strip # from badge number if present
@@ -1420,13 +1589,15 @@ def import_trainees_to_advanced(request):
                 'name': trainee.full_name
             })
         else:
-            # Check completion percentage
-            progress = trainee.get_progress_percentage()
-            if progress < 100:
+            # Exact count check, as in the promotion hook (TraineeProgress.recalculate)
+            total = snapshot.total_for(trainee.cohort.curriculum_id)
+            if TraineeProgress.is_complete(trainee.get_completed_task_count(), total):
+                completed_ids.add(trainee.id)
+            else:
                 incomplete.append({
                     'badge': trainee.badge_number,
                     'name': trainee.full_name,
-                    'progress': f'{progress}%'
+                    'progress': f'{trainee.get_progress_percentage()}%'
                 })
             to_import.append(trainee)
 
@@ -1447,11 +1618,13 @@ def import_trainees_to_advanced(request):
                 from .utils import normalize_badge_for_advanced
                 badge_number = normalize_badge_for_advanced(trainee.badge_number)
 
+                # Completed trainees are ready for their badge straight away
                 AdvancedStaff.objects.create(
                     badge_number=badge_number,
                     first_name=trainee.first_name,
                     last_name=trainee.last_name,
                     role='Trainee',
+                    badge_status='ready_to_issue' if trainee.id in completed_ids else 'badging_in_progress',
                     is_active=True
                 )
                 imported_count += 1
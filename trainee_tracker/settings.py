@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from decouple import config, Csv
 
@@ -185,6 +186,36 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = config('SECURE_HSTS_INCLUDE_SUBDOMAINS', default=True, cast=bool)
     SECURE_HSTS_PRELOAD = config('SECURE_HSTS_PRELOAD', default=True, cast=bool)
 
+# Background export jobs: built Excel files are cached on disk, keyed by a stamp
+# of the exported data, and built by a small pool of worker threads
+EXPORT_CACHE_DIR = BASE_DIR / config('EXPORT_CACHE_DIR', default='export_cache')
+EXPORT_JOB_WORKERS = config('EXPORT_JOB_WORKERS', default=1, cast=int)
+
+# Worker processes used to build the multi-cohort archive zip
+ARCHIVE_EXPORT_WORKERS = config('ARCHIVE_EXPORT_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+
+# Rows per page of the trainee lists and archive search (keyset pagination)
+TRAINEE_PAGE_SIZE = config('TRAINEE_PAGE_SIZE', default=100, cast=int)
+
+# Rows fetched per request by the virtual-scrolling advanced training grid (also the maximum limit)
+ADVANCED_GRID_PAGE_SIZE = config('ADVANCED_GRID_PAGE_SIZE', default=100, cast=int)
+
+# Concurrency limits for heavy endpoints (see tracker/throttle.py): concurrent
+# requests per gate, how many may wait for a slot and for how long before a 429
+HEAVY_REQUEST_LIMITS = {
+    'export': config('HEAVY_EXPORT_CONCURRENCY', default=2, cast=int),
+    'bulk': config('HEAVY_BULK_CONCURRENCY', default=1, cast=int),
+    'search': config('HEAVY_SEARCH_CONCURRENCY', default=2, cast=int),
+}
+HEAVY_REQUEST_MAX_WAITING = config('HEAVY_REQUEST_MAX_WAITING', default=8, cast=int)
+HEAVY_REQUEST_WAIT_SECONDS = config('HEAVY_REQUEST_WAIT_SECONDS', default=5, cast=float)
+
+# Live updates (Server-Sent Events, see tracker/events.py). Under ASGI a comment
+# is sent every HEARTBEAT seconds; under WSGI each request checks the database
+# once and the browser polls again after POLL seconds (no worker thread is held)
+EVENT_STREAM_HEARTBEAT_SECONDS = config('EVENT_STREAM_HEARTBEAT_SECONDS', default=15, cast=float)
+EVENT_STREAM_POLL_SECONDS = config('EVENT_STREAM_POLL_SECONDS', default=15, cast=float)
+
 # Logging Configuration
 LOGGING = {
     'version': 1,